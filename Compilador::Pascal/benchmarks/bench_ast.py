@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark da construção da AST.
+
+Amplia cada programa de tests/*.pas repetindo as instruções do bloco
+principal (por omissão 1000 vezes) e compara, para a classe Node atual e
+para a versão anterior (com __dict__ e validação de todos os filhos):
+  - tempo de parse;
+  - memória ocupada pela árvore (tracemalloc);
+  - número de nós.
+
+Uso: python bench_ast.py [--scale 1000]
+"""
+
+import os
+import gc
+import sys
+import glob
+import time
+import argparse
+import tracemalloc
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+import parser as pascal_parser
+from lexer import get_tokens
+
+
+class LegacyNode:
+    """Node tal como existia antes de __slots__: valida e copia os filhos."""
+
+    def __init__(self, type, children=None, leaf=None, pos=None):
+        self.type = type
+        if children is None:
+            self.children = []
+        elif isinstance(children, list):
+            validated_children = []
+            for child in children:
+                if not isinstance(child, (LegacyNode, pascal_parser.Node)):
+                    validated_children.append(LegacyNode('ErrorNode', [], str(child)))
+                else:
+                    validated_children.append(child)
+            self.children = validated_children
+        else:
+            self.children = [children]
+        self.leaf = leaf
+        self.pos = pos
+
+
+def scale_program(source, factor):
+    """Repete as instruções do bloco principal de um programa."""
+    # O bloco principal é o 'begin' cujo 'end' correspondente precede o '.'
+    tokens = get_tokens(source)
+    opened = []
+    begin = end = None
+    for current, following in zip(tokens, tokens[1:]):
+        if current.type == 'BEGIN':
+            opened.append(current.lexpos + len(current.value))
+        elif current.type == 'END':
+            start = opened.pop()
+            if following.type == 'DOT':
+                begin, end = start, current.lexpos
+    head, body = source[:begin], source[begin:end]
+    body = body.rstrip().rstrip(';')
+    return head + (body + ';') * factor + '\nend.\n'
+
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(current.children)
+    return count
+
+
+def measure(source, node_class, repeat=3):
+    """Devolve (melhor tempo de parse, bytes alocados pela árvore, nós)."""
+    pascal_parser.Node = node_class
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        pascal_parser.parse(source)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+
+    # A memória é medida à parte, porque o tracemalloc abranda o parse
+    tracemalloc.start()
+    ast = pascal_parser.parse(source)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, size, count_nodes(ast)
+
+
+def bench(scale):
+    current_node = pascal_parser.Node
+    print(f"{'programa':<14} {'nós':>9} {'parse antigo':>13} {'parse novo':>11} "
+          f"{'MB antigo':>10} {'MB novo':>8} {'B/nó antigo':>12} {'B/nó novo':>10}")
+    try:
+        for path in sorted(glob.glob(os.path.join(BASE_DIR, 'tests', '*.pas'))):
+            with open(path) as f:
+                source = scale_program(f.read(), scale)
+            old_time, old_size, nodes = measure(source, LegacyNode)
+            new_time, new_size, _ = measure(source, current_node)
+            print(f"{os.path.basename(path):<14} {nodes:>9} {old_time:>12.3f}s {new_time:>10.3f}s "
+                  f"{old_size / 2**20:>10.1f} {new_size / 2**20:>8.1f} "
+                  f"{old_size / nodes:>12.0f} {new_size / nodes:>10.0f}")
+    finally:
+        pascal_parser.Node = current_node
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da construção da AST')
+    parser.add_argument('--scale', type=int, default=1000)
+    args = parser.parse_args()
+    bench(args.scale)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Formato binário (.ewvb) vs. texto (.ewvm): tamanho e tempo de carregamento.
+
+Para os programas tests/*.ewvm e para programas gerados de vários tamanhos,
+mostra o tamanho de cada formato e o tempo de carregamento até ter um
+ewvm.Program pronto a executar (leitura do ficheiro + ewvm.assemble, ou
+leitura + bytecode.decode). Verifica também que o disassembler produz texto
+equivalente ao original.
+
+Uso: python bench_bytecode.py [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+import ewvm
+import bytecode
+from compiler import compile_source
+
+
+def generated_program(statements):
+    """Programa com atribuições, ifs, ciclos e strings, com `statements` blocos."""
+    body = []
+    for i in range(statements):
+        body.append(f"  if x > {i} then v[{i % 10 + 1}] := v[{i % 10 + 1}] + x * {i % 7 + 1}"
+                    f" else writeln('bloco {i % 50}', x);")
+        body.append(f"  while x < {i % 13} do x := x + 1;")
+    return "\n".join(["program Gerado;", "var", "  x: integer;", "  v: array[1..10] of integer;",
+                      "begin", "  x := 0;"] + body + ["  writeln(x)", "end."]) + "\n"
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def same_program(a, b):
+    return (list(a.opcodes) == list(b.opcodes) and list(a.operands) == list(b.operands)
+            and a.constants == b.constants)
+
+
+def report(name, text, directory, repeat):
+    try:
+        program = ewvm.assemble(text)
+    except ewvm.EWVMError as e:
+        print(f"{name:<16} não é um programa EWVM válido: {e}")
+        return
+    text_path = os.path.join(directory, 'programa.ewvm')
+    binary_path = os.path.join(directory, 'programa' + bytecode.EXTENSION)
+    with open(text_path, 'w') as f:
+        f.write(text)
+    bytecode.save(program, binary_path)
+
+    equivalent = same_program(ewvm.assemble(bytecode.disassemble(bytecode.load(binary_path))), program)
+    text_time = best_time(lambda: ewvm.load(text_path), repeat)
+    binary_time = best_time(lambda: bytecode.load(binary_path), repeat)
+    text_size, binary_size = os.path.getsize(text_path), os.path.getsize(binary_path)
+    print(f"{name:<16} {len(program):>8} {text_size:>10} {binary_size:>10} {binary_size / text_size:>6.0%} "
+          f"{text_time * 1000:>10.3f} {binary_time * 1000:>10.3f} {text_time / binary_time:>8.1f}x "
+          f"{'sim' if equivalent else 'NÃO':>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Formato binário vs. texto')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='Número de blocos dos programas gerados')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'programa':<16} {'instr.':>8} {'texto B':>10} {'binário B':>10} {'rácio':>6} "
+          f"{'texto ms':>10} {'binário ms':>10} {'ganho':>9} {'equiv':>5}")
+    with tempfile.TemporaryDirectory() as directory:
+        for path in sorted(glob.glob(os.path.join(BASE_DIR, 'tests', '*.ewvm'))):
+            with open(path) as f:
+                report(os.path.basename(path), f.read(), directory, args.repeat)
+        for size in args.sizes:
+            result = compile_source(generated_program(size))
+            if not result.ok:
+                for error in result.errors:
+                    print(error)
+                sys.exit(1)
+            report(f'gerado {size}', "\n".join(result.code) + "\n", directory, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark da cache de compilação.
+
+Compila um corpus (tests/*.pas ampliados com bench_ast.scale_program) com
+compile_file, como o main.py, três vezes:
+  - sem cache (--no-cache);
+  - com a cache vazia (compila e guarda as entradas);
+  - com a cache preenchida (reutiliza todas as entradas).
+
+O código gerado é escrito numa diretoria temporária e a cache usa outra,
+pelo que a cache do utilizador não é alterada.
+
+Uso: python bench_cache.py [--scale 200] [--copies 10]
+"""
+
+import io
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import contextlib
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from main import compile_file
+from bench_ast import scale_program
+
+
+def build_corpus(directory, scale, copies):
+    """Escreve `copies` variantes ampliadas de cada programa de teste que compila."""
+    paths = []
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'tests', '*.pas'))):
+        with open(path) as f:
+            source = scale_program(f.read(), scale)
+        name = os.path.splitext(os.path.basename(path))[0]
+        for copy in range(copies):
+            target = os.path.join(directory, f'{name}_{copy}.pas')
+            with open(target, 'w') as f:
+                # Um comentário diferente em cada cópia dá chaves diferentes
+                f.write(f'{{ copia {copy} }}\n{source}')
+            paths.append(target)
+    return paths
+
+
+def compile_all(paths, no_cache):
+    options = argparse.Namespace(output=None, tokens_only=False, ast_only=False, no_code=False,
+                                 verbose=False, opt_level=0, run=False, no_cache=no_cache, binary=False,
+                                 profile=None, parser='ply')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path in paths:
+            compile_file(path, options)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--scale', type=int, default=200, help='Repetições do bloco principal de cada programa')
+    arg_parser.add_argument('--copies', type=int, default=10, help='Cópias de cada programa no corpus')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus_dir, tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['PASCAL_COMPILE_CACHE'] = cache_dir
+        paths = build_corpus(corpus_dir, args.scale, args.copies)
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"Corpus: {len(paths)} ficheiros, {size / 1024:.0f} KB")
+
+        for label, no_cache in (("sem cache", True), ("cache vazia", False), ("cache preenchida", False)):
+            elapsed = compile_all(paths, no_cache)
+            print(f"{label:<18} {elapsed:8.3f} s  {len(paths) / elapsed:8.1f} ficheiros/s")
+
+
+if __name__ == '__main__':
+    main()
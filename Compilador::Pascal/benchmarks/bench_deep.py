@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Travessia de ASTs muito profundas.
+
+Gera dois programas:
+  - uma atribuição cuja expressão tem N termos (x := x + 1 - x + 2 ...),
+    que o parser transforma numa cadeia de N BinaryOperation encaixadas;
+  - N/50 blocos begin...end encaixados.
+
+e mede o parse, a análise semântica, a geração de código e o pretty-print
+(Node.pretty) com o limite de recursão do Python por omissão. Com a
+travessia recursiva anterior, qualquer um destes programas terminava com
+RecursionError.
+
+O texto do pretty-print cresce com o quadrado da profundidade (cada nível
+acrescenta indentação), pelo que só é medido para árvores até 10000 níveis;
+a expressão com N/10 termos serve para essa medição.
+
+Uso: python bench_deep.py [--terms 50000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from parser import parse
+from semantic import SemanticAnalyzer
+from codegen import generate_code
+from visitor import count_nodes, walk
+
+
+def long_expression(terms):
+    """Programa com uma expressão de `terms` termos."""
+    parts = ["x"]
+    for i in range(1, terms):
+        parts.append(f"{'+' if i % 2 else '-'} {'x' if i % 3 else i}")
+    return f"program Deep;\nvar x: integer;\nbegin\n  x := 1;\n  x := {' '.join(parts)};\n  writeln(x)\nend.\n"
+
+
+def nested_blocks(depth):
+    """Programa com `depth` blocos begin...end encaixados."""
+    return ("program Nested;\nvar x: integer;\nbegin\n  x := 0;\n"
+            + "begin " * depth + "x := x + 1" + " end" * depth + "\nend.\n")
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+MAX_PRETTY_DEPTH = 10000
+
+
+def depth(node):
+    """Profundidade máxima da árvore."""
+    return max(level for _, level in walk(node)) + 1
+
+
+def bench(name, source):
+    ast, parse_time = timed(lambda: parse(source))
+    analyzer = SemanticAnalyzer()
+    (is_valid, _, _), semantic_time = timed(lambda: analyzer.analyze(ast))
+    code, codegen_time = timed(lambda: generate_code(ast, analyzer.current_scope))
+    assert is_valid
+    levels = depth(ast)
+    pretty = f"{timed(ast.pretty)[1]:>8.3f}" if levels <= MAX_PRETTY_DEPTH else f"{'-':>8}"
+    print(f"{name:<28} {count_nodes(ast):>8} {levels:>8} {parse_time:>8.3f} {semantic_time:>10.3f} "
+          f"{codegen_time:>8.3f} {pretty} {len(code):>10}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Travessia de ASTs muito profundas')
+    arg_parser.add_argument('--terms', type=int, default=50000)
+    args = arg_parser.parse_args()
+
+    print(f"Limite de recursão do Python: {sys.getrecursionlimit()}")
+    print(f"{'programa':<28} {'nós':>8} {'níveis':>8} {'parse':>8} {'semântica':>10} "
+          f"{'codegen':>8} {'pretty':>8} {'instruções':>10}")
+    bench(f"expressão, {args.terms} termos", long_expression(args.terms))
+    bench(f"expressão, {args.terms // 10} termos", long_expression(args.terms // 10))
+    bench(f"{args.terms // 50} blocos encaixados", nested_blocks(args.terms // 50))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Custo do despacho das visitas à AST.
+
+Compara, num programa com 100k instruções (bench_lexer.generate_source), a
+análise semântica e a geração de código com a tabela de despacho por
+classe (Visitor) e com o despacho anterior, que formatava o nome do método
+e chamava getattr em cada visita.
+
+Uso: python bench_dispatch.py [--statements 100000] [--repeat 3]
+"""
+
+import os
+import gc
+import sys
+import time
+import argparse
+from types import GeneratorType
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from parser import parse
+from semantic import SemanticAnalyzer
+from codegen import CodeGenerator
+from visitor import count_nodes
+from bench_lexer import generate_source
+
+
+def legacy_visit(self, node, prefix):
+    """Visitor.visit com o despacho anterior: nome formatado e getattr em cada nó."""
+    stack = []
+    current = None
+    value = None
+    while True:
+        if node is not None:
+            result = getattr(self, f'{prefix}{node.type}', self.generic_visit)(node)
+            if isinstance(result, GeneratorType):
+                if current is not None:
+                    stack.append(current)
+                current = result
+                value = None
+            elif current is None:
+                return result
+            else:
+                value = result
+        try:
+            node = current.send(value)
+        except StopIteration as done:
+            value = done.value
+            if not stack:
+                return value
+            current = stack.pop()
+            node = None
+
+
+class LegacySemanticAnalyzer(SemanticAnalyzer):
+    def visit(self, node):
+        return legacy_visit(self, node, 'visit_')
+
+
+class LegacyCodeGenerator(CodeGenerator):
+    def visit(self, node):
+        return legacy_visit(self, node, 'generate_')
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Custo do despacho das visitas à AST')
+    arg_parser.add_argument('--statements', type=int, default=100000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    ast = parse(generate_source(args.statements))
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    symbol_table = analyzer.current_scope
+    print(f"{args.statements} instruções, {count_nodes(ast)} nós")
+
+    phases = (
+        ("análise semântica", lambda cls: cls().analyze(ast), LegacySemanticAnalyzer, SemanticAnalyzer),
+        ("geração de código", lambda cls: cls(symbol_table).generate(ast), LegacyCodeGenerator, CodeGenerator),
+    )
+    print(f"{'fase':<20} {'getattr (s)':>12} {'tabela (s)':>12} {'ganho':>8}")
+    for name, run, legacy, current in phases:
+        before = best_time(lambda: run(legacy), args.repeat)
+        after = best_time(lambda: run(current), args.repeat)
+        print(f"{name:<20} {before:>12.3f} {after:>12.3f} {100 * (before - after) / before:>7.1f}%")
+
+
+if __name__ == '__main__':
+    main()
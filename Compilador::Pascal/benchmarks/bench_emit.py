@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Memória da emissão de código: lista em memória vs. escrita em stream.
+
+Gera um programa com ~1M instruções EWVM e, num processo novo para cada
+modo, compila-o e escreve o código num ficheiro temporário:
+  - lista: generate_code (todas as instruções numa lista) e depois escrita
+    do ficheiro;
+  - stream: write_code (instruções escritas em blocos à medida que são
+    geradas).
+
+Mostra o pico de memória (RSS) antes e depois da geração de código. A
+diferença é a memória usada pela emissão; a AST é a mesma nos dois modos.
+
+Uso: python bench_emit.py [--instructions 1000000]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Cada instrução do corpo gera 20 instruções EWVM
+STATEMENT = "  v[i] := v[i] + x * 2 - 1;"
+PER_STATEMENT = 20
+
+
+def generate_source(instructions):
+    statements = max(1, instructions // PER_STATEMENT)
+    lines = ["program Emit;", "var", "  i, x: integer;", "  v: array[1..10] of integer;", "begin",
+             "  i := 1; x := 1; v[1] := 0;"]
+    lines.extend([STATEMENT] * statements)
+    lines.append("  writeln(v[1])")
+    lines.append("end.")
+    return "\n".join(lines) + "\n"
+
+
+def peak_rss_mb():
+    # ru_maxrss vem em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, source_path, output_path):
+    """Executado no processo filho: compila e escreve o código no modo indicado."""
+    sys.path.insert(0, SRC_DIR)
+    sys.setrecursionlimit(10000)
+    from parser import parse
+    from semantic import SemanticAnalyzer
+    from codegen import generate_code, write_code
+
+    with open(source_path) as f:
+        ast = parse(f.read())
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    before = peak_rss_mb()
+
+    start = time.perf_counter()
+    with open(output_path, 'w') as f:
+        if mode == 'lista':
+            code = generate_code(ast, analyzer.current_scope)
+            for instruction in code:
+                f.write(f"{instruction}\n")
+            count = len(code)
+        else:
+            count = write_code(ast, analyzer.current_scope, f)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'before': before, 'after': peak_rss_mb(), 'count': count, 'time': elapsed}))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Memória da emissão de código')
+    arg_parser.add_argument('--instructions', type=int, default=1000000)
+    arg_parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'emit.pas')
+        with open(source_path, 'w') as f:
+            f.write(generate_source(args.instructions))
+
+        print(f"{'modo':<8} {'instruções':>11} {'RSS antes (MB)':>15} {'RSS depois (MB)':>16} {'emissão (MB)':>13} {'tempo (s)':>10}")
+        for mode in ('lista', 'stream'):
+            output_path = os.path.join(directory, f'{mode}.ewvm')
+            result = subprocess.run([sys.executable, __file__, '--child', mode, source_path, output_path],
+                                    capture_output=True, text=True, check=True)
+            data = json.loads(result.stdout)
+            print(f"{mode:<8} {data['count']:>11} {data['before']:>15.1f} {data['after']:>16.1f} "
+                  f"{data['after'] - data['before']:>13.1f} {data['time']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tempo até obter todos os diagnósticos de um programa com muitos erros.
+
+Gera um programa com o pascal_gen e introduz erros de sintaxe em N linhas
+escolhidas ao acaso (':=' trocado por '=', ';' em falta, operando em falta,
+token a mais). Cerca de um em cada dez erros é um ';' em falta na última
+declaração de variáveis de um subprograma, antes do 'begin' (antes das
+medições verifica-se também o mesmo erro no programa principal). Compara:
+
+  - recuperação de erros: uma única compilação (compile_source) encontra os
+    erros todos; mede-se o tempo, quantos dos erros introduzidos foram
+    assinalados e se a AST parcial foi obtida (sem ela não há análise
+    semântica);
+  - um erro de cada vez (o comportamento sem recuperação): compila, corrige
+    a linha do primeiro erro de sintaxe e volta a compilar, até não haver
+    erros. O tempo é a soma das compilações (sem contar o tempo que a
+    pessoa demoraria a corrigir cada erro).
+
+Uso: python bench_errors.py [--size 300] [--errors 5 20 50] [--seed 0]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from compiler import compile_source
+from pascal_gen import generate_program
+
+
+def corrupt(line, rng):
+    """Versão da linha com um erro de sintaxe."""
+    choice = rng.randrange(4)
+    if choice == 0:
+        return line.replace(':=', '=', 1)
+    if choice == 1:
+        return line.rstrip(';')  # O erro é assinalado no início da linha seguinte
+    if choice == 2:
+        return line.replace(':=', ':= *', 1)
+    return line.replace(':=', ':= ) ', 1)
+
+
+def seed_errors(source, count, seed):
+    """Devolve (linhas com erros, linhas originais, números das linhas alteradas)."""
+    rng = random.Random(seed)
+    lines = source.split('\n')
+    # Atribuições simples do programa principal, uma por linha
+    begin = len(lines) - 1 - lines[::-1].index('begin')
+    candidates = [n for n in range(begin + 1, len(lines) - 2)
+                  if lines[n].startswith('  ') and ':=' in lines[n] and lines[n].endswith(';')
+                  and lines[n].split()[0] not in ('if', 'for', 'begin')]
+    # Última declaração de variáveis antes do 'begin' de um subprograma
+    declarations = [n for n in range(begin) if lines[n + 1] == 'begin'
+                    and lines[n].startswith('  ') and ':' in lines[n] and lines[n].endswith(';')]
+    chosen_declarations = rng.sample(declarations, min(max(1, count // 10), len(declarations), count))
+    chosen_statements = rng.sample(candidates, min(count - len(chosen_declarations), len(candidates)))
+    broken = list(lines)
+    for n in chosen_declarations:
+        broken[n] = lines[n].rstrip(';')  # O erro é assinalado no 'begin' seguinte
+    for n in chosen_statements:
+        broken[n] = corrupt(lines[n], rng)
+    return broken, lines, sorted(chosen_declarations + chosen_statements)
+
+
+# ';' em falta na última declaração do programa principal, antes do
+# 'begin': a análise tem de retomar no 'begin' e continuar a encontrar os
+# erros do corpo (de sintaxe e semânticos)
+MISSING_SEMICOLON = """program Declaracoes;
+var x: integer;
+    y: integer
+begin
+  x := 1 +;
+  y := 2;
+  w := 3
+end.
+"""
+MISSING_SEMICOLON_ERRORS = [('parser', 4), ('parser', 5), ('semantic', 7)]
+
+
+def check_declaration_recovery():
+    result = compile_source(MISSING_SEMICOLON)
+    errors = [(d.phase, d.line) for d in result.errors]
+    if result.ast is None or errors != MISSING_SEMICOLON_ERRORS:
+        sys.exit(f"Recuperação depois das declarações falhou: {errors}")
+
+
+def syntax_errors(result):
+    return [d for d in result.errors if d.phase in ('lexer', 'parser')]
+
+
+def one_pass(broken):
+    start = time.perf_counter()
+    result = compile_source('\n'.join(broken))
+    return time.perf_counter() - start, result
+
+
+def one_at_a_time(broken, original, chosen):
+    """Corrige o primeiro erro e recompila, até não haver erros de sintaxe."""
+    lines = list(broken)
+    pending = list(chosen)
+    total = 0.0
+    rounds = 0
+    while True:
+        start = time.perf_counter()
+        result = compile_source('\n'.join(lines))
+        total += time.perf_counter() - start
+        rounds += 1
+        errors = syntax_errors(result)
+        if not errors or not pending:
+            return total, rounds
+        # A linha alterada mais próxima antes do erro (um ';' em falta só é
+        # detetado na linha seguinte)
+        line = errors[0].line - 1
+        fixed = max((n for n in pending if n <= line), default=pending[0])
+        lines[fixed] = original[fixed]
+        pending.remove(fixed)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Tempo até todos os diagnósticos')
+    arg_parser.add_argument('--size', type=int, default=300, help='Tamanho do programa gerado')
+    arg_parser.add_argument('--errors', type=int, nargs='+', default=[5, 20, 50])
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    check_declaration_recovery()
+    source = generate_program(args.size, args.seed)
+    print(f"Programa: {source.count(chr(10))} linhas")
+    print(f"{'erros':>6} {'assinalados':>12} {'AST':>4} {'1 passagem (s)':>15} {'1 a 1 (s)':>10} {'compilações':>12} {'ganho':>7}")
+    for count in args.errors:
+        broken, original, chosen = seed_errors(source, count, args.seed)
+        elapsed, result = one_pass(broken)
+        reported = {d.line - 1 for d in syntax_errors(result)}
+        # Um erro conta como assinalado se houver um diagnóstico na sua linha
+        # ou na seguinte (';' em falta)
+        found = sum(1 for n in chosen if n in reported or n + 1 in reported)
+        serial, rounds = one_at_a_time(broken, original, chosen)
+        ast = 'sim' if result.ast is not None else 'não'
+        print(f"{len(chosen):>6} {found:>12} {ast:>4} {elapsed:>15.3f} {serial:>10.3f} {rounds:>12} {serial / elapsed:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
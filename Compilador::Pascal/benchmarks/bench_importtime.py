@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Custo fixo de arranque do compilador por invocação (o bench_startup.py mede
+só o carregamento das tabelas do parser).
+
+Corre main.py com 'python -X importtime' em vários modos (-t, -a, -n e
+compilação completa sem cache) sobre um programa pequeno e mostra, para
+cada modo:
+
+  - o tempo total de import (soma dos módulos de topo do relatório do
+    -X importtime, em ms; o melhor de --repeat execuções);
+  - os módulos do compilador que foram carregados;
+  - o tempo de uma invocação completa (o melhor de --repeat execuções), que
+    é o que pesa quando um script chama o compilador centenas de vezes.
+
+Uso: python bench_importtime.py [--repeat 10] [--source ../tests/exemplo2.pas]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(BENCH_DIR, '..', 'src', 'main.py')
+
+# Módulos do compilador (as fases e o que só é preciso depois delas)
+COMPILER_MODULES = ('lexer', 'parser', 'rdparser', 'semantic', 'visitor', 'optimizer', 'loops',
+                    'codegen', 'peephole', 'ewvm', 'bytecode', 'cache')
+
+
+def import_report(arguments):
+    """(tempo de import em ms, módulos do compilador carregados) de uma execução."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', MAIN] + arguments,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    total = 0
+    loaded = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            total += int(cumulative)  # Módulo de topo: inclui os que importou
+        name = name.strip()
+        if name in COMPILER_MODULES:
+            loaded.append(name)
+    return total / 1000, [name for name in COMPILER_MODULES if name in loaded]
+
+
+def best_import_report(arguments, repeat):
+    """import_report com o menor tempo de import em `repeat` execuções."""
+    return min((import_report(arguments) for _ in range(repeat)), key=lambda report: report[0])
+
+
+def invocation_time(command, repeat):
+    """Melhor tempo de `repeat` execuções do comando."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Custo de arranque do compilador')
+    arg_parser.add_argument('--repeat', type=int, default=10)
+    arg_parser.add_argument('--source', default=os.path.join(BENCH_DIR, '..', 'tests', 'exemplo2.pas'))
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'saida.ewvm')
+        modes = [
+            ('-t', ['-t', args.source]),
+            ('-a', ['-a', args.source]),
+            ('-n', ['-n', '--no-cache', args.source]),
+            ('completo', ['--no-cache', '-o', output, args.source]),
+        ]
+        # Interpretador Python sem o compilador, como referência
+        python_only = invocation_time([sys.executable, '-c', 'pass'], args.repeat)
+        print(f"Arranque do Python sem o compilador: {python_only * 1000:.1f} ms")
+        print(f"{'modo':<9} {'imports (ms)':>13} {'invocação (ms)':>15}  módulos carregados")
+        for name, arguments in modes:
+            imports, loaded = best_import_report(arguments, args.repeat)
+            elapsed = invocation_time([sys.executable, MAIN] + arguments, args.repeat)
+            print(f"{name:<9} {imports:>13.1f} {elapsed * 1000:>15.1f}  {' '.join(loaded)}")
+
+
+if __name__ == '__main__':
+    main()
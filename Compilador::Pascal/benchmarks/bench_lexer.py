@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark do analisador léxico.
+
+Gera programas Pascal grandes (declarações, atribuições, ciclos e chamadas de
+I/O, com palavras reservadas em várias capitalizações e identificadores que
+começam por palavras reservadas) e mede o débito do lexer em tokens/s e MB/s.
+
+Mostra também a memória ocupada pelos tokens (medida com tracemalloc): no
+TokenBuffer devolvido por get_tokens e numa lista com um LexToken por token,
+como get_tokens devolvia antes.
+
+Uso: python bench_lexer.py [--sizes 1000 10000 100000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lexer import get_tokens, new_lexer
+
+
+def generate_source(statements):
+    """Gera um programa Pascal válido com o número de instruções indicado."""
+    lines = ["program Bench;", "var", "  dox, endvalue, total, i: integer;",
+             "  ok: Boolean;", "  v: array[1..10] of integer;", "Begin"]
+    body = [
+        "  total := total + dox * 2 div 3 mod 7;",
+        "  IF (total >= endvalue) and not ok THEN dox := dox - 1 ELSE dox := dox + 1;",
+        "  for i := 1 TO 10 do v[i] := i * i;",
+        "  while ok do ok := false;",
+        "  WriteLn('total = ', total); { comentario }",
+    ]
+    for n in range(statements):
+        lines.append(body[n % len(body)])
+    lines.append("  writeln(total)")
+    lines.append("end.")
+    return "\n".join(lines) + "\n"
+
+
+def token_list(source):
+    """Os tokens numa lista de LexTokens."""
+    lexer = new_lexer(source)
+    return list(iter(lexer.token, None))
+
+
+def retained_memory(function, source):
+    """Memória (em bytes) ocupada pelo resultado de function(source)."""
+    tracemalloc.start()
+    result = function(source)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def bench(sizes, repeat):
+    print(f"{'instruções':>12} {'tokens':>10} {'tempo (s)':>10} {'tokens/s':>12} {'MB/s':>8}"
+          f" {'buffer MB':>10} {'lista MB':>9} {'B/token':>8}")
+    for size in sizes:
+        source = generate_source(size)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = len(get_tokens(source))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        mb = len(source.encode('utf-8')) / (1024 * 1024)
+        columns = retained_memory(get_tokens, source)
+        objects = retained_memory(token_list, source)
+        print(f"{size:>12} {count:>10} {best:>10.3f} {count / best:>12.0f} {mb / best:>8.2f}"
+              f" {columns / 2**20:>10.2f} {objects / 2**20:>9.2f} {columns / count:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do lexer')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    bench(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
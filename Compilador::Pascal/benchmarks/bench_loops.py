@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Efeito da otimização de ciclos (loops.py) em programas com muitos ciclos.
+
+Compila cada programa com -O0, com -O1 sem a otimização de ciclos (apenas
+AST e peephole) e com -O1 completo, executa-os no interpretador local e
+mostra o número de instruções executadas, verificando que a saída é a mesma
+nos três casos. A redução indicada é a do -O1 completo em relação ao -O1
+sem ciclos, ou seja, a que se deve apenas à otimização de ciclos.
+
+Programas: ordenação por borbulhagem, somas de prefixos e janelas,
+produto de matrizes (em arrays lineares), um while com expressões
+invariantes, whiles com uma condição invariante (global e numa função), uma função com um array local, limites de for com efeitos (uma
+função que altera uma global, uma variável alterada no corpo), o programa de bench_vm.py e
+programas gerados pelo pascal_gen.
+
+Uso: python bench_loops.py [--size 200] [--generated 300]
+"""
+
+import io
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import ewvm
+import peephole
+from parser import parse
+from semantic import SemanticAnalyzer
+from optimizer import optimize_ast
+from codegen import generate_code
+from bench_vm import loop_program
+from pascal_gen import generate_program
+
+
+def bubble_sort(n):
+    return f"""program Ordena;
+var v: array[1..{n}] of integer; i, j, t, n: integer;
+begin
+  n := {n};
+  for i := 1 to n do v[i] := (i * 7919) mod 1009;
+  for i := 1 to n - 1 do
+    for j := 1 to n - i do
+      if v[j] > v[j + 1] then begin t := v[j]; v[j] := v[j + 1]; v[j + 1] := t end;
+  writeln(v[1], ' ', v[n])
+end.
+"""
+
+
+def prefix_sums(n):
+    return f"""program Prefixos;
+var v, p, w: array[0..{n}] of integer; i, k, n, total: integer;
+begin
+  n := {n}; k := 5; total := 0;
+  for i := 0 to n do v[i] := i mod 13;
+  p[0] := v[0];
+  for i := 1 to n do p[i] := p[i - 1] + v[i];
+  for i := k to n do begin w[i] := p[i] - p[i - k]; total := total + w[i] * (k + 1) end;
+  writeln(p[n], ' ', total)
+end.
+"""
+
+
+def matrix_product(n):
+    return f"""program Matrizes;
+var a, b, c: array[0..{n * n}] of integer; i, j, k, n, s: integer;
+begin
+  n := {n};
+  for i := 0 to n * n - 1 do begin a[i] := i mod 7; b[i] := i mod 5 end;
+  for i := 0 to n - 1 do
+    for j := 0 to n - 1 do
+    begin
+      s := 0;
+      for k := 0 to n - 1 do s := s + a[i * n + k] * b[k * n + j];
+      c[i * n + j] := s
+    end;
+  writeln(c[0], ' ', c[n * n - 1])
+end.
+"""
+
+
+def invariant_while(n):
+    return f"""program Invariantes;
+var i, n, a, b, soma: integer;
+begin
+  n := {n * 10}; a := 12; b := 34; soma := 0; i := 0;
+  while i < n do
+  begin
+    soma := (soma + i * (a * b + 7) + (a - b) * (a + b)) mod 1000003;
+    i := i + 1
+  end;
+  writeln(soma)
+end.
+"""
+
+
+def invariant_condition(n):
+    # A condição do while usa uma expressão invariante (hoisted para um
+    # temporário), numa variável global e dentro de uma função
+    return f"""program Condicao;
+var i, n, c: integer;
+function conta(n: integer): integer;
+var i, c: integer;
+begin
+  i := 0; c := 0;
+  while i < n * 3 do begin i := i + 1; c := c + 1 end;
+  conta := c
+end;
+begin
+  n := {n}; i := 0; c := 0;
+  while i < n * 2 do begin i := i + 1; c := c + 1 end;
+  writeln(c, ' ', conta(n))
+end.
+"""
+
+
+def local_array(n):
+    return f"""program Local;
+var r, i: integer;
+function janela(k: integer): integer;
+var v: array[1..50] of integer; x, s: integer;
+begin
+  for x := 1 to 50 do v[x] := x * k;
+  s := 0;
+  for x := 2 to 49 do s := s + v[x - 1] + v[x] + v[x + 1];
+  janela := s
+end;
+begin
+  r := 0;
+  for i := 1 to {n} do r := (r + janela(i)) mod 1000003;
+  writeln(r)
+end.
+"""
+
+
+def bound_effects(n):
+    # O limite de um for é calculado uma única vez: a função do limite altera
+    # uma global lida no corpo (que continua invariante) e um limite
+    # variável alterado no corpo não encurta o ciclo
+    return f"""program Limites;
+var i, n, g, h, s, c: integer;
+function f(x: integer): integer;
+begin
+  g := g + 1;
+  f := x
+end;
+begin
+  g := 1; h := 10; s := 0;
+  for i := 1 to f({n}) do s := s + g * h;
+  n := {n}; c := 0;
+  for i := 1 to n do begin n := n - 1; c := c + 1 end;
+  for i := f(n) downto 1 do c := c + g;
+  writeln(s, ' ', c, ' ', g)
+end.
+"""
+
+
+def compile_code(source, opt_level, loops=True):
+    ast = parse(source)
+    analyzer = SemanticAnalyzer()
+    is_valid, _, _ = analyzer.analyze(ast)
+    if not is_valid:
+        raise SystemExit("O programa de teste não compila")
+    if opt_level > 0:
+        ast, _ = optimize_ast(ast, loops=loops)
+    code = generate_code(ast, analyzer.current_scope)
+    return peephole.optimize(code, opt_level) if opt_level > 0 else code
+
+
+def execute(code):
+    output = io.StringIO()
+    machine = ewvm.run(code, io.StringIO(''), output)
+    return machine.steps, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark da otimização de ciclos')
+    arg_parser.add_argument('--size', type=int, default=200, help='Tamanho dos programas de teste')
+    arg_parser.add_argument('--generated', type=int, default=300, help='Tamanho dos programas do pascal_gen')
+    args = arg_parser.parse_args()
+    n = args.size
+
+    programs = [
+        ('ordenação', bubble_sort(n)),
+        ('prefixos', prefix_sums(n * 50)),
+        ('matrizes', matrix_product(max(2, n // 10))),
+        ('invariantes', invariant_while(n)),
+        ('condição', invariant_condition(n)),
+        ('array local', local_array(n)),
+        ('limites', bound_effects(n)),
+        ('bench_vm', loop_program(n * 10)),
+    ] + [(f"gerado {seed}", generate_program(args.generated, seed)) for seed in range(3)]
+
+    print(f"{'programa':<12} {'exec. -O0':>11} {'-O1 s/ ciclos':>14} {'exec. -O1':>11} {'redução':>8}")
+    mismatches = 0
+    for name, source in programs:
+        steps = []
+        outputs = set()
+        for opt_level, loops in ((0, False), (1, False), (1, True)):
+            executed, output = execute(compile_code(source, opt_level, loops))
+            steps.append(executed)
+            outputs.add(output)
+        if len(outputs) > 1:
+            mismatches += 1
+            print(f"{name:<12} SAÍDA DIFERENTE")
+            continue
+        before, after = steps[1], steps[2]
+        print(f"{name:<12} {steps[0]:>11} {before:>14} {after:>11} {100 * (before - after) / before:>7.1f}%")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
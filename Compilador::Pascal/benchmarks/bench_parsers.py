@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Parser do PLY (parser.py) contra o parser descendente recursivo (rdparser.py).
+
+Primeiro verifica a equivalência: para cada programa do corpus (tests/*.pas,
+programas gerados pelo pascal_gen e versões desses programas com erros de
+sintaxe introduzidos como em bench_errors.py, com caracteres ilegais, ou com
+ambos) os dois parsers têm de devolver árvores iguais (tipo, folha e posição
+de cada nó) e os mesmos diagnósticos, pela mesma ordem.
+Termina com código 1 se houver diferenças.
+
+Depois mede o débito (tokens/s) de cada parser em programas gerados de
+vários tamanhos: só a análise sintática, sobre um TokenBuffer já obtido, e
+a análise completa a partir do texto (lexer incluído).
+
+Uso: python bench_parsers.py [--sizes 100 1000 5000] [--repeat 3] [--generated 20]
+"""
+
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+import parser as lalr
+import rdparser
+from lexer import get_tokens
+from diagnostics import Diagnostics
+from visitor import walk
+from pascal_gen import generate_program
+from bench_errors import seed_errors
+
+PARSERS = (('PLY', lalr.parse), ('rd', rdparser.parse))
+
+
+def shape(ast):
+    """A árvore como lista de (profundidade, tipo, folha, posição)."""
+    if ast is None:
+        return None
+    return [(depth, node.type, node.leaf, node.pos) for node, depth in walk(ast)]
+
+
+def parse_with(parse, source):
+    diagnostics = Diagnostics(source)
+    ast = parse(source, diagnostics)
+    return shape(ast), [str(d) for d in diagnostics.errors()]
+
+
+def illegal_characters(lines, count, seed):
+    """Cópia das linhas com `count` caracteres ilegais (erros léxicos) inseridos."""
+    rng = random.Random(seed)
+    lines = list(lines)
+    for _ in range(count):
+        n = rng.randrange(len(lines))
+        column = rng.randint(0, len(lines[n]))
+        lines[n] = lines[n][:column] + rng.choice('#$?') + lines[n][column:]
+    return lines
+
+
+def corpus(generated):
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, '..', 'tests', '*.pas'))):
+        with open(path) as f:
+            yield os.path.basename(path), f.read()
+    for seed in range(generated):
+        source = generate_program(50 + 10 * seed, seed)
+        yield f"gerado {seed}", source
+        broken, _, _ = seed_errors(source, 1 + seed % 5, seed)
+        yield f"gerado {seed} com erros", '\n'.join(broken)
+        yield f"gerado {seed} com erros léxicos", '\n'.join(illegal_characters(source.split('\n'), 3, seed))
+        yield f"gerado {seed} com erros léxicos e de sintaxe", '\n'.join(illegal_characters(broken, 3, seed))
+
+
+def check_equivalence(generated):
+    """Número de programas do corpus em que os parsers diferem."""
+    checked = mismatches = 0
+    for name, source in corpus(generated):
+        expected = parse_with(lalr.parse, source)
+        if parse_with(rdparser.parse, source) != expected:
+            mismatches += 1
+            print(f"DIFERENTE: {name}")
+        checked += 1
+    print(f"Equivalência: {checked - mismatches} de {checked} programas com a mesma AST e diagnósticos")
+    return mismatches
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench(sizes, repeat):
+    print(f"{'tamanho':>8} {'tokens':>9} {'parser':>7} {'só parser (s)':>14} {'tokens/s':>10} {'c/ lexer (s)':>13} {'ganho':>7}")
+    for size in sizes:
+        source = generate_program(size, 0)
+        tokens = get_tokens(source)
+        times = {}
+        for name, parse in PARSERS:
+            parse_only = best_time(lambda: parse(source, Diagnostics(source), tokens), repeat)
+            full = best_time(lambda: parse(source, Diagnostics(source)), repeat)
+            times[name] = parse_only
+            gain = f"{times['PLY'] / parse_only:>6.1f}x" if name != 'PLY' else ''
+            print(f"{size:>8} {len(tokens):>9} {name:>7} {parse_only:>14.3f} {len(tokens) / parse_only:>10.0f}"
+                  f" {full:>13.3f} {gain:>7}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark e equivalência dos parsers')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--generated', type=int, default=20, help='Programas gerados na verificação de equivalência')
+    args = arg_parser.parse_args()
+
+    mismatches = check_equivalence(args.generated)
+    bench(args.sizes, args.repeat)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Efeito das otimizações de -O1 (AST e peephole) nos programas de teste.
+
+Para cada tests/*.pas compila sem e com otimização e mostra o número de
+instruções geradas e o número de instruções executadas no interpretador
+local (com os dados de entrada de bench_vm.py), verificando que a saída do
+programa é a mesma. Aos testes juntam-se os programas de EXTRA_PROGRAMS, com
+casos que as regras do peephole já trataram mal.
+
+Uso: python bench_peephole.py
+"""
+
+import io
+import os
+import sys
+import glob
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+import ewvm
+import peephole
+from compiler import compile_source
+from bench_vm import TEST_INPUTS
+
+
+# Índices compostos num array fora do início da zona global: o offset do
+# limite inferior só pode ser dobrado no endereço base depois de todo o índice
+EXTRA_PROGRAMS = {
+    'índices': """program Indices;
+var x: integer;
+    a: array[1..10] of integer;
+    i: integer;
+begin
+  for i := 1 to 10 do a[i] := i * 10;
+  i := 3;
+  writeln(a[(i - 1) * 2]);
+  writeln(a[(i - 1) * 2 + 1]);
+  writeln(a[i - 1] + a[2 * i - 1]);
+  a[(i - 1) * 2] := a[(i + 1) - 1];
+  writeln(a[4])
+end.
+""",
+}
+
+
+def programs():
+    """(nome, código fonte) dos testes e dos programas de EXTRA_PROGRAMS."""
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'tests', '*.pas'))):
+        with open(path) as f:
+            yield os.path.splitext(os.path.basename(path))[0], f.read()
+    yield from EXTRA_PROGRAMS.items()
+
+
+def execute(code, stdin_text):
+    """Devolve (instruções executadas, saída) ou (None, mensagem de erro)."""
+    output = io.StringIO()
+    try:
+        machine = ewvm.run(code, io.StringIO(stdin_text), output)
+    except ewvm.EWVMError as e:
+        return None, str(e)
+    return machine.steps, output.getvalue()
+
+
+def percent(before, after):
+    return f"{100 * (before - after) / before:.1f}%" if before else "-"
+
+
+def main():
+    print(f"{'programa':<14} {'-O0':>6} {'-O1':>6} {'redução':>8} {'exec. -O0':>10} {'exec. -O1':>10} {'redução':>8}")
+    mismatches = 0
+    for name, source in programs():
+        plain, optimized = compile_source(source), compile_source(source, opt_level=1)
+        if not plain.ok:
+            print(f"{name:<14} não compila: {plain.errors[0]}")
+            continue
+
+        static_before = peephole.instruction_count(plain.code)
+        static_after = peephole.instruction_count(optimized.code)
+        stdin_text = TEST_INPUTS.get(name, '')
+        steps_before, output_before = execute(plain.code, stdin_text)
+        steps_after, output_after = execute(optimized.code, stdin_text)
+        if output_before != output_after:
+            mismatches += 1
+            print(f"{name:<14} SAÍDA DIFERENTE com -O1")
+            continue
+        print(f"{name:<14} {static_before:>6} {static_after:>6} {percent(static_before, static_after):>8} "
+              f"{steps_before:>10} {steps_after:>10} {percent(steps_before, steps_after):>8}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark de funções recursivas no interpretador EWVM local.
+
+Compila (com -O0 e -O1) e executa fib(n) recursivo e fact(n) repetido num
+ciclo, verifica o resultado e mostra as instruções executadas, o tempo de
+execução e o débito. Cada chamada tem o seu frame (parâmetros e variáveis
+locais relativos a fp, com PUSHL/STOREL), pelo que a recursão não passa por
+variáveis globais.
+
+Uso: python bench_recursion.py [--fib 15 20 24] [--fact 12] [--repeat 3]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+from math import factorial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import ewvm
+from compiler import compile_source
+
+
+def fib_program(n):
+    return f"""program Fib;
+function fib(n: integer): integer;
+begin
+  if n < 2 then fib := n
+  else fib := fib(n - 1) + fib(n - 2)
+end;
+begin
+  writeln(fib({n}))
+end.
+"""
+
+
+def fact_program(n, times):
+    return f"""program Fact;
+var i, r: integer;
+function fact(n: integer): integer;
+var anterior: integer;
+begin
+  if n <= 1 then fact := 1
+  else
+  begin
+    anterior := fact(n - 1);
+    fact := n * anterior
+  end
+end;
+begin
+  for i := 1 to {times} do r := fact({n});
+  writeln(r)
+end.
+"""
+
+
+def fib(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def report(name, source, expected, repeat):
+    for level in (0, 1):
+        result = compile_source(source, level)
+        if not result.ok:
+            for error in result.errors:
+                print(error)
+            sys.exit(1)
+        program = ewvm.assemble(result.code)
+        best = None
+        for _ in range(repeat):
+            output = io.StringIO()
+            start = time.perf_counter()
+            machine = ewvm.run(program, stdout=output)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        ok = output.getvalue().strip() == str(expected)
+        print(f"{name:<14} -O{level} {len(program):>6} {machine.steps:>12} {best * 1000:>11.1f} "
+              f"{machine.steps / best:>12.0f} {'sim' if ok else 'NÃO':>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de recursão')
+    parser.add_argument('--fib', type=int, nargs='+', default=[15, 20, 24])
+    parser.add_argument('--fact', type=int, default=12)
+    parser.add_argument('--fact-times', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'programa':<14} {'nível':<3} {'instr.':>6} {'executadas':>12} {'execução ms':>11} "
+          f"{'instr./s':>12} {'certo':>5}")
+    for n in args.fib:
+        report(f"fib({n})", fib_program(n), fib(n), args.repeat)
+    report(f"fact({args.fact}) x{args.fact_times}", fact_program(args.fact, args.fact_times),
+           factorial(args.fact), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark do arranque do parser.
+
+Mede o tempo de `import parser` num processo novo em três situações:
+  - frio: diretoria de cache vazia (as tabelas LALR são geradas e guardadas);
+  - quente: tabelas já em cache (apenas são carregadas);
+  - só leitura: cache inacessível (as tabelas são geradas em memória).
+
+Uso: python bench_startup.py [--runs 10]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def time_import(cache_dir):
+    """Tempo (s) de um processo Python que apenas importa o parser."""
+    env = dict(os.environ, PASCAL_PARSER_CACHE=cache_dir)
+    env.pop('PASCAL_PARSER_DEBUG', None)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import parser'], cwd=SRC_DIR, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def bench(runs):
+    root = tempfile.mkdtemp(prefix='pascal-bench-')
+    try:
+        cold = []
+        for i in range(runs):
+            cold.append(time_import(os.path.join(root, f'cold{i}')))
+
+        warm_dir = os.path.join(root, 'warm')
+        time_import(warm_dir)
+        warm = [time_import(warm_dir) for _ in range(runs)]
+
+        # Um ficheiro no lugar da diretoria torna a cache impossível de criar
+        readonly_dir = os.path.join(root, 'readonly')
+        open(readonly_dir, 'w').close()
+        readonly = [time_import(os.path.join(readonly_dir, 'cache')) for _ in range(runs)]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{'cenário':<12} {'mediana (ms)':>14} {'mín (ms)':>10}")
+    for name, samples in (('frio', cold), ('quente', warm), ('só leitura', readonly)):
+        print(f"{name:<12} {statistics.median(samples) * 1000:>14.1f} {min(samples) * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do arranque do parser')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+    bench(args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Pico de memória (RSS) da análise léxica de ficheiros grandes.
+
+Gera programas de vários tamanhos (com o gerador de bench_lexer.py) e, para
+cada um, mede o pico de RSS de um processo que:
+
+  - blocos: corre 'main.py -t' (o ficheiro é lido por blocos e os tokens
+    são escritos à medida que são encontrados, para /dev/null);
+  - texto:  lê o ficheiro inteiro para um str e obtém todos os tokens com
+    get_tokens, como o -t fazia antes da leitura por blocos.
+
+O '-t' é medido também sobre o mesmo programa numa só linha (as
+mudanças de linha trocadas por espaços), que não pode ser cortado por linhas.
+Com a leitura por blocos o pico deve ficar praticamente constante, com ou
+sem mudanças de linha; no outro caso cresce com o tamanho do ficheiro.
+
+Antes das medições, verifica que lex_chunks dá os mesmos tokens e
+diagnósticos que get_tokens sobre um programa sem mudanças de linha.
+
+Uso: python bench_stream.py [--sizes 1 4 16] (tamanhos em MB)
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from bench_lexer import generate_source
+from diagnostics import Diagnostics
+from lexer import get_tokens, lex_chunks
+
+WHOLE_TEXT = (
+    "import sys; sys.path.insert(0, sys.argv[1]);"
+    "from lexer import get_tokens;"
+    "text = open(sys.argv[2]).read(); tokens = get_tokens(text)"
+)
+
+# O processo medido é lançado por um processo intermédio pequeno: um filho
+# criado diretamente por este (com fork) herdaria, no pico de RSS, a memória
+# ocupada aqui pelo programa gerado
+MEASURE = (
+    "import os, sys, time, subprocess;"
+    "start = time.perf_counter();"
+    "process = subprocess.Popen(sys.argv[1:], stdout=subprocess.DEVNULL);"
+    "usage = os.wait4(process.pid, 0)[2];"
+    "print(usage.ru_maxrss / 1024, time.perf_counter() - start)"
+)
+
+
+def peak_rss(command):
+    """(pico de RSS em MB, tempo em segundos) de um processo filho."""
+    output = subprocess.run([sys.executable, '-c', MEASURE] + command,
+                            capture_output=True, text=True, check=True).stdout
+    rss, elapsed = output.split()
+    return float(rss), float(elapsed)  # ru_maxrss vem em KB (Linux)
+
+
+def check_no_newlines(statements=2000, chunk_size=4096):
+    """Compara lex_chunks com get_tokens num programa sem mudanças de linha."""
+    text = generate_source(statements).replace('\n', ' ')
+    whole_diagnostics = Diagnostics(text)
+    whole = [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in get_tokens(text, whole_diagnostics)]
+    chunked_diagnostics = Diagnostics(text)
+    chunks = (text[i:i + chunk_size] for i in range(0, len(text), chunk_size))
+    chunked = [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in lex_chunks(chunks, chunked_diagnostics)]
+    if chunked != whole or [str(d) for d in chunked_diagnostics] != [str(d) for d in whole_diagnostics]:
+        sys.exit('lex_chunks difere de get_tokens num fonte sem mudanças de linha')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Pico de memória do lexer em ficheiros grandes')
+    arg_parser.add_argument('--sizes', type=float, nargs='+', default=[1, 4, 16], help='Tamanhos dos ficheiros (MB)')
+    args = arg_parser.parse_args()
+
+    # Bytes por instrução do gerador, para acertar o tamanho pedido
+    per_statement = len(generate_source(1000)) / 1000
+    check_no_newlines()
+    print(f"{'fonte MB':>9} {'blocos MB':>10} {'tempo (s)':>10} {'1 linha MB':>10} {'tempo (s)':>10} {'texto MB':>9} {'tempo (s)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, 'grande.pas')
+            flat_path = os.path.join(directory, 'grande_sem_linhas.pas')
+            source = generate_source(int(size * 2**20 / per_statement))
+            with open(path, 'w') as f:
+                f.write(source)
+            with open(flat_path, 'w') as f:
+                f.write(source.replace('\n', ' '))
+            del source
+            mb = os.path.getsize(path) / 2**20
+            chunked, chunked_time = peak_rss([sys.executable, os.path.join(SRC_DIR, 'main.py'), '-t', path])
+            flat, flat_time = peak_rss([sys.executable, os.path.join(SRC_DIR, 'main.py'), '-t', flat_path])
+            whole, whole_time = peak_rss([sys.executable, '-c', WHOLE_TEXT, SRC_DIR, path])
+            print(f"{mb:>9.1f} {chunked:>10.1f} {chunked_time:>10.2f} {flat:>10.1f} {flat_time:>10.2f} {whole:>9.1f} {whole_time:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de todas as fases do compilador em programas de vários tamanhos.
+
+Gera programas sintéticos com o pascal_gen (declarações, instruções
+encaixadas, expressões longas, arrays grandes) e mede, para cada tamanho, o
+melhor de N tempos de cada fase:
+  - lexer: get_tokens sobre o código fonte;
+  - parser: parse (inclui o lexer, que é chamado pelo parser);
+  - semantic: SemanticAnalyzer.analyze;
+  - codegen: generate_code.
+
+O débito é mostrado em linhas/s. Os tempos podem ser guardados como
+referência (--save) num ficheiro JSON; nas execuções seguintes cada fase é
+comparada com a referência e as que ficaram mais lentas do que o limite
+(--threshold, por omissão 20%) são assinaladas como regressões, terminando
+o programa com código 1.
+
+Uso: python bench_suite.py [--sizes 100 1000 5000] [--repeat 3]
+                           [--baseline FICHEIRO] [--save] [--threshold 0.2]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+from lexer import get_tokens
+from parser import parse
+from semantic import SemanticAnalyzer
+from codegen import generate_code
+from pascal_gen import generate_program
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+PHASES = ('lexer', 'parser', 'semantic', 'codegen')
+
+
+def best_time(function, repeat, setup=None):
+    """Melhor tempo de `function(setup())` em `repeat` execuções."""
+    best = None
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(source, repeat):
+    """Tempos (s) de cada fase para um código fonte."""
+    times = {
+        'lexer': best_time(lambda _: get_tokens(source), repeat),
+        'parser': best_time(lambda _: parse(source), repeat),
+        # A análise anota a AST: cada execução usa uma árvore nova
+        'semantic': best_time(lambda ast: SemanticAnalyzer().analyze(ast), repeat, setup=lambda: parse(source)),
+    }
+    ast = parse(source)
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    times['codegen'] = best_time(lambda _: generate_code(ast, analyzer.current_scope), repeat)
+    return times
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark das fases do compilador')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000],
+                            help='Número de blocos de instruções dos programas gerados')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Ficheiro JSON com os tempos de referência')
+    arg_parser.add_argument('--save', action='store_true', help='Guarda os tempos medidos como referência')
+    arg_parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Aumento de tempo (fração) a partir do qual uma fase é uma regressão')
+    args = arg_parser.parse_args()
+
+    baseline = None if args.save else load_baseline(args.baseline)
+    results = {}
+    regressions = []
+
+    print(f"{'tamanho':>8} {'linhas':>8} {'fase':<9} {'tempo (s)':>10} {'linhas/s':>11} {'referência':>11}")
+    for size in args.sizes:
+        source = generate_program(size, args.seed)
+        lines = source.count('\n')
+        times = measure(source, args.repeat)
+        results[str(size)] = {'lines': lines, 'times': times}
+        for phase in PHASES:
+            elapsed = times[phase]
+            comparison = ''
+            reference = (baseline or {}).get('results', {}).get(str(size), {}).get('times', {}).get(phase)
+            if reference:
+                change = elapsed / reference - 1
+                comparison = f"{change:+.0%}"
+                if change > args.threshold:
+                    comparison += ' REGRESSÃO'
+                    regressions.append((size, phase, change))
+            print(f"{size:>8} {lines:>8} {phase:<9} {elapsed:>10.4f} {lines / elapsed:>11.0f} {comparison:>11}")
+        total = sum(times.values()) - times['lexer']  # O parser já inclui o lexer
+        print(f"{size:>8} {lines:>8} {'total':<9} {total:>10.4f} {lines / total:>11.0f}")
+
+    if args.save:
+        data = {'python': platform.python_version(), 'machine': platform.machine(),
+                'seed': args.seed, 'results': results}
+        with open(args.baseline, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"Referência guardada em {args.baseline}")
+    elif baseline is None:
+        print(f"Sem referência em {args.baseline} (use --save para a criar)")
+    elif baseline.get('seed') != args.seed:
+        print("Aviso: a referência foi medida com outra seed")
+
+    if regressions:
+        print(f"=== {len(regressions)} regressões acima de {args.threshold:.0%} ===")
+        for size, phase, change in regressions:
+            print(f"  tamanho {size}, {phase}: {change:+.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
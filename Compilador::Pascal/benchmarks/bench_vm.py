@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark do interpretador EWVM local.
+
+Executa os programas tests/*.ewvm com dados de entrada fixos e um programa
+gerado com ciclos, arrays e aritmética, e mostra o tempo de descodificação,
+o tempo de execução, as instruções executadas e o débito (instruções/s).
+
+Uso: python bench_vm.py [--n 200000] [--repeat 3]
+"""
+
+import io
+import os
+import sys
+import glob
+import time
+import argparse
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+import ewvm
+from compiler import compile_source
+
+# Dados de entrada dos programas de teste (uma linha por READ), por nome do programa
+TEST_INPUTS = {
+    'exemplo2': '3\n9\n5\n',
+    'exemplo3': '12\n',
+    'exemplo4': '7919\n',
+    'exemplo5': '1\n2\n3\n4\n5\n',
+    'exemplo6': '101101\n',
+    'exemplo7': '101101\n',
+}
+
+
+def loop_program(n):
+    """Programa Pascal com ciclos aninhados, arrays e aritmética inteira."""
+    return f"""program Ciclos;
+var
+  v: array[1..100] of integer;
+  i, j, soma: integer;
+begin
+  soma := 0;
+  for i := 1 to 100 do
+    v[i] := i * 2;
+  i := 0;
+  while i < {n} do
+  begin
+    for j := 1 to 10 do
+      soma := (soma + v[j] * j) mod 1000003;
+    i := i + 1
+  end;
+  writeln(soma)
+end.
+"""
+
+
+def time_run(program, stdin_text, repeat):
+    best = None
+    machine = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        machine = ewvm.run(program, io.StringIO(stdin_text), io.StringIO())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, machine.steps
+
+
+def report(name, text, stdin_text, repeat):
+    start = time.perf_counter()
+    try:
+        program = ewvm.assemble(text)
+    except ewvm.EWVMError as e:
+        print(f"{name:<16} não é um programa EWVM válido: {e}")
+        return
+    decode_time = time.perf_counter() - start
+    try:
+        run_time, steps = time_run(program, stdin_text, repeat)
+    except ewvm.EWVMError as e:
+        print(f"{name:<16} {len(program):>8} {decode_time * 1000:>9.2f}   erro: {e}")
+        return
+    print(f"{name:<16} {len(program):>8} {decode_time * 1000:>9.2f} {run_time * 1000:>11.2f} "
+          f"{steps:>12} {steps / run_time:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do interpretador EWVM')
+    parser.add_argument('--n', type=int, default=20000, help='Iterações do ciclo exterior do programa gerado')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'programa':<16} {'instr.':>8} {'desc. ms':>9} {'execução ms':>11} {'executadas':>12} {'instr./s':>12}")
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'tests', '*.ewvm'))):
+        name = os.path.basename(path)
+        with open(path) as f:
+            text = f.read()
+        report(name, text, TEST_INPUTS.get(os.path.splitext(name)[0], ''), args.repeat)
+
+    result = compile_source(loop_program(args.n))
+    if not result.ok:
+        for error in result.errors:
+            print(error)
+        sys.exit(1)
+    report('ciclos', result.code, '', args.repeat)
+
+
+if __name__ == '__main__':
+    main()
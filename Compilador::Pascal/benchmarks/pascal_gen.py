@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Gerador de programas Pascal sintéticos para benchmarks.
+
+Produz programas válidos (sem erros léxicos, sintáticos nem semânticos) que
+cobrem a gramática do parser.py, com um tamanho controlado por `size`:
+  - milhares de declarações (integer, boolean, string e arrays grandes);
+  - funções (recursivas, com parâmetros e variáveis locais) e
+    procedimentos, chamados a partir do programa principal;
+  - listas longas de instruções: atribuições, if/else, while, for to/downto,
+    write/writeln e blocos begin...end;
+  - expressões longas com todos os operadores (aritméticos, relacionais,
+    lógicos e not);
+  - instruções encaixadas até uma profundidade configurável.
+
+O mesmo `seed` gera sempre o mesmo programa.
+
+    from pascal_gen import generate_program
+    source = generate_program(1000)
+
+Uso: python pascal_gen.py SIZE [--seed 0] [--depth 20] [-o programa.pas]
+"""
+
+import sys
+import random
+import argparse
+
+ARRAY_SIZE = 10000
+
+
+class ProgramGenerator:
+    def __init__(self, size, seed=0, depth=20, expression_terms=12):
+        self.size = size                          # Número de blocos de instruções
+        self.depth = depth                        # Profundidade dos blocos encaixados
+        self.expression_terms = expression_terms  # Termos das expressões longas
+        self.random = random.Random(seed)
+        # Variáveis de cada tipo (todas declaradas e inicializadas)
+        count = max(4, size)
+        self.integers = [f"i{n}" for n in range(count)]
+        self.booleans = [f"b{n}" for n in range(max(2, count // 4))]
+        self.strings = [f"s{n}" for n in range(max(1, count // 8))]
+        self.arrays = [f"a{n}" for n in range(max(1, count // 50))]
+        self.counters = [f"k{n}" for n in range(depth + 1)]  # Variáveis de controlo dos for
+        self.functions = [f"f{n}" for n in range(max(1, size // 20))]
+        self.procedures = [f"p{n}" for n in range(max(1, size // 40))]
+
+    # ---- Declarações ----
+
+    def declarations(self):
+        lines = ["var"]
+        for names, type_name in ((self.integers, "integer"), (self.counters, "integer"),
+                                 (self.booleans, "boolean"), (self.strings, "string"),
+                                 (self.arrays, f"array[1..{ARRAY_SIZE}] of integer")):
+            for start in range(0, len(names), 10):
+                lines.append(f"  {', '.join(names[start:start + 10])}: {type_name};")
+        return lines
+
+    def initializations(self):
+        statements = [f"{name} := {n}" for n, name in enumerate(self.integers)]
+        statements += [f"{name} := {'true' if n % 2 else 'false'}" for n, name in enumerate(self.booleans)]
+        statements += [f"{name} := 'texto {n}'" for n, name in enumerate(self.strings)]
+        statements += [f"{name} := 0" for name in self.counters]
+        statements += [f"{name}[1] := 0" for name in self.arrays]
+        return statements
+
+    # ---- Subprogramas ----
+
+    def function(self, index):
+        """Função recursiva (com profundidade limitada pelo primeiro argumento)."""
+        name = self.functions[index]
+        lines = [f"function {name}(n: integer; m: integer): integer;", "var", "  t, u: integer;", "begin",
+                 f"  t := {self.integer_expression(4)} + m;",
+                 f"  u := n * {self.random.randint(2, 9)} - m;"]
+        if index > 0:
+            # Chama uma função declarada antes
+            lines.append(f"  u := u + {self.functions[self.random.randrange(index)]}(0, t);")
+        lines += [f"  if n > 0 then {name} := {name}(n - 1, m + 1) + t mod 97",
+                  f"  else {name} := u", "end;"]
+        return lines
+
+    def procedure(self, index):
+        name = self.procedures[index]
+        return [f"procedure {name}(x: integer; s: string);", "begin",
+                f"  if x > {self.random.randint(0, 100)} then writeln(s, x)",
+                f"  else {self.random.choice(self.integers)} := x + {self.random.randint(1, 9)}", "end;"]
+
+    def subprograms(self):
+        lines = []
+        for index in range(len(self.functions)):
+            lines += self.function(index)
+        for index in range(len(self.procedures)):
+            lines += self.procedure(index)
+        return lines
+
+    def call(self):
+        if self.random.random() < 0.6:
+            function = self.random.choice(self.functions)
+            return f"{self.random.choice(self.integers)} := {function}({self.random.randint(0, 4)}, {self.integer_operand()})"
+        return f"{self.random.choice(self.procedures)}({self.integer_operand()}, 'proc')"
+
+    # ---- Expressões ----
+
+    def integer_operand(self):
+        choice = self.random.random()
+        if choice < 0.45:
+            return self.random.choice(self.integers)
+        if choice < 0.75:
+            return str(self.random.randint(1, 1000))
+        if choice < 0.9:
+            return f"{self.random.choice(self.arrays)}[{self.random.randint(1, ARRAY_SIZE)}]"
+        return f"({self.integer_expression(3)})"
+
+    def integer_expression(self, terms=None):
+        terms = terms or self.random.randint(2, self.expression_terms)
+        parts = [self.integer_operand()]
+        for _ in range(terms - 1):
+            operator = self.random.choice(('+', '-', '*', 'div', 'mod', '+', '-'))
+            operand = self.integer_operand()
+            if operator in ('div', 'mod') and not operand.isdigit():
+                operand = str(self.random.randint(1, 97))  # Divisor constante, nunca 0
+            parts.append(f"{operator} {operand}")
+        return " ".join(parts)
+
+    def condition(self):
+        relational = self.random.choice(('=', '<>', '<', '<=', '>', '>='))
+        comparison = f"({self.integer_expression(3)} {relational} {self.integer_operand()})"
+        choice = self.random.random()
+        if choice < 0.4:
+            return comparison
+        boolean = self.random.choice(self.booleans)
+        if choice < 0.7:
+            return f"{comparison} and not {boolean}"
+        return f"{boolean} or {comparison}"
+
+    # ---- Instruções ----
+
+    def assignment(self):
+        choice = self.random.random()
+        if choice < 0.6:
+            return f"{self.random.choice(self.integers)} := {self.integer_expression()}"
+        if choice < 0.8:
+            array = self.random.choice(self.arrays)
+            index = self.random.randint(1, ARRAY_SIZE)
+            return f"{array}[{index}] := {array}[{index}] + {self.integer_operand()}"
+        return f"{self.random.choice(self.booleans)} := {self.condition()}"
+
+    def output(self):
+        if self.random.random() < 0.5:
+            return f"writeln('valor: ', {self.random.choice(self.integers)})"
+        return f"write({self.random.choice(self.strings)}, ' ')"
+
+    def simple_statement(self):
+        choice = self.random.random()
+        if choice < 0.75:
+            return self.assignment()
+        return self.call() if choice < 0.9 else self.output()
+
+    def statement(self, depth):
+        """Instrução com até `depth` níveis de instruções encaixadas."""
+        if depth <= 0:
+            return self.simple_statement()
+        choice = self.random.random()
+        if choice < 0.45:
+            return self.simple_statement()
+        if choice < 0.65:
+            text = f"if {self.condition()} then {self.statement(depth - 1)}"
+            if self.random.random() < 0.5:
+                text += f" else {self.statement(depth - 1)}"
+            return text
+        if choice < 0.75:
+            # Ciclo com fim garantido: o contador só é alterado aqui
+            counter = self.counters[depth]
+            return (f"begin {counter} := 0; while {counter} < 3 do "
+                    f"begin {counter} := {counter} + 1; {self.statement(depth - 1)} end end")
+        if choice < 0.9:
+            counter = self.counters[depth]
+            array = self.random.choice(self.arrays)
+            if self.random.random() < 0.5:
+                return f"for {counter} := 1 to 10 do {array}[{counter}] := {array}[{counter}] + {counter}"
+            return f"for {counter} := 10 downto 1 do {self.statement(depth - 1)}"
+        inner = "; ".join(self.statement(depth - 1) for _ in range(self.random.randint(1, 3)))
+        return f"begin {inner} end"
+
+    def nested(self, depth):
+        """Blocos if/begin encaixados exatamente `depth` vezes."""
+        text = self.simple_statement()
+        for level in range(depth):
+            text = f"if {self.condition()} then\n{'  ' * (depth - level)}begin {text}; {self.simple_statement()} end"
+        return text
+
+    def body(self):
+        statements = self.initializations()
+        for n in range(self.size):
+            if n % 100 == 99:
+                statements.append(self.nested(self.depth))
+            else:
+                statements.append(self.statement(self.random.randint(0, 3)))
+        statements.append(f"writeln({self.integers[0]})")
+        return statements
+
+    def generate(self):
+        lines = ["program Gerado;"]
+        lines += self.declarations()
+        lines += self.subprograms()
+        lines.append("begin")
+        statements = self.body()
+        lines += [f"  {statement};" for statement in statements[:-1]]
+        lines.append(f"  {statements[-1]}")
+        lines.append("end.")
+        return "\n".join(lines) + "\n"
+
+
+def generate_program(size, seed=0, depth=20, expression_terms=12):
+    """Código fonte de um programa sintético com `size` blocos de instruções."""
+    return ProgramGenerator(size, seed, depth, expression_terms).generate()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Gerador de programas Pascal sintéticos')
+    arg_parser.add_argument('size', type=int, help='Número de blocos de instruções')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--depth', type=int, default=20, help='Profundidade dos blocos encaixados')
+    arg_parser.add_argument('-o', '--output', help='Ficheiro de saída (por omissão, stdout)')
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.size, args.seed, args.depth)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Teste de stress da API de compilação reentrante.
+
+Compila os programas de tests/*.pas (e uma variante com erro de sintaxe de
+cada um) primeiro em série e depois em N threads em simultâneo, várias vezes,
+e verifica que o código gerado e os diagnósticos são idênticos aos da
+compilação em série. Termina com código 1 se houver diferenças.
+
+Uso: python stress_threads.py [--threads 8] [--rounds 50]
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from compiler import Compiler
+
+
+def load_sources():
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, 'tests', '*.pas'))):
+        with open(path) as f:
+            text = f.read()
+        name = os.path.basename(path)
+        sources[name] = text
+        # Variante com um erro de sintaxe, para exercitar o tratamento de erros
+        sources[name + ':erro'] = text.replace(';', ' ;;:', 1)
+    return sources
+
+
+def snapshot(result):
+    """Resumo comparável de um resultado de compilação."""
+    return (result.code, [(d.severity, d.phase, d.message, d.line, d.column) for d in result.diagnostics])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de stress da compilação em threads')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    compiler = Compiler()
+    sources = load_sources()
+    expected = {name: snapshot(compiler.compile_source(text)) for name, text in sources.items()}
+
+    jobs = [name for _ in range(args.rounds) for name in sources]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(lambda name: (name, snapshot(compiler.compile_source(sources[name]))), jobs))
+    elapsed = time.perf_counter() - start
+
+    mismatches = [name for name, result in results if result != expected[name]]
+    print(f"{len(jobs)} compilações em {args.threads} threads: {elapsed:.2f} s, {len(mismatches)} diferenças")
+    for name in sorted(set(mismatches)):
+        print(f"  diferença em {name}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Formato binário compacto para programas EWVM (.ewvb).
+
+Guarda um ewvm.Program tal como o interpretador o usa, pelo que carregar um
+programa não exige descodificar texto: os arrays são lidos diretamente dos
+bytes do ficheiro (array.frombytes).
+
+Estrutura (inteiros em little-endian):
+
+  cabeçalho   'EWVB', versão, typecode dos operandos, número de
+              instruções, de constantes e de labels
+  opcodes     um byte por instrução
+  operandos   um inteiro por instrução, com o menor tipo ('b', 'h', 'i'
+              ou 'q') em que cabem todos os valores; os saltos já estão
+              resolvidos para endereços de instrução
+  constantes  pool de strings de PUSHS/ERR: comprimentos (array 'I') e
+              bytes UTF-8 concatenados
+  labels      endereços (array 'I') e nomes separados por '\n', usados
+              apenas pelo disassembler
+
+Os operandos ficam no array do tipo lido do ficheiro: o interpretador só os
+indexa, pelo que não é preciso convertê-los para 'q'.
+
+Labels com o mesmo endereço são equivalentes depois de resolvidos; no texto
+produzido pelo disassembler, os saltos usam o primeiro deles.
+
+    from bytecode import encode, decode, disassemble
+    data = encode(ewvm.assemble(codigo))
+    program = decode(data)
+    texto = disassemble(program)   # lista de linhas .ewvm
+"""
+
+import sys
+import struct
+from array import array
+
+from ewvm import (Program, EWVMError, INSTRUCTIONS, INT_OPERAND, STRING_OPERAND,
+                  LABEL_OPERAND, assemble)
+
+MAGIC = b'EWVB'
+VERSION = 1
+EXTENSION = '.ewvb'
+
+HEADER = struct.Struct('<4sBcxxIII')
+
+# Tipos de array para os operandos, do mais pequeno para o maior
+OPERAND_TYPES = 'bhiq'
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def _to_bytes(values):
+    if not _LITTLE_ENDIAN and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, data, offset, count):
+    """Lê `count` valores do tipo `typecode` a partir de `offset`. Devolve (array, novo offset)."""
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(data):
+        raise EWVMError("Bytecode truncado")
+    values.frombytes(data[offset:end])
+    if not _LITTLE_ENDIAN and values.itemsize > 1:
+        values.byteswap()
+    return values, end
+
+
+def _operand_type(operands):
+    """Menor typecode em que cabem todos os operandos."""
+    low, high = (min(operands), max(operands)) if operands else (0, 0)
+    for typecode in OPERAND_TYPES:
+        bits = array(typecode).itemsize * 8
+        if -(1 << (bits - 1)) <= low and high < (1 << (bits - 1)):
+            return typecode
+    raise EWVMError("Operando fora do intervalo de 64 bits")
+
+
+def _pack_strings(strings):
+    encoded = [s.encode('utf-8') for s in strings]
+    return _to_bytes(array('I', map(len, encoded))) + b''.join(encoded)
+
+
+def _unpack_strings(data, offset, count):
+    lengths, offset = _from_bytes('I', data, offset, count)
+    strings = []
+    for length in lengths:
+        end = offset + length
+        if end > len(data):
+            raise EWVMError("Bytecode truncado")
+        try:
+            strings.append(str(data[offset:end], 'utf-8'))
+        except UnicodeDecodeError:
+            raise EWVMError("String inválida no bytecode") from None
+        offset = end
+    return strings, offset
+
+
+def encode(program):
+    """Codifica um Program (ou código EWVM em texto) no formato binário."""
+    if not isinstance(program, Program):
+        program = assemble(program)
+    typecode = _operand_type(program.operands)
+    names = list(program.labels)
+    addresses = array('I', (program.labels[name] for name in names))
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, typecode.encode('ascii'),
+                    len(program.opcodes), len(program.constants), len(names)),
+        program.opcodes.tobytes(),
+        _to_bytes(array(typecode, program.operands)),
+        _pack_strings(program.constants),
+        _to_bytes(addresses),
+        '\n'.join(names).encode('utf-8'),
+    ))
+
+
+def decode(data):
+    """Reconstrói um Program a partir dos bytes produzidos por encode()."""
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+        raise EWVMError("Bytecode truncado")
+    magic, version, typecode, count, constant_count, label_count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise EWVMError("Não é um ficheiro de bytecode EWVM")
+    if version != VERSION:
+        raise EWVMError(f"Versão de bytecode não suportada: {version}")
+    typecode = typecode.decode('ascii')
+    if typecode not in OPERAND_TYPES:
+        raise EWVMError(f"Tipo de operando inválido '{typecode}'")
+
+    offset = HEADER.size
+    opcodes, offset = _from_bytes('B', data, offset, count)
+    if opcodes and max(opcodes) >= len(INSTRUCTIONS):
+        raise EWVMError(f"Opcode inválido {max(opcodes)}")
+    operands, offset = _from_bytes(typecode, data, offset, count)
+    constants, offset = _unpack_strings(data, offset, constant_count)
+    addresses, offset = _from_bytes('I', data, offset, label_count)
+    names = str(data[offset:], 'utf-8').split('\n') if label_count else []
+    if len(names) != label_count:
+        raise EWVMError("Tabela de labels inválida")
+    return Program(opcodes, operands, constants, dict(zip(names, addresses)))
+
+
+def is_bytecode(data):
+    """True se `data` (bytes) começa com o identificador do formato binário."""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def save(program, path):
+    """Escreve um Program (ou código EWVM em texto) num ficheiro .ewvb."""
+    with open(path, 'wb') as f:
+        f.write(encode(program))
+
+
+def load(path):
+    """Lê um ficheiro .ewvb."""
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+def disassemble(program):
+    """Converte um Program de volta para as linhas de texto .ewvm."""
+    opcodes, operands, constants = program.opcodes, program.operands, program.constants
+    # Nomes dos labels por endereço (os saltos usam o primeiro)
+    labels_at = {}
+    for name, address in program.labels.items():
+        labels_at.setdefault(address, []).append(name)
+
+    def label_name(address):
+        names = labels_at.get(address)
+        if names is None:
+            # Endereço sem label (programa construído à mão): cria um
+            names = labels_at[address] = [f"L@{address}"]
+        return names[0]
+
+    body = []
+    for address in range(len(opcodes)):
+        name = INSTRUCTIONS[opcodes[address]]
+        operand = operands[address]
+        if name in INT_OPERAND:
+            body.append(f"{name} {operand}")
+        elif name in STRING_OPERAND:
+            body.append(f'{name} "{constants[operand]}"')
+        elif name in LABEL_OPERAND:
+            body.append(f"{name} {label_name(operand)}")
+        else:
+            body.append(name)
+
+    lines = []
+    for address, instruction in enumerate(body):
+        lines.extend(f"{name}:" for name in labels_at.get(address, ()))
+        lines.append(instruction)
+    lines.extend(f"{name}:" for name in labels_at.get(len(body), ()))
+    return lines
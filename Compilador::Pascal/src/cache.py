@@ -0,0 +1,191 @@
+"""
+Cache de compilação em disco.
+
+Cada entrada guarda o resultado da compilação de um ficheiro (diagnósticos
+em <chave>.json e, se foi gerado, o código EWVM em <chave>.ewvm) e é
+identificada pelo hash do código fonte, do nível de otimização e da versão
+do compilador (o hash dos módulos das várias fases).
+Uma alteração a qualquer fase do compilador invalida, assim, todas as
+entradas anteriores.
+
+As entradas ficam numa diretoria configurável (variável de ambiente
+PASCAL_COMPILE_CACHE, por omissão a subdiretoria 'compiled' da cache das
+tabelas do parser). O tamanho total é limitado (PASCAL_COMPILE_CACHE_SIZE,
+em MB, por omissão 64): quando é excedido, são removidas as entradas usadas
+há mais tempo (a data de modificação de cada ficheiro é atualizada sempre
+que a entrada é reutilizada).
+"""
+
+import os
+import json
+import shutil
+import hashlib
+
+from diagnostics import Diagnostics
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos cujo código determina o resultado da compilação
+COMPILER_MODULES = ('lexer', 'parser', 'rdparser', 'visitor', 'semantic', 'optimizer', 'loops', 'codegen', 'peephole', 'diagnostics', 'source')
+
+DEFAULT_MAX_MB = 64
+
+# Versão do formato das entradas (faz parte da chave)
+CACHE_FORMAT = 2
+
+_version = None
+
+def compiler_version():
+    """Hash do código dos módulos do compilador (calculado uma vez por processo)."""
+    global _version
+    if _version is None:
+        digest = hashlib.sha256()
+        for name in COMPILER_MODULES:
+            with open(os.path.join(SRC_DIR, f'{name}.py'), 'rb') as f:
+                digest.update(f.read())
+        _version = digest.hexdigest()[:16]
+    return _version
+
+def default_cache_dir():
+    """Diretoria das entradas da cache de compilação."""
+    cache_dir = os.environ.get('PASCAL_COMPILE_CACHE')
+    if cache_dir:
+        return cache_dir
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pascal-compiler', 'compiled')
+
+def default_max_bytes():
+    try:
+        megabytes = float(os.environ.get('PASCAL_COMPILE_CACHE_SIZE', DEFAULT_MAX_MB))
+    except ValueError:
+        megabytes = DEFAULT_MAX_MB
+    return int(megabytes * 1024 * 1024)
+
+
+class CacheEntry:
+    """Resultado de uma compilação guardado na cache."""
+
+    __slots__ = ('diagnostics', 'code_path')
+
+    def __init__(self, diagnostics, code_path):
+        self.diagnostics = diagnostics  # Diagnostics reconstruídos (com o código fonte)
+        self.code_path = code_path      # Ficheiro .ewvm com o código, ou None se não foi gerado
+
+    @property
+    def code(self):
+        """Lista de instruções (lida do ficheiro), ou None."""
+        if self.code_path is None:
+            return None
+        with open(self.code_path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def copy_code(self, stream):
+        """Copia o código para um ficheiro de texto aberto, sem o carregar todo."""
+        with open(self.code_path, 'r', encoding='utf-8') as f:
+            shutil.copyfileobj(f, stream)
+
+
+class CompilationCache:
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = default_max_bytes() if max_bytes is None else max_bytes
+
+    def key(self, source, opt_level=0):
+        """Chave de uma compilação: hash da versão do compilador, opções e fonte."""
+        digest = hashlib.sha256()
+        digest.update(f'{CACHE_FORMAT}:{compiler_version()}:O{opt_level}:'.encode('utf-8'))
+        digest.update(source.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key, extension='.json'):
+        return os.path.join(self.directory, f'{key}{extension}')
+
+    def get(self, key, source):
+        """Devolve a CacheEntry de `key`, ou None se não existir (ou for inválida)."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            code_path = self._path(key, '.ewvm') if data['code'] else None
+            if code_path and not os.path.exists(code_path):
+                return None
+            os.utime(path)  # Marca a entrada como usada recentemente
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        diagnostics = Diagnostics(source)
+        for severity, phase, message, line, pos in data['diagnostics']:
+            # A mensagem já vem formatada: as chavetas não podem ser
+            # interpretadas de novo como campos do modelo
+            template = message.replace('{', '{{').replace('}', '}}')
+            diagnostics.report(severity, phase, template, line=line, pos=pos)
+        return CacheEntry(diagnostics, code_path)
+
+    def _write(self, path, write):
+        # Escrita atómica: processos concorrentes (modo batch) nunca leem
+        # uma entrada incompleta
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            write(f)
+        os.replace(temp_path, path)
+
+    def put(self, key, diagnostics, code=None, code_path=None):
+        """Guarda o resultado de uma compilação. Erros de escrita são ignorados.
+
+        O código pode ser dado como lista de instruções (`code`) ou como um
+        ficheiro .ewvm já escrito (`code_path`), que é copiado para a cache.
+        """
+        data = {
+            'diagnostics': [(d.severity, d.phase, d.message, d.line, d.pos) for d in diagnostics],
+            'code': code is not None or code_path is not None,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # O código é escrito antes do .json: uma entrada visível tem sempre o código
+            if code is not None:
+                self._write(self._path(key, '.ewvm'), lambda f: f.writelines(f'{line}\n' for line in code))
+            elif code_path is not None:
+                def copy(f):
+                    with open(code_path, 'r', encoding='utf-8') as source:
+                        shutil.copyfileobj(source, f)
+                self._write(self._path(key, '.ewvm'), copy)
+            self._write(self._path(key), lambda f: json.dump(data, f))
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até a cache caber no limite."""
+        entries = {}  # chave -> [mtime do .json, tamanho total]
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    key, extension = os.path.splitext(entry.name)
+                    if extension not in ('.json', '.ewvm'):
+                        continue
+                    stat = entry.stat()
+                    info = entries.setdefault(key, [0, 0])
+                    if extension == '.json':
+                        info[0] = stat.st_mtime
+                    info[1] += stat.st_size
+                    total += stat.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            for extension in ('.json', '.ewvm'):
+                try:
+                    os.remove(self._path(key, extension))
+                except OSError:
+                    pass  # Já removido por outro processo (ou sem código)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove todas as entradas."""
+        self.max_bytes, max_bytes = 0, self.max_bytes
+        self.evict()
+        self.max_bytes = max_bytes
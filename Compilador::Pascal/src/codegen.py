@@ -1,15 +1,48 @@
-class CodeGenerator:
-    def __init__(self, symbol_table):
+from visitor import Visitor
+
+
+class StreamWriter:
+    """Destino de instruções que as escreve num ficheiro de texto à medida
+    que são geradas (ficheiro, sys.stdout, pipe...).
+
+    As instruções são juntadas em blocos de `batch` linhas e cada bloco é
+    escrito com uma única chamada a write; em memória fica apenas o bloco
+    corrente. Tem a mesma interface (append) que a lista usada por omissão.
+    """
+
+    def __init__(self, stream, batch=4096):
+        self.stream = stream
+        self.batch = batch
+        self.pending = []
+        self.count = 0  # Número de instruções escritas
+
+    def append(self, instruction):
+        pending = self.pending
+        pending.append(instruction)
+        if len(pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """Escreve as instruções pendentes."""
+        if self.pending:
+            self.count += len(self.pending)
+            self.pending.append('')  # Quebra de linha depois da última instrução
+            self.stream.write('\n'.join(self.pending))
+            self.pending.clear()
+        self.stream.flush()
+
+
+class CodeGenerator(Visitor):
+    prefix = 'generate_'  # Cada tipo de nó é tratado por generate_<tipo>
+
+    def __init__(self, symbol_table, output=None):
         self.symbol_table = symbol_table  # Tabela de símbolos do programa
-        self.code = []  # Lista de instruções de código geradas
+        # Destino das instruções geradas: uma lista (por omissão) ou um StreamWriter
+        self.code = [] if output is None else output
         self.label_counter = 0  # Contador para criação de labels
         self.string_counter = 0  # Contador para constantes de string
         self.strings = {}  # Armazenamento para constantes de string
-        self.variable_offsets = {}  # Mapeamento de variáveis para endereços
-        self.current_offset = 0  # Offset atual para variáveis no stack
-        self.current_scope = 'global'  # Escopo atual (global, procedimento, função)
-        self.procedure_starts = {}  # Mapeamento de procedimentos para seus pontos de entrada
-        self.function_returns = {}  # Mapeamento de funções para seus tipos de retorno
+        self.subprogram_labels = {}  # Symbol de cada função/procedimento -> label do seu código
     
     def generate(self, ast):
         """Gera código a partir da AST."""
@@ -36,18 +69,6 @@ class CodeGenerator:
         # Em EWVM, as strings são definidas diretamente com PUSHS
         return f'"{string_value}"'
     
-    def visit(self, node):
-        """Visita um nó da AST."""
-        method_name = f'generate_{node.type}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-    
-    def generic_visit(self, node):
-        """Método genérico para nós sem visitantes específicos."""
-        for child in node.children:
-            if child:
-                self.visit(child)
-    
     def generate_Program(self, node):
         """Gera código para um nó de programa."""
         # Adiciona PUSHIs iniciais necessários para EWVM
@@ -56,7 +77,7 @@ class CodeGenerator:
         self.emit("START")
         
         # Gera código para o bloco do programa
-        self.visit(node.children[1])
+        yield node.children[1]
         
         # Finaliza o programa
         self.emit("STOP")
@@ -64,33 +85,36 @@ class CodeGenerator:
     def generate_ProgramBlock(self, node):
         """Gera código para um bloco de programa (inclui declarações de subprogramas)."""
         # Processa declarações de variáveis
-        self.visit(node.children[0])  # Declarations
+        yield node.children[0]  # Declarations
         
         # Se existem declarações de subprogramas, processa-as
         if len(node.children) > 2:
+            # Variáveis globais declaradas depois dos subprogramas
+            yield node.children[2]  # Declarations
+            
             # Pula as declarações de subprogramas por enquanto
             subprogram_label = self.create_label()
             self.emit(f"JUMP {subprogram_label}")
             
             # Processa as declarações de subprogramas
-            self.visit(node.children[1])  # SubprogramDeclarations
+            yield node.children[1]  # SubprogramDeclarations
             
             # Marca o início do bloco principal
             self.emit(f"{subprogram_label}:")
             
             # Gera código para o bloco principal
-            self.visit(node.children[2])  # CompoundStatement
+            yield node.children[3]  # CompoundStatement
         else:
             # Não há subprogramas, apenas gera código para o bloco principal
-            self.visit(node.children[1])  # CompoundStatement
+            yield node.children[1]  # CompoundStatement
     
     def generate_Block(self, node):
         """Gera código para um bloco (declarações + instruções)."""
         # Processa declarações para alocar espaço na pilha
-        self.visit(node.children[0])  # Declarations
+        yield node.children[0]  # Declarations
         
         # Gera código para instruções
-        self.visit(node.children[1])  # CompoundStatement
+        yield node.children[1]  # CompoundStatement
     
     def generate_Declarations(self, node):
         """Gera código para declarações de variáveis."""
@@ -107,136 +131,125 @@ class CodeGenerator:
                 else:
                     total_space += self.process_declaration(child)
         
-        # Aloca espaço na pilha para as variáveis
+        # Reserva espaço para as variáveis: na zona global da pilha ou, num
+        # subprograma, no frame da chamada (a partir de fp)
         if total_space > 0:
-            self.emit(f"ALLOC {total_space}")
+            self.emit(f"PUSHN {total_space}")
     
     def process_declaration(self, node):
         """Processa uma declaração e retorna o espaço necessário."""
         if node.type != 'Declaration':
             return 0
         
-        id_list = node.children[0]
-        type_node = node.children[1]
-        
-        # Obtém informações do tipo
-        size_per_var = self.get_type_size(type_node)
-        total_size = 0
-        
-        # Processa cada identificador
-        for id_node in id_list.children:
-            var_name = id_node.leaf
-            
-            # Armazena o offset da variável
-            self.variable_offsets[var_name] = self.current_offset
-            self.emit_comment(f"Variable {var_name} at offset {self.current_offset}")
-            
-            # Atualiza os offsets
-            self.current_offset += size_per_var
-            total_size += size_per_var
-        
-        return total_size
-    
-    def get_type_size(self, type_node):
-        """Retorna o tamanho em palavras do tipo especificado."""
-        if type_node.type == 'Type':
-            # Tipos simples (integer, boolean, string) ocupam 1 palavra
-            return 1
-        elif type_node.type == 'ArrayType':
-            # Tamanho do array é (limite_superior - limite_inferior + 1) * tamanho_elemento
-            range_node = type_node.children[0]
-            elem_type_node = type_node.children[1]
-            
-            range_info = range_node.leaf  # (min, max)
-            array_length = range_info[1] - range_info[0] + 1
-            elem_size = self.get_type_size(elem_type_node)
-            
-            return array_length * elem_size
-        
-        # Tipo desconhecido
-        return 1
+        # Os offsets das variáveis foram atribuídos pela análise semântica
+        return sum(id_node.symbol.size for id_node in node.children[0].children)
+    
+    def emit_load(self, symbol):
+        """Empilha o valor de uma variável.
+
+        As globais são endereçadas a partir de gp; parâmetros, variáveis
+        locais e o valor de retorno de uma função, a partir do fp da
+        chamada corrente.
+        """
+        if symbol.depth == 0:
+            self.emit(f"PUSHG {symbol.offset}")
+        else:
+            self.emit(f"PUSHL {symbol.offset}")
+    
+    def emit_store(self, symbol):
+        """Guarda o topo da pilha numa variável."""
+        if symbol.depth == 0:
+            self.emit(f"STOREG {symbol.offset}")
+        else:
+            self.emit(f"STOREL {symbol.offset}")
     
     def generate_CompoundStatement(self, node):
         """Gera código para um bloco composto (begin...end)."""
         # Gera código para a lista de instruções
         if node.children:
-            self.visit(node.children[0])
+            yield node.children[0]
     
     def generate_StatementList(self, node):
         """Gera código para uma lista de instruções."""
         for child in node.children:
             if child and child.type != 'Empty':
-                self.visit(child)
+                yield child
     
     def generate_Assignment(self, node):
         """Gera código para uma atribuição."""
         variable_node = node.children[0]
         expression_node = node.children[1]
         
-        # Gera código para calcular o valor da expressão
-        # O resultado fica no topo da pilha
-        self.visit(expression_node)
-        
-        # Armazena o resultado na variável
         if variable_node.type == 'Variable':
-            var_name = variable_node.leaf
-            var_offset = self.variable_offsets.get(var_name, 0)
-            self.emit(f"STOREG {var_offset}")  # Mudou de STORE para STOREG
-        elif variable_node.type == 'ArrayAccess':
-            array_name = variable_node.children[0].leaf
-            array_base = self.variable_offsets.get(array_name, 0)
-            
-            # Primeiro, calcula o índice
-            self.visit(variable_node.children[1])
+            # Gera código para calcular o valor da expressão
+            # O resultado fica no topo da pilha
+            yield expression_node
             
-            # Ajusta o índice considerando o limite inferior do array
-            # (assume que temos essa informação da tabela de símbolos)
-            array_info = self.symbol_table.lookup(array_name)
-            if array_info and 'type' in array_info and array_info['type'].get('kind') == 'array':
-                lower_bound = array_info['type']['range'][0]
-                if lower_bound != 0:
-                    self.emit(f"PUSHI {lower_bound}")
-                    self.emit("SUB")
-            
-            # Calcula o endereço: base + índice
-            self.emit(f"PUSHG {array_base}")  # Mudou de PUSHI para PUSHG
-            self.emit("ADD")  # Poderia ser PADD para EWVM
-            
-            # Agora temos o endereço no topo da pilha, trocamos com o valor a armazenar
-            self.emit("SWAP")
-            
-            # Armazena o valor no endereço calculado
+            # Armazena o resultado na variável
+            self.emit_store(variable_node.symbol)
+        elif variable_node.type == 'ArrayAccess':
+            # STOREN retira da pilha o valor, o índice e o endereço base
+            yield from self.emit_array_element(variable_node)
+            yield expression_node
             self.emit("STOREN")
+        elif variable_node.type == 'Dereference':
+            # Elemento a partir do endereço numa temporária (otimização de ciclos)
+            yield variable_node.children[0]
+            yield expression_node
+            self.emit(f"STORE {variable_node.leaf}")
     
     def generate_Variable(self, node):
         """Gera código para carregar o valor de uma variável."""
-        var_name = node.leaf
-        var_offset = self.variable_offsets.get(var_name, 0)
-        self.emit(f"PUSHG {var_offset}")  # Mudou de LOAD para PUSHG
+        self.emit_load(node.symbol)
     
-    def generate_ArrayAccess(self, node):
-        """Gera código para acessar um elemento de array."""
-        array_name = node.children[0].leaf
-        array_base = self.variable_offsets.get(array_name, 0)
+    def emit_array_element(self, node):
+        """Empilha o endereço base de um array e o índice (já ajustado) do elemento.
+
+        Os elementos do array ocupam posições consecutivas da zona global,
+        a partir do offset do array; o par (endereço, índice) é consumido por
+        LOADN ou STOREN.
+        """
+        symbol = node.symbol
+        
+        # Endereço base: gp (ou fp) + offset do array
+        self.emit("PUSHGP" if symbol.depth == 0 else "PUSHFP")
+        self.emit(f"PUSHI {symbol.offset}")
+        self.emit("PADD")
         
         # Calcula o índice
-        self.visit(node.children[1])
+        yield node.children[1]
         
         # Ajusta o índice considerando o limite inferior do array
-        array_info = self.symbol_table.lookup(array_name)
-        if array_info and 'type' in array_info and array_info['type'].get('kind') == 'array':
-            lower_bound = array_info['type']['range'][0]
-            if lower_bound != 0:
-                self.emit(f"PUSHI {lower_bound}")
-                self.emit("SUB")
-        
-        # Calcula o endereço: base + índice
-        self.emit(f"PUSHG {array_base}")  # Mudou de PUSHI para PUSHG
-        self.emit("ADD")  # Poderia ser PADD para EWVM
+        lower_bound = symbol.type['range'][0]
+        if lower_bound != 0:
+            self.emit(f"PUSHI {lower_bound}")
+            self.emit("SUB")
+
+    def generate_ArrayAccess(self, node):
+        """Gera código para acessar um elemento de array."""
+        yield from self.emit_array_element(node)
         
         # Carrega o valor do endereço calculado
         self.emit("LOADN")
     
+    def generate_ElementAddress(self, node):
+        """Gera código para o endereço de um elemento de array (otimização de ciclos)."""
+        yield from self.emit_array_element(node)
+        self.emit("PADD")
+    
+    def generate_Dereference(self, node):
+        """Gera código para ler o elemento a `node.leaf` posições do endereço numa temporária."""
+        yield node.children[0]
+        self.emit(f"LOAD {node.leaf}")
+    
+    def generate_AddressIncrement(self, node):
+        """Avança o endereço guardado numa temporária `node.leaf` elementos."""
+        symbol = node.children[0].symbol
+        self.emit_load(symbol)
+        self.emit(f"PUSHI {node.leaf}")
+        self.emit("PADD")
+        self.emit_store(symbol)
+    
     def generate_IntegerConstant(self, node):
         """Gera código para uma constante inteira."""
         value = node.leaf
@@ -255,8 +268,8 @@ class CodeGenerator:
     def generate_BinaryOperation(self, node):
         """Gera código para uma operação binária."""
         # Gera código para os operandos
-        self.visit(node.children[0])
-        self.visit(node.children[1])
+        yield node.children[0]
+        yield node.children[1]
         
         # Aplica o operador
         operator = node.leaf
@@ -290,10 +303,15 @@ class CodeGenerator:
         elif operator == 'or':
             self.emit("OR")
     
+    def generate_UnaryOperation(self, node):
+        """Gera código para uma operação unária (not)."""
+        yield node.children[0]
+        self.emit("NOT")
+    
     def generate_IfStatement(self, node):
         """Gera código para uma instrução if."""
         # Gera código para a condição
-        self.visit(node.children[0])
+        yield node.children[0]
         
         # Cria labels para os saltos
         else_label = self.create_label()
@@ -303,7 +321,7 @@ class CodeGenerator:
         self.emit(f"JZ {else_label}")
         
         # Gera código para o bloco then
-        self.visit(node.children[1])
+        yield node.children[1]
         
         # Após o bloco then, salta para o fim do if
         self.emit(f"JUMP {end_if_label}")
@@ -313,7 +331,7 @@ class CodeGenerator:
         
         # Se houver um bloco else, gera código para ele
         if len(node.children) > 2:
-            self.visit(node.children[2])
+            yield node.children[2]
         
         # Marca o fim do if
         self.emit(f"{end_if_label}:")
@@ -328,13 +346,13 @@ class CodeGenerator:
         self.emit(f"{start_while}:")
         
         # Gera código para a condição
-        self.visit(node.children[0])
+        yield node.children[0]
         
         # Se a condição for falsa, salta para o fim do loop
         self.emit(f"JZ {end_while}")
         
         # Gera código para o corpo do loop
-        self.visit(node.children[1])
+        yield node.children[1]
         
         # Volta para verificar a condição novamente
         self.emit(f"JUMP {start_while}")
@@ -342,6 +360,22 @@ class CodeGenerator:
         # Marca o fim do loop
         self.emit(f"{end_while}:")
     
+    def generate_RepeatStatement(self, node):
+        """Gera código para um ciclo com o teste no fim (repete até a condição ser verdadeira).
+
+        Não há repeat...until na gramática: estes ciclos são produzidos pela
+        otimização de ciclos a partir de for e while.
+        """
+        start_repeat = self.create_label()
+        self.emit(f"{start_repeat}:")
+        
+        # Gera código para o corpo do loop
+        yield node.children[0]
+        
+        # Enquanto a condição de saída for falsa, volta ao início
+        yield node.children[1]
+        self.emit(f"JZ {start_repeat}")
+    
     def generate_ForStatement(self, node):
         """Gera código para uma instrução for."""
         var_node = node.children[0]
@@ -350,15 +384,14 @@ class CodeGenerator:
         body = node.children[3]
         direction = node.leaf  # 'to' ou 'downto'
         
-        var_name = var_node.leaf
-        var_offset = self.variable_offsets.get(var_name, 0)
+        symbol = var_node.symbol
         
         # Calcula o valor inicial e atribui à variável de controle
-        self.visit(start_expr)
-        self.emit(f"STOREG {var_offset}")  # Mudou de STORE para STOREG
+        yield start_expr
+        self.emit_store(symbol)
         
-        # Calcula o valor final (limite) e guarda no stack
-        self.visit(end_expr)
+        # Calcula o valor final (limite) uma única vez e guarda-o no stack
+        yield end_expr
         
         # Cria labels para os saltos
         start_loop = self.create_label()
@@ -367,38 +400,38 @@ class CodeGenerator:
         # Marca o início do loop
         self.emit(f"{start_loop}:")
         
-        # Compara a variável de controle com o limite
-        self.emit(f"PUSHG {var_offset}")  # Mudou de LOAD para PUSHG
+        # Compara uma cópia do limite com a variável de controle
+        self.emit("DUP 1")
+        self.emit_load(symbol)
         
-        # A comparação depende se é 'to' (<=) ou 'downto' (>=)
+        # 'to': limite >= variável; 'downto': limite <= variável
         if direction == 'to':
-            self.emit("SWAP")
-            self.emit("INFEQ")
-        else:  # downto
-            self.emit("SWAP")
             self.emit("SUPEQ")
+        else:  # downto
+            self.emit("INFEQ")
         
         # Se a condição for falsa, salta para o fim do loop
         self.emit(f"JZ {end_loop}")
         
         # Gera código para o corpo do loop
-        self.visit(body)
+        yield body
         
         # Incrementa ou decrementa a variável de controle
-        self.emit(f"PUSHG {var_offset}")  # Mudou de LOAD para PUSHG
+        self.emit_load(symbol)
         if direction == 'to':
             self.emit("PUSHI 1")
             self.emit("ADD")
         else:  # downto
             self.emit("PUSHI 1")
             self.emit("SUB")
-        self.emit(f"STOREG {var_offset}")  # Mudou de STORE para STOREG
+        self.emit_store(symbol)
         
         # Volta para verificar a condição novamente
         self.emit(f"JUMP {start_loop}")
         
-        # Marca o fim do loop
+        # Marca o fim do loop e retira o limite do stack
         self.emit(f"{end_loop}:")
+        self.emit("POP 1")
     
     def generate_IOCall(self, node):
         """Gera código para uma chamada de procedimento de I/O (write, writeln, read, readln)."""
@@ -410,7 +443,7 @@ class CodeGenerator:
                 expr_list = node.children[0]
                 for expr in expr_list.children:
                     # Avalia a expressão
-                    self.visit(expr)
+                    yield expr
                     
                     # Imprime o valor baseado em seu tipo
                     if expr.type == 'StringConstant':
@@ -431,177 +464,84 @@ class CodeGenerator:
                 var_list = node.children[0]
                 for var in var_list.children:
                     if var.type == 'Variable':
-                        var_name = var.leaf
-                        var_offset = self.variable_offsets.get(var_name, 0)
-                        
                         # Lê um valor do input e armazena na variável
                         self.emit("READ")
                         self.emit("ATOI")  # Adicionou conversão para inteiro
-                        self.emit(f"STOREG {var_offset}")  # Mudou de STORE para STOREG
+                        self.emit_store(var.symbol)
                     elif var.type == 'ArrayAccess':
-                        array_name = var.children[0].leaf
-                        array_base = self.variable_offsets.get(array_name, 0)
-                        
-                        # Calcula o índice do array
-                        self.visit(var.children[1])
-                        
-                        # Ajusta o índice considerando o limite inferior
-                        array_info = self.symbol_table.lookup(array_name)
-                        if array_info and 'type' in array_info and array_info['type'].get('kind') == 'array':
-                            lower_bound = array_info['type']['range'][0]
-                            if lower_bound != 0:
-                                self.emit(f"PUSHI {lower_bound}")
-                                self.emit("SUB")
-                        
-                        # Calcula o endereço: base + índice
-                        self.emit(f"PUSHG {array_base}")  # Mudou de PUSHI para PUSHG
-                        self.emit("ADD")  # Poderia ser PADD para EWVM
+                        # Endereço e índice do elemento
+                        yield from self.emit_array_element(var)
                         
                         # Lê um valor e armazena no endereço calculado
                         self.emit("READ")
                         self.emit("ATOI")  # Adicionou conversão para inteiro
-                        self.emit("SWAP")
                         self.emit("STOREN")
     
+    def emit_call(self, node):
+        """Empilha os argumentos e chama o subprograma; retira depois os argumentos."""
+        args = node.children[0].children if node.children else []
+        for expr in args:
+            yield expr
+        
+        self.emit(f"PUSHA {self.subprogram_labels[node.symbol]}")
+        self.emit("CALL")
+        if args:
+            self.emit(f"POP {len(args)}")
+    
     def generate_ProcedureCall(self, node):
         """Gera código para uma chamada de procedimento."""
-        proc_name = node.leaf
-        
-        # Avalia e empilha os argumentos, se houver
-        if node.children:
-            expr_list = node.children[0]
-            for expr in expr_list.children:
-                self.visit(expr)
-        
-        # Chama o procedimento
-        if proc_name in self.procedure_starts:
-            proc_label = self.procedure_starts[proc_name]
-            self.emit(f"PUSHA {proc_label}")
-            self.emit("CALL")
+        yield from self.emit_call(node)
+    
+    def generate_FunctionCall(self, node):
+        """Gera código para uma chamada de função."""
+        # Lugar do valor de retorno, por baixo dos argumentos
+        self.emit("PUSHI 0")
+        yield from self.emit_call(node)
+    
+    def generate_SubprogramDeclarations(self, node):
+        """Gera o código de cada função e procedimento."""
+        for child in node.children:
+            yield child
+    
+    def emit_subprogram(self, node, body):
+        """Gera o código de um subprograma: label, variáveis locais, corpo e RETURN.
+
+        CALL faz fp = sp, pelo que os argumentos (e o valor de retorno) ficam
+        por baixo de fp e as variáveis locais (PUSHN do bloco) a partir de fp.
+        Cada chamada tem o seu próprio frame, o que permite recursão; RETURN
+        descarta as variáveis locais.
+        """
+        label = self.create_label()
+        # O label é registado antes do corpo, para as chamadas recursivas
+        self.subprogram_labels[node.children[0].symbol] = label
+        self.emit(f"{label}:")
+        yield body
+        self.emit("RETURN")
     
     def generate_ProcedureDeclaration(self, node):
         """Gera código para uma declaração de procedimento."""
-        proc_name = node.children[0].leaf
-        param_list = node.children[1]
-        proc_body = node.children[2]
-        
-        # Cria um label para o início do procedimento
-        proc_label = self.create_label()
-        self.procedure_starts[proc_name] = proc_label
-        
-        # Guarda offset atual de variáveis
-        old_offset = self.current_offset
-        old_variables = self.variable_offsets.copy()
-        
-        # Reseta o offset para o escopo local do procedimento
-        self.current_offset = 0
-        self.variable_offsets.clear()
-        
-        # Marca o início do código do procedimento
-        self.emit(f"{proc_label}:")
-        
-        # Processamento de parâmetros
-        param_count = 0
-        if param_list and param_list.children:
-            for param in param_list.children:
-                id_list = param.children[0]
-                for id_node in id_list.children:
-                    param_name = id_node.leaf
-                    # Parâmetros começam em offset negativo relativo ao frame pointer
-                    self.variable_offsets[param_name] = -2 - param_count
-                    param_count += 1
-        
-        # Gera código para o corpo do procedimento
-        self.visit(proc_body)
-        
-        # Retorno do procedimento
-        self.emit("RETURN")
-        
-        # Restaura o contexto anterior
-        self.current_offset = old_offset
-        self.variable_offsets = old_variables
+        yield from self.emit_subprogram(node, node.children[2])
     
     def generate_FunctionDeclaration(self, node):
-        """Gera código para uma declaração de função."""
-        func_name = node.children[0].leaf
-        param_list = node.children[1]
-        return_type = node.children[2]
-        func_body = node.children[3]
-        
-        # Semelhante à declaração de procedimento, mas com retorno
-        func_label = self.create_label()
-        self.procedure_starts[func_name] = func_label
-        self.function_returns[func_name] = return_type.leaf
-        
-        # Guarda offset atual de variáveis
-        old_offset = self.current_offset
-        old_variables = self.variable_offsets.copy()
-        
-        # Reseta o offset para o escopo local da função
-        self.current_offset = 0
-        self.variable_offsets.clear()
-        
-        # Marca o início do código da função
-        self.emit(f"{func_label}:")
-        
-        # Processamento de parâmetros
-        param_count = 0
-        if param_list and param_list.children:
-            for param in param_list.children:
-                id_list = param.children[0]
-                for id_node in id_list.children:
-                    param_name = id_node.leaf
-                    self.variable_offsets[param_name] = -2 - param_count
-                    param_count += 1
-        
-        # Reserva espaço para o valor de retorno
-        return_var_offset = self.current_offset
-        self.variable_offsets['$return'] = return_var_offset
-        self.current_offset += 1
-        self.emit("PUSHI 0")  # Inicializa o valor de retorno
-        
-        # Gera código para o corpo da função
-        self.visit(func_body)
-        
-        # Carrega o valor de retorno antes de retornar
-        self.emit(f"PUSHG {return_var_offset}")  # Mudou de LOAD para PUSHG
-        self.emit("RETURN")
-        
-        # Restaura o contexto anterior
-        self.current_offset = old_offset
-        self.variable_offsets = old_variables
-    
-    def generate_FunctionCall(self, node):
-        """Gera código para uma chamada de função."""
-        func_name = node.leaf
-        
-        # Avalia e empilha os argumentos, se houver
-        if node.children:
-            expr_list = node.children[0]
-            for expr in expr_list.children:
-                self.visit(expr)
-        
-        # Chama a função
-        if func_name in self.procedure_starts:
-            func_label = self.procedure_starts[func_name]
-            self.emit(f"PUSHA {func_label}")
-            self.emit("CALL")
-        else:
-            # Tratamento para funções predefinidas como abs, sqr, etc.
-            if func_name.lower() == 'abs':
-                # Implementação simplificada de abs
-                label_skip = self.create_label()
-                self.emit("DUP")
-                self.emit("PUSHI 0")
-                self.emit("INF")
-                self.emit(f"JZ {label_skip}")
-                self.emit("PUSHI -1")
-                self.emit("MUL")
-                self.emit(f"{label_skip}:")
-            # Outras funções predefinidas podem ser adicionadas aqui
+        """Gera código para uma declaração de função.
+
+        O valor de retorno é atribuído no corpo ao nome da função, que é a
+        variável no lugar reservado por quem chama.
+        """
+        yield from self.emit_subprogram(node, node.children[3])
 
 def generate_code(ast, symbol_table):
     """Função principal para gerar código a partir de uma AST."""
     generator = CodeGenerator(symbol_table)
     code = generator.generate(ast)
-    return code
\ No newline at end of file
+    return code
+
+def write_code(ast, symbol_table, stream):
+    """Gera o código diretamente para `stream` (sem o guardar em memória).
+
+    Devolve o número de instruções escritas.
+    """
+    writer = StreamWriter(stream)
+    CodeGenerator(symbol_table, writer).generate(ast)
+    writer.flush()
+    return writer.count
\ No newline at end of file
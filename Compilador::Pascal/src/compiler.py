@@ -0,0 +1,79 @@
+"""
+API de compilação em processo.
+
+O Compiler executa todas as fases (lexer, parser, análise semântica e
+geração de código) sem escrever no ecrã e sem estado global partilhado:
+cada compilação usa o seu próprio lexer (lexer.clone()), a sua cópia do
+parser e os seus diagnósticos. Pode, por isso, ser usado a partir de várias
+threads em simultâneo, por exemplo num servidor de compilação.
+
+    from compiler import compile_source
+    result = compile_source(texto)
+    if result.ok:
+        print("\\n".join(result.code))
+"""
+
+from diagnostics import Diagnostics
+from parser import parse
+from semantic import SemanticAnalyzer
+from codegen import generate_code
+from optimizer import optimize_ast
+import peephole
+
+
+class Result:
+    """Resultado de uma compilação."""
+
+    __slots__ = ('ast', 'symbol_table', 'code', 'diagnostics')
+
+    def __init__(self, diagnostics, ast=None, symbol_table=None, code=None):
+        self.diagnostics = diagnostics    # Erros e avisos de todas as fases
+        self.ast = ast
+        self.symbol_table = symbol_table
+        self.code = code                  # Lista de instruções EWVM (None se houve erros)
+
+    @property
+    def ok(self):
+        return self.code is not None and not self.diagnostics.has_errors
+
+    @property
+    def errors(self):
+        return self.diagnostics.errors()
+
+    @property
+    def warnings(self):
+        return self.diagnostics.warnings()
+
+
+class Compiler:
+    """Compilador reentrante: uma instância pode ser partilhada entre threads."""
+
+    def __init__(self, opt_level=0):
+        self.opt_level = opt_level  # Nível de otimização (1: simplificação da AST e peephole)
+
+    def compile_source(self, text):
+        """Compila código fonte Pascal e devolve um Result."""
+        diagnostics = Diagnostics(text)
+
+        ast = parse(text, diagnostics)
+        if ast is None:
+            return Result(diagnostics, ast)
+
+        # Com erros de sintaxe, a AST é parcial: a análise semântica corre na
+        # mesma, para juntar os seus erros aos do parser
+        analyzer = SemanticAnalyzer(diagnostics)
+        analyzer.analyze(ast)
+        if diagnostics.has_errors:
+            return Result(diagnostics, ast, analyzer.current_scope)
+
+        if self.opt_level > 0:
+            ast, _ = optimize_ast(ast)
+        code = generate_code(ast, analyzer.current_scope)
+        if self.opt_level > 0:
+            code = peephole.optimize(code, self.opt_level)
+        return Result(diagnostics, ast, analyzer.current_scope, code)
+
+
+def compile_source(text, opt_level=0):
+    """Compila código fonte Pascal com um Compiler novo."""
+    return Compiler(opt_level).compile_source(text)
@@ -0,0 +1,107 @@
+"""
+Canal de diagnósticos do compilador.
+
+Os erros e avisos das várias fases (lexer, parser, análise semântica) são
+registados num objeto Diagnostics partilhado entre elas. Cada diagnóstico
+guarda apenas o modelo da mensagem, os argumentos e a posição no código
+fonte: o texto, a linha e a coluna só são calculados quando são pedidos.
+Nada é escrito no ecrã; cabe a quem chama o compilador decidir o que fazer
+com os diagnósticos.
+"""
+
+from source import LineIndex
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+class Diagnostic:
+    __slots__ = ('severity', 'phase', 'template', 'args', 'pos', 'source', '_line')
+
+    def __init__(self, severity, phase, template, args, line=None, pos=None, source=None):
+        self.severity = severity  # ERROR ou WARNING
+        self.phase = phase        # 'lexer', 'parser', 'semantic', ...
+        self.template = template  # Modelo da mensagem (str.format)
+        self.args = args
+        self.pos = pos            # Posição (lexpos) no código fonte, se conhecida
+        self.source = source
+        self._line = line
+
+    @property
+    def line(self):
+        """Linha do diagnóstico (calculada a partir da posição, se necessário)."""
+        if self._line is None and self.pos is not None and self.source is not None:
+            if isinstance(self.source, LineIndex):
+                self._line = self.source.line(self.pos)
+            else:
+                self._line = self.source.count('\n', 0, self.pos) + 1
+        return self._line
+
+    @property
+    def column(self):
+        """Coluna do diagnóstico (1 = primeiro carácter da linha)."""
+        if self.pos is None or self.source is None:
+            return None
+        if isinstance(self.source, LineIndex):
+            return self.source.column(self.pos)
+        return self.pos - self.source.rfind('\n', 0, self.pos)
+
+    @property
+    def message(self):
+        """Texto do diagnóstico; o modelo pode referir {line} e {column}."""
+        return self.template.format(*self.args, line=self.line, column=self.column)
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"Diagnostic({self.severity}, {self.phase}, {self.message!r}, line={self.line}, column={self.column})"
+
+
+class Diagnostics:
+    """Coleção de diagnósticos de uma compilação."""
+
+    def __init__(self, source=None):
+        self.source = source  # Código fonte (ou LineIndex), usado para calcular linhas e colunas
+        self.items = []
+
+    def report(self, severity, phase, template, *args, line=None, pos=None):
+        """Regista um diagnóstico e devolve-o."""
+        diagnostic = Diagnostic(severity, phase, template, args, line, pos, self.source)
+        self.items.append(diagnostic)
+        return diagnostic
+
+    def error(self, phase, template, *args, line=None, pos=None):
+        return self.report(ERROR, phase, template, *args, line=line, pos=pos)
+
+    def warning(self, phase, template, *args, line=None, pos=None):
+        return self.report(WARNING, phase, template, *args, line=line, pos=pos)
+
+    @property
+    def has_errors(self):
+        return any(d.severity == ERROR for d in self.items)
+
+    def errors(self, phase=None):
+        """Lista de erros, opcionalmente apenas de uma fase."""
+        return [d for d in self.items if d.severity == ERROR and (phase is None or d.phase == phase)]
+
+    def warnings(self, phase=None):
+        """Lista de avisos, opcionalmente apenas de uma fase."""
+        return [d for d in self.items if d.severity == WARNING and (phase is None or d.phase == phase)]
+
+    def sort_from(self, start):
+        """Ordena pela posição os diagnósticos registados a partir do índice `start`.
+
+        A ordenação é estável; os diagnósticos sem posição (p.ex. o fim de
+        ficheiro inesperado) ficam no fim.
+        """
+        self.items[start:] = sorted(self.items[start:], key=lambda d: (d.pos is None, d.pos or 0))
+
+    def clear(self):
+        self.items.clear()
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,355 @@
+"""
+Interpretador local da EWVM.
+
+Executa o código gerado pelo CodeGenerator (ou qualquer ficheiro .ewvm que
+use as mesmas instruções) sem depender da máquina virtual web. O texto é
+primeiro descodificado para um Program: um array de opcodes inteiros, um
+array de operandos e uma tabela de constantes (strings), com os labels já
+resolvidos para endereços de instrução. O ciclo de execução trabalha apenas
+sobre estes arrays.
+
+Modelo de memória (como na EWVM):
+  - uma única pilha de valores; gp = 0 e fp apontam para posições da pilha;
+  - endereços são pares (segmento, offset), em que o segmento é a própria
+    pilha ou um bloco da heap criado por ALLOC;
+  - strings são valores Python (str) e endereços de código são inteiros;
+  - CALL guarda (pc, fp) numa pilha de chamadas e faz fp = sp;
+    RETURN repõe sp = fp e restaura fp e pc.
+"""
+
+import sys
+from array import array
+
+
+class EWVMError(Exception):
+    """Erro de descodificação ou de execução de um programa EWVM."""
+
+
+# ---- Conjunto de instruções ----
+
+# Instruções por tipo de operando
+INT_OPERAND = ('PUSHI', 'PUSHN', 'PUSHG', 'PUSHL', 'LOAD', 'STORE', 'STOREG', 'STOREL',
+               'ALLOC', 'POP', 'DUP')
+STRING_OPERAND = ('PUSHS', 'ERR')
+LABEL_OPERAND = ('JUMP', 'JZ', 'PUSHA')
+NO_OPERAND = ('PUSHSP', 'PUSHFP', 'PUSHGP', 'LOADN', 'STOREN', 'ALLOCN', 'FREE', 'POPN',
+              'DUPN', 'SWAP', 'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'NOT', 'INF', 'INFEQ',
+              'SUP', 'SUPEQ', 'EQUAL', 'AND', 'OR', 'PADD', 'CALL', 'RETURN', 'START',
+              'STOP', 'NOP', 'WRITEI', 'WRITES', 'WRITELN', 'WRITECHR', 'READ', 'ATOI',
+              'STRI', 'STRLEN', 'CHARAT', 'CONCAT')
+
+INSTRUCTIONS = INT_OPERAND + STRING_OPERAND + LABEL_OPERAND + NO_OPERAND
+OPCODES = {name: code for code, name in enumerate(INSTRUCTIONS)}
+
+(PUSHI, PUSHN, PUSHG, PUSHL, LOAD, STORE, STOREG, STOREL, ALLOC, POP, DUP,
+ PUSHS, ERR,
+ JUMP, JZ, PUSHA,
+ PUSHSP, PUSHFP, PUSHGP, LOADN, STOREN, ALLOCN, FREE, POPN, DUPN, SWAP, ADD, SUB, MUL,
+ DIV, MOD, NOT, INF, INFEQ, SUP, SUPEQ, EQUAL, AND, OR, PADD, CALL, RETURN, START, STOP,
+ NOP, WRITEI, WRITES, WRITELN, WRITECHR, READ, ATOI, STRI, STRLEN, CHARAT, CONCAT) = range(len(INSTRUCTIONS))
+
+
+class Program:
+    """Programa EWVM descodificado."""
+
+    __slots__ = ('opcodes', 'operands', 'constants', 'labels')
+
+    def __init__(self, opcodes, operands, constants, labels):
+        self.opcodes = opcodes      # array('B') com um opcode por instrução
+        self.operands = operands    # array de inteiros ('q', ou menor se veio de um .ewvb): inteiro,
+                                    # endereço resolvido ou índice em constants
+        self.constants = constants  # Strings usadas por PUSHS/ERR
+        self.labels = labels        # Nome do label -> endereço da instrução
+
+    def __len__(self):
+        return len(self.opcodes)
+
+
+def _split_instruction(line):
+    """Separa uma linha em (nome, operando em texto ou None)."""
+    parts = line.split(None, 1)
+    name = parts[0].upper()
+    operand = parts[1].strip() if len(parts) > 1 else None
+    return name, operand
+
+
+def _strip_comment(line):
+    """Remove comentários '//' que não estejam dentro de uma string."""
+    in_string = False
+    for i, char in enumerate(line):
+        if char == '"':
+            in_string = not in_string
+        elif char == '/' and not in_string and line.startswith('//', i):
+            return line[:i]
+    return line
+
+
+def assemble(code):
+    """Descodifica código EWVM (texto ou lista de instruções) para um Program."""
+    lines = code.splitlines() if isinstance(code, str) else code
+
+    # Primeira passagem: instruções e endereços dos labels
+    decoded = []
+    labels = {}
+    for line_number, raw_line in enumerate(lines, start=1):
+        line = _strip_comment(raw_line).strip()
+        while line:
+            head = line.split(None, 1)[0]
+            if head.endswith(':') and not head.startswith('"'):
+                labels[head[:-1]] = len(decoded)
+                line = line[len(head):].strip()
+                continue
+            decoded.append((line_number,) + _split_instruction(line))
+            break
+
+    # Segunda passagem: opcodes e operandos
+    opcodes = array('B')
+    operands = array('q')
+    constants = []
+    constant_index = {}
+    for line_number, name, operand in decoded:
+        code = OPCODES.get(name)
+        if code is None:
+            raise EWVMError(f"Linha {line_number}: instrução desconhecida '{name}'")
+        value = 0
+        if name in NO_OPERAND:
+            if operand is not None:
+                raise EWVMError(f"Linha {line_number}: '{name}' não tem operandos")
+        elif operand is None:
+            raise EWVMError(f"Linha {line_number}: '{name}' requer um operando")
+        elif name in INT_OPERAND:
+            try:
+                value = int(operand)
+            except ValueError:
+                raise EWVMError(f"Linha {line_number}: operando inteiro inválido '{operand}'")
+            if name in ('PUSHG', 'STOREG') and value < 0:
+                raise EWVMError(f"Linha {line_number}: endereço global negativo em '{name}'")
+        elif name in STRING_OPERAND:
+            if len(operand) < 2 or operand[0] != '"' or operand[-1] != '"':
+                raise EWVMError(f"Linha {line_number}: string inválida {operand}")
+            text = operand[1:-1]
+            if text not in constant_index:
+                constant_index[text] = len(constants)
+                constants.append(text)
+            value = constant_index[text]
+        else:  # LABEL_OPERAND
+            if operand not in labels:
+                raise EWVMError(f"Linha {line_number}: label desconhecido '{operand}'")
+            value = labels[operand]
+        opcodes.append(code)
+        operands.append(value)
+
+    return Program(opcodes, operands, constants, labels)
+
+
+def load(path):
+    """Lê e descodifica um ficheiro .ewvm."""
+    with open(path) as f:
+        return assemble(f.read())
+
+
+def _trunc_div(a, b):
+    """Divisão inteira com truncatura para zero (div de Pascal)."""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+class Machine:
+    """Estado de execução de um Program."""
+
+    def __init__(self, program, stdin=None, stdout=None):
+        self.program = program
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.stdout = stdout if stdout is not None else sys.stdout
+        self.stack = []
+        self.fp = 0
+        self.pc = 0
+        self.steps = 0  # Número de instruções executadas
+
+    def run(self, max_steps=None):
+        """Executa o programa até STOP (ou ao fim do código). Devolve self."""
+        opcodes = self.program.opcodes
+        operands = self.program.operands
+        constants = self.program.constants
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        write = self.stdout.write
+        readline = self.stdin.readline
+        calls = []
+        fp = self.fp
+        pc = self.pc
+        steps = self.steps
+        end = len(opcodes)
+        limit = max_steps if max_steps is not None else -1
+
+        try:
+            while pc < end:
+                if steps == limit:
+                    raise EWVMError(f"Limite de {max_steps} instruções excedido")
+                steps += 1
+                op = opcodes[pc]
+                pc += 1
+
+                if op == PUSHG:
+                    push(stack[operands[pc - 1]])
+                elif op == PUSHI:
+                    push(operands[pc - 1])
+                elif op == STOREG:
+                    stack[operands[pc - 1]] = pop()
+                elif op == ADD:
+                    b = pop()
+                    stack[-1] += b
+                elif op == SUB:
+                    b = pop()
+                    stack[-1] -= b
+                elif op == JZ:
+                    if not pop():
+                        pc = operands[pc - 1]
+                elif op == JUMP:
+                    pc = operands[pc - 1]
+                elif op == PUSHL:
+                    push(stack[fp + operands[pc - 1]])
+                elif op == STOREL:
+                    stack[fp + operands[pc - 1]] = pop()
+                elif op == MUL:
+                    b = pop()
+                    stack[-1] *= b
+                elif op == INF:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] < b else 0
+                elif op == INFEQ:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] <= b else 0
+                elif op == SUP:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] > b else 0
+                elif op == SUPEQ:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] >= b else 0
+                elif op == EQUAL:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] == b else 0
+                elif op == NOT:
+                    stack[-1] = 0 if stack[-1] else 1
+                elif op == AND:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] and b else 0
+                elif op == OR:
+                    b = pop()
+                    stack[-1] = 1 if stack[-1] or b else 0
+                elif op == DIV:
+                    b = pop()
+                    stack[-1] = _trunc_div(stack[-1], b)
+                elif op == MOD:
+                    b = pop()
+                    a = stack[-1]
+                    stack[-1] = a - b * _trunc_div(a, b)
+                elif op == LOADN:
+                    n = pop()
+                    segment, offset = pop()
+                    push(segment[offset + n])
+                elif op == STOREN:
+                    value = pop()
+                    n = pop()
+                    segment, offset = pop()
+                    segment[offset + n] = value
+                elif op == PADD:
+                    n = pop()
+                    segment, offset = pop()
+                    push((segment, offset + n))
+                elif op == PUSHGP:
+                    push((stack, 0))
+                elif op == PUSHFP:
+                    push((stack, fp))
+                elif op == PUSHSP:
+                    push((stack, len(stack)))
+                elif op == LOAD:
+                    segment, offset = pop()
+                    push(segment[offset + operands[pc - 1]])
+                elif op == STORE:
+                    value = pop()
+                    segment, offset = pop()
+                    segment[offset + operands[pc - 1]] = value
+                elif op == SWAP:
+                    stack[-1], stack[-2] = stack[-2], stack[-1]
+                elif op == DUP:
+                    stack.extend(stack[-operands[pc - 1]:])
+                elif op == DUPN:
+                    n = pop()
+                    stack.extend(stack[-n:])
+                elif op == POP:
+                    del stack[len(stack) - operands[pc - 1]:]
+                elif op == POPN:
+                    n = pop()
+                    del stack[len(stack) - n:]
+                elif op == PUSHN:
+                    stack.extend([0] * operands[pc - 1])
+                elif op == PUSHS:
+                    push(constants[operands[pc - 1]])
+                elif op == PUSHA:
+                    push(operands[pc - 1])
+                elif op == CALL:
+                    target = pop()
+                    calls.append((pc, fp))
+                    fp = len(stack)
+                    pc = target
+                elif op == RETURN:
+                    del stack[fp:]
+                    pc, fp = calls.pop()
+                elif op == ALLOC:
+                    push(([0] * operands[pc - 1], 0))
+                elif op == ALLOCN:
+                    push(([0] * pop(), 0))
+                elif op == FREE:
+                    pop()
+                elif op == WRITEI:
+                    write(str(pop()))
+                elif op == WRITES:
+                    write(pop())
+                elif op == WRITELN:
+                    write('\n')
+                elif op == WRITECHR:
+                    write(chr(pop()))
+                elif op == READ:
+                    line = readline()
+                    if not line:
+                        raise EWVMError("READ: fim dos dados de entrada")
+                    push(line.rstrip('\r\n'))
+                elif op == ATOI:
+                    push(int(pop().strip()))
+                elif op == STRI:
+                    push(str(pop()))
+                elif op == STRLEN:
+                    push(len(pop()))
+                elif op == CHARAT:
+                    n = pop()
+                    push(ord(pop()[n]))
+                elif op == CONCAT:
+                    b = pop()
+                    push(pop() + b)
+                elif op == START:
+                    fp = len(stack)
+                elif op == NOP:
+                    pass
+                elif op == STOP:
+                    break
+                elif op == ERR:
+                    raise EWVMError(constants[operands[pc - 1]])
+                else:
+                    raise EWVMError(f"Opcode inválido {op}")
+        except EWVMError as e:
+            raise EWVMError(f"Instrução {pc - 1} ({INSTRUCTIONS[opcodes[pc - 1]]}): {e}") from None
+        except (IndexError, TypeError, ValueError, ZeroDivisionError) as e:
+            raise EWVMError(f"Instrução {pc - 1} ({INSTRUCTIONS[opcodes[pc - 1]]}): {e}") from None
+        finally:
+            self.fp = fp
+            self.pc = pc
+            self.steps = steps
+        return self
+
+
+def run(code, stdin=None, stdout=None, max_steps=None):
+    """Executa código EWVM (texto, lista de instruções ou Program). Devolve a Machine."""
+    program = code if isinstance(code, Program) else assemble(code)
+    return Machine(program, stdin, stdout).run(max_steps)
@@ -1,4 +1,7 @@
+import re
+from array import array
 import ply.lex as lex
+from diagnostics import Diagnostics
 
 # Lista de nomes de tokens reconhecidos pelo lexer
 tokens = (
@@ -38,162 +41,52 @@ t_COLON       = r':'
 t_DOT         = r'\.'
 t_DOTDOT      = r'\.\.'
 
-# Expressões regulares para palavras reservadas (case-insensitive)
-# IMPORTANTE: palavras mais longas devem vir ANTES das mais curtas!
-
-def t_PROCEDURE(t):
-    r'[pP][rR][oO][cC][eE][dD][uU][rR][eE]'
-    t.value = t.value.lower()
-    return t
-
-def t_FUNCTION(t):
-    r'[fF][uU][nN][cC][tT][iI][oO][nN]'
-    t.value = t.value.lower()
-    return t
-
-def t_PROGRAM(t):
-    r'[pP][rR][oO][gG][rR][aA][mM]'
-    t.value = t.value.lower()
-    return t
-
-def t_WRITELN(t):
-    r'[wW][rR][iI][tT][eE][lL][nN]'
-    t.value = t.value.lower()
-    return t
-
-def t_READLN(t):
-    r'[rR][eE][aA][dD][lL][nN]'
-    t.value = t.value.lower()
-    return t
-
-def t_DOWNTO(t):
-    r'[dD][oO][wW][nN][tT][oO]'
-    t.value = t.value.lower()
-    return t
-
-def t_INTEGER(t):
-    r'[iI][nN][tT][eE][gG][eE][rR]'
-    t.value = t.value.lower()
-    return t
-
-def t_BOOLEAN(t):
-    r'[bB][oO][oO][lL][eE][aA][nN]'
-    t.value = t.value.lower()
-    return t
-
-def t_STRING(t):
-    r'[sS][tT][rR][iI][nN][gG]'
-    t.value = t.value.lower()
-    return t
-
-def t_BEGIN(t):
-    r'[bB][eE][gG][iI][nN]'
-    t.value = t.value.lower()
-    return t
-
-def t_ARRAY(t):
-    r'[aA][rR][rR][aA][yY]'
-    t.value = t.value.lower()
-    return t
-
-def t_FALSE(t):
-    r'[fF][aA][lL][sS][eE]'
-    t.value = t.value.lower()
-    return t
-
-def t_WHILE(t):
-    r'[wW][hH][iI][lL][eE]'
-    t.value = t.value.lower()
-    return t
-
-def t_WRITE(t):
-    r'[wW][rR][iI][tT][eE]'
-    t.value = t.value.lower()
-    return t
-
-def t_THEN(t):
-    r'[tT][hH][eE][nN]'
-    t.value = t.value.lower()
-    return t
-
-def t_TRUE(t):
-    r'[tT][rR][uU][eE]'
-    t.value = t.value.lower()
-    return t
-
-def t_ELSE(t):
-    r'[eE][lL][sS][eE]'
-    t.value = t.value.lower()
-    return t
-
-def t_READ(t):
-    r'[rR][eE][aA][dD]'
-    t.value = t.value.lower()
-    return t
-
-def t_END(t):
-    r'[eE][nN][dD]'
-    t.value = t.value.lower()
-    return t
-
-def t_FOR(t):
-    r'[fF][oO][rR]'
-    t.value = t.value.lower()
-    return t
-
-def t_MOD(t):
-    r'[mM][oO][dD]'
-    t.value = t.value.lower()
-    return t
-
-def t_NOT(t):
-    r'[nN][oO][tT]'
-    t.value = t.value.lower()
-    return t
-
-def t_VAR(t):
-    r'[vV][aA][rR]'
-    t.value = t.value.lower()
-    return t
-
-def t_DIV(t):
-    r'[dD][iI][vV]'
-    t.value = t.value.lower()
-    return t
-
-def t_AND(t):
-    r'[aA][nN][dD]'
-    t.value = t.value.lower()
-    return t
-
-def t_DO(t):
-    r'[dD][oO]'
-    t.value = t.value.lower()
-    return t
-
-def t_IF(t):
-    r'[iI][fF]'
-    t.value = t.value.lower()
-    return t
-
-def t_OF(t):
-    r'[oO][fF]'
-    t.value = t.value.lower()
-    return t
-
-def t_OR(t):
-    r'[oO][rR]'
-    t.value = t.value.lower()
-    return t
-
-def t_TO(t):
-    r'[tT][oO]'
-    t.value = t.value.lower()
-    return t
-
-# Identificadores: começam com letra, podem conter letras, dígitos e underscore
+# Palavras reservadas (case-insensitive): em vez de uma regra por palavra,
+# o lexer reconhece um identificador e consulta esta tabela com o lexema em
+# minúsculas. Assim "dox" ou "endvalue" são identificadores completos e não
+# "do"/"end" seguidos de outro identificador.
+reserved = {
+    'program': 'PROGRAM',
+    'begin': 'BEGIN',
+    'end': 'END',
+    'var': 'VAR',
+    'integer': 'INTEGER',
+    'boolean': 'BOOLEAN',
+    'string': 'STRING',
+    'array': 'ARRAY',
+    'of': 'OF',
+    'if': 'IF',
+    'then': 'THEN',
+    'else': 'ELSE',
+    'while': 'WHILE',
+    'do': 'DO',
+    'for': 'FOR',
+    'to': 'TO',
+    'downto': 'DOWNTO',
+    'function': 'FUNCTION',
+    'procedure': 'PROCEDURE',
+    'read': 'READ',
+    'write': 'WRITE',
+    'writeln': 'WRITELN',
+    'readln': 'READLN',
+    'true': 'TRUE',
+    'false': 'FALSE',
+    'div': 'DIV',
+    'mod': 'MOD',
+    'and': 'AND',
+    'or': 'OR',
+    'not': 'NOT',
+}
+
+# Identificadores: começam com letra, podem conter letras, dígitos e underscore.
+# Palavras reservadas recebem o seu próprio tipo de token e o valor em minúsculas.
 def t_ID(t):
     r'[a-zA-Z][a-zA-Z0-9_]*'
+    lowered = t.value.lower()
+    keyword = reserved.get(lowered)
+    if keyword:
+        t.type = keyword
+        t.value = lowered
     return t
 
 # Constantes string em Pascal: aspas simples, com possível escape
@@ -227,32 +120,282 @@ def t_COMMENT(t):
 # Ignorar espaços e tabulações
 t_ignore = ' \t'
 
-# Tratamento de erros: imprime o caractere ilegal e avança
+# Tratamento de erros: regista o caractere ilegal nos diagnósticos e avança
 def t_error(t):
-    print(f"Illegal character '{t.value[0]}' at line {t.lexer.lineno}")
+    diagnostics = getattr(t.lexer, 'diagnostics', None)
+    if diagnostics is not None:
+        diagnostics.error('lexer', "Illegal character '{0}' at line {line}", t.value[0],
+                          line=t.lexer.lineno, pos=t.lexpos)
+    else:
+        print(f"Illegal character '{t.value[0]}' at line {t.lexer.lineno}")
     t.lexer.skip(1)
 
 # Criação do analisador léxico
 lexer = lex.lex()
 
+def new_lexer(data, diagnostics=None):
+    """Cria uma cópia do lexer para uma nova entrada, com o seu coletor de diagnósticos.
+
+    Cada chamada devolve um lexer independente (lexer.clone()), o que permite
+    analisar várias entradas em simultâneo, em threads diferentes.
+    """
+    if diagnostics is None:
+        diagnostics = Diagnostics(data)
+    elif diagnostics.source is None:
+        diagnostics.source = data
+    instance = lexer.clone()
+    instance.diagnostics = diagnostics
+    instance.lineno = 1
+    instance.input(data)
+    return instance
+
+# ---- Buffer de tokens em colunas ----
+#
+# Em vez de uma lista de LexTokens (um objeto com quatro atributos por token),
+# os tokens de uma entrada ficam em arrays paralelos: o tipo (índice em
+# `tokens`), a posição e a linha de cada token. O valor só é guardado para os
+# tokens em que depende do lexema (identificadores e literais), numa tabela à
+# parte em que cada valor distinto aparece uma única vez; para palavras
+# reservadas e operadores o valor é sempre o mesmo e obtém-se do tipo.
+
+TOKEN_IDS = {name: index for index, name in enumerate(tokens)}
+
+def _fixed_value(name):
+    """Valor de um token cujo lexema é determinado pelo tipo (None se não for)."""
+    if name.lower() in reserved:
+        return name.lower()
+    pattern = globals().get('t_' + name)
+    if isinstance(pattern, str):
+        return re.sub(r'\\(.)', r'\1', pattern)
+    return None
+
+FIXED_VALUES = tuple(_fixed_value(name) for name in tokens)
+
+class TokenBuffer:
+    """Tokens de uma entrada em colunas (ver acima).
+
+    Comporta-se como uma sequência de LexTokens (len, índices, iteração),
+    criados apenas quando são pedidos; `pairs()` percorre (tipo, valor) sem
+    criar tokens e `reader()` devolve um lexer que o parser pode consumir.
+    """
+
+    __slots__ = ('kinds', 'positions', 'lines', 'refs', 'values', '_interned')
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.positions = array('I')
+        self.lines = array('I')
+        self.refs = array('I')   # Índice em `values` (0 nos tokens de valor fixo)
+        self.values = []
+        self._interned = {}
+
+    def append(self, kind, value, lineno, lexpos):
+        ref = 0
+        if FIXED_VALUES[kind] is None:
+            # A chave inclui o tipo: 1 (inteiro) e 1.0 (real) são iguais num dict
+            key = (kind, value)
+            ref = self._interned.get(key)
+            if ref is None:
+                ref = self._interned[key] = len(self.values)
+                self.values.append(value)
+        self.kinds.append(kind)
+        self.positions.append(lexpos)
+        self.lines.append(lineno)
+        self.refs.append(ref)
+
+    def type(self, index):
+        return tokens[self.kinds[index]]
+
+    def value(self, index):
+        fixed = FIXED_VALUES[self.kinds[index]]
+        return fixed if fixed is not None else self.values[self.refs[index]]
+
+    def pairs(self):
+        """Percorre os tokens como pares (tipo, valor)."""
+        values = self.values
+        for kind, ref in zip(self.kinds, self.refs):
+            fixed = FIXED_VALUES[kind]
+            yield tokens[kind], fixed if fixed is not None else values[ref]
+
+    def token(self, index):
+        """LexToken equivalente ao token `index`."""
+        tok = lex.LexToken()
+        tok.type = self.type(index)
+        tok.value = self.value(index)
+        tok.lineno = self.lines[index]
+        tok.lexpos = self.positions[index]
+        return tok
+
+    def reader(self):
+        return BufferLexer(self)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.token(i) for i in range(*index.indices(len(self.kinds)))]
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError('token index out of range')
+        return self.token(index)
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self.token(index)
+
+class BufferLexer:
+    """Adaptador que entrega ao parser PLY os tokens de um TokenBuffer.
+
+    O parser só precisa de token(); cada LexToken é criado no momento em que
+    é pedido e deixa de ser referenciado quando sai da pilha de análise.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.index = 0
+        self.lineno = 1
+
+    def token(self):
+        index = self.index
+        if index >= len(self.buffer):
+            return None
+        self.index = index + 1
+        tok = self.buffer.token(index)
+        self.lineno = tok.lineno
+        return tok
+
+# ---- Análise léxica por blocos ----
+#
+# Um fonte lido por blocos (source.read_chunks) é analisado bloco a bloco.
+# Cada bloco (juntamente com o texto que sobrou do anterior) é analisado
+# até ao fim, mas só se entregam os tokens e os diagnósticos anteriores ao
+# último ponto de corte seguro; o resto volta a ser analisado com o bloco
+# seguinte. Um ponto de corte é seguro antes de um token se o token anterior
+# já não pode continuar: ou há texto entre os dois (espaços, mudanças de
+# linha, comentários) ou o anterior é um dos tokens de CLOSED_TOKENS. Assim,
+# mesmo um fonte sem mudanças de linha é analisado sem ficar todo em memória.
+#
+# Os comentários e as strings podem continuar no bloco seguinte; nesse caso
+# o '{' ou a aspa inicial não é reconhecido e chega a t_error, que num bloco
+# que não é o último interrompe a análise nessa posição, em vez de registar
+# um erro.
+#
+# Um token que continua incompleto depois de MAX_CARRY caracteres deixa de
+# ser guardado: um comentário ou string é dado como não fechado (o '{' ou a
+# aspa é registado como caractere ilegal e a análise continua no caractere
+# seguinte, dentro do comentário ou string), e qualquer outro token é
+# cortado no fim do bloco. Só nesses casos os tokens diferem dos de
+# new_lexer sobre o texto completo. Sem este limite, um '{' esquecido
+# levaria o resto do fonte para a memória (e o -t ficaria parado até ao fim
+# do ficheiro).
+
+MAX_CARRY = 4 << 20  # Caracteres que um token incompleto pode ocupar
+
+# Tokens que nunca se prolongam com o texto seguinte
+CLOSED_TOKENS = frozenset((
+    'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'ASSIGN', 'EQUAL', 'NOTEQUAL',
+    'LESSEQUAL', 'GREATEREQUAL', 'LPAREN', 'RPAREN', 'LBRACKET', 'RBRACKET',
+    'COMMA', 'SEMICOLON', 'DOTDOT', 'STRING_CONST',
+))
+
+class _Incomplete(Exception):
+    """Comentário ou string que continua no bloco seguinte (o argumento é a posição)."""
+
+class _ChunkDiagnostics:
+    """Diagnósticos de um bloco: guarda-os até ao corte e deteta os tokens incompletos."""
+
+    def __init__(self, diagnostics, offset, final, overflow=False):
+        self.diagnostics = diagnostics
+        self.offset = offset      # Posição do bloco no fonte
+        self.final = final        # Último bloco: um token por fechar é mesmo um erro
+        self.overflow = overflow  # O token no início do bloco já excedeu MAX_CARRY
+        self.held = []            # (phase, template, char, line, pos) ainda por registar
+
+    def error(self, phase, template, char, line=None, pos=None):
+        if not self.final and char in "{'" and not (self.overflow and pos == 0):
+            raise _Incomplete(pos)
+        self.held.append((phase, template, char, line, pos))
+
+    def flush(self, cut):
+        """Regista os erros anteriores à posição `cut` do bloco."""
+        for phase, template, char, line, pos in self.held:
+            if pos < cut:
+                self.diagnostics.error(phase, template, char, line=line, pos=pos + self.offset)
+        self.held = []
+
+def lex_chunks(chunks, diagnostics=None):
+    """LexTokens de um fonte dado por blocos de texto, à medida que são lidos.
+
+    Os tokens (posições, linhas e diagnósticos incluídos) são os mesmos que
+    os de new_lexer sobre o texto completo, exceto para tokens com mais de
+    MAX_CARRY caracteres (ver acima). Só o bloco em curso e o token
+    incompleto no seu fim ficam em memória.
+    """
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+    instance = lexer.clone()
+    lineno = 1
+    offset = 0    # Posição, no fonte, do início de `pending`
+    pending = ''  # Texto lido e ainda não analisado
+    chunks = iter(chunks)
+    final = False
+    while not final:
+        chunk = next(chunks, None)
+        final = chunk is None
+        sink = _ChunkDiagnostics(diagnostics, offset, final, len(pending) > MAX_CARRY)
+        text = pending if final else pending + chunk
+        instance.diagnostics = sink
+        instance.lineno = lineno
+        instance.input(text)
+        cut, cut_lineno = 0, lineno  # Último ponto de corte seguro
+        held = []                    # Tokens a partir de `cut`
+        end, closed = 0, True        # Fim do token anterior e se já não pode continuar
+        try:
+            while True:
+                tok = instance.token()
+                if not tok:
+                    break
+                if closed or tok.lexpos > end:
+                    cut, cut_lineno = tok.lexpos, tok.lineno
+                    for ready in held:
+                        ready.lexpos += offset
+                        yield ready
+                    held = []
+                held.append(tok)
+                end, closed = instance.lexpos, tok.type in CLOSED_TOKENS
+        except _Incomplete as incomplete:
+            cut, cut_lineno = incomplete.args[0], instance.lineno
+        else:
+            if final or closed or end < len(text) or (sink.overflow and cut == 0):
+                cut, cut_lineno = len(text), instance.lineno
+        for tok in held:
+            if tok.lexpos < cut:
+                tok.lexpos += offset
+                yield tok
+        sink.flush(cut)
+        pending = text[cut:]
+        lineno = cut_lineno
+        offset += cut
+
 # Função auxiliar para testar o lexer com uma string de entrada
-def test_lexer(data):
-    lexer.input(data)
-    tokens_found = []
-    while True:
-        tok = lexer.token()
-        if not tok:
-            break
-        tokens_found.append((tok.type, tok.value))
-    return tokens_found
-
-# Função para obter todos os tokens de entrada
-def get_tokens(data):
-    lexer.input(data)
-    tokens = []
-    while True:
-        tok = lexer.token()
-        if not tok:
-            break
-        tokens.append(tok)
-    return tokens
\ No newline at end of file
+def test_lexer(data, diagnostics=None):
+    return list(get_tokens(data, diagnostics).pairs())
+
+def _token_buffer(lex_tokens):
+    buffer = TokenBuffer()
+    append = buffer.append
+    ids = TOKEN_IDS
+    for tok in lex_tokens:
+        append(ids[tok.type], tok.value, tok.lineno, tok.lexpos)
+    return buffer
+
+# Função para obter todos os tokens de entrada (num TokenBuffer)
+def get_tokens(data, diagnostics=None):
+    lexer = new_lexer(data, diagnostics)
+    return _token_buffer(iter(lexer.token, None))
+
+def get_chunk_tokens(chunks, diagnostics=None):
+    """TokenBuffer de um fonte dado por blocos de texto (ver lex_chunks)."""
+    return _token_buffer(lex_chunks(chunks, diagnostics))
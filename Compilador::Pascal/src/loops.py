@@ -0,0 +1,401 @@
+"""
+Otimização de ciclos (for e while) sobre a AST, no nível -O1.
+
+Corre depois do ASTOptimizer, do ciclo mais interior para o exterior, e
+aplica três transformações:
+
+  - movimentação de código invariante: as subexpressões de um ciclo que
+    não dependem de nada que o ciclo altere (variáveis atribuídas ou lidas
+    no corpo, arrays escritos, globais quando há chamadas) são calculadas
+    uma vez, antes do ciclo, para variáveis temporárias; expressões iguais
+    partilham a mesma temporária. Só são movidas expressões que não podem
+    falhar (sem div/mod por um valor variável nem índices variáveis);
+  - rotação: `for` e `while` passam a testar a condição no fim do corpo
+    (RepeatStatement), protegidos por um if com a condição inicial. Cada
+    iteração poupa o JUMP de volta ao teste. Como no código sem
+    otimização, o limite de um for é calculado uma única vez, antes do
+    teste inicial, para uma temporária (se não for uma constante);
+  - redução de força dos acessos a arrays indexados pela variável de
+    controlo de um for (a[i], a[i + e], a[e + i], a[i - e], com e
+    invariante, p.ex. a[linha * n + i]): o endereço do elemento é
+    calculado antes do ciclo para uma temporária, que avança um elemento
+    por iteração, e cada acesso passa a ser PUSHG p; LOAD n (ou STORE n).
+    Os acessos ao mesmo array com deslocamentos constantes diferentes
+    partilham o endereço (a[i - 1], a[i] e a[i + 1] usam LOAD 0, 1 e 2). Só
+    é aplicada quando a estimativa de instruções poupadas em cada iteração
+    é maior do que o custo de avançar o endereço.
+
+As temporárias são declaradas no frame onde está o ciclo (zona global ou
+variáveis locais do subprograma), a seguir às variáveis já declaradas.
+
+A AST resultante usa, além dos nós do parser, RepeatStatement (corpo,
+condição de saída), ElementAddress (endereço de um elemento de array),
+Dereference (elemento a uma distância `leaf` do endereço guardado numa
+temporária) e AddressIncrement
+(avança uma temporária com um endereço).
+"""
+
+from parser import Node
+from semantic import Symbol, VARIABLE
+from visitor import Visitor, walk, count_nodes
+
+CONSTANTS = ('IntegerConstant', 'BooleanConstant', 'StringConstant')
+
+# Condição de saída equivalente a `not (a op b)`, para os operadores em que
+# não custa mais instruções do que a original
+INVERSE = {'<': '>=', '>=': '<', '>': '<=', '<=': '>', '<>': '='}
+
+
+def _copy(node):
+    """Cópia de uma subárvore (os Symbols são partilhados)."""
+    root = Node(node.type, [], node.leaf, node.pos)
+    root.symbol = node.symbol
+    stack = [(node, root)]
+    while stack:
+        original, copy = stack.pop()
+        for child in original.children:
+            child_copy = Node(child.type, [], child.leaf, child.pos)
+            child_copy.symbol = child.symbol
+            copy.children.append(child_copy)
+            stack.append((child, child_copy))
+    return root
+
+
+def _key(node):
+    """Chave estrutural de uma expressão (expressões iguais têm a mesma chave)."""
+    return tuple((n.type, n.leaf, id(n.symbol), depth) for n, depth in walk(node))
+
+
+def _variable(symbol, pos=None):
+    node = Node('Variable', [], symbol.name, pos)
+    node.symbol = symbol
+    return node
+
+
+def _assign(symbol, value, pos=None):
+    return Node('Assignment', [_variable(symbol, pos), value], pos=pos)
+
+
+def _compare(symbol, operator, value, pos=None):
+    return Node('BinaryOperation', [_variable(symbol, pos), value], operator, pos)
+
+
+def _loop_effects(roots):
+    """Símbolos que um ciclo altera e se o ciclo chama subprogramas."""
+    written = set()
+    calls = False
+    for root in roots:
+        for node, _ in walk(root):
+            node_type = node.type
+            if node_type == 'Assignment':
+                written.add(node.children[0].symbol)
+            elif node_type in ('ForStatement', 'AddressIncrement'):
+                written.add(node.children[0].symbol)
+            elif node_type == 'VariableList':  # Argumentos de read/readln
+                written.update(target.symbol for target in node.children)
+            elif node_type in ('FunctionCall', 'ProcedureCall'):
+                calls = True
+    return written, calls
+
+
+class Frame:
+    """Zona de variáveis (global ou de um subprograma) onde ficam as temporárias."""
+
+    def __init__(self, depth, declarations):
+        self.depth = depth
+        self.declarations = declarations  # Nós Declarations do frame; o último recebe as temporárias
+        self.next_offset = 0
+        for node in declarations:
+            for child, _ in walk(node):
+                if child.type == 'ID' and child.symbol is not None:
+                    self.next_offset = max(self.next_offset, child.symbol.offset + child.symbol.size)
+        self.temps = []
+
+    def new_temp(self, type='integer'):
+        symbol = Symbol(f"${len(self.temps)}", VARIABLE, type, self.depth, self.next_offset, 1)
+        self.next_offset += 1
+        self.temps.append(symbol)
+        return symbol
+
+    def declare_temps(self):
+        """Acrescenta a declaração das temporárias (o gerador de código reserva-lhes espaço)."""
+        if not self.temps:
+            return
+        ids = []
+        for symbol in self.temps:
+            id_node = Node('ID', [], symbol.name)
+            id_node.symbol = symbol
+            ids.append(id_node)
+        declaration = Node('Declaration', [Node('IDList', ids), Node('Type', [], 'integer')])
+        target = self.declarations[-1]
+        if target.children and target.children[0].type == 'DeclarationList':
+            target.children[0].children.append(declaration)
+        else:
+            target.children = [Node('DeclarationList', [declaration])]
+
+
+class LoopOptimizer(Visitor):
+    prefix = 'loop_'  # visit() devolve o nó que substitui o nó visitado
+
+    def __init__(self):
+        self.frame = None
+        self.hoisted = 0  # Expressões movidas para fora de ciclos
+        self.rotated = 0  # Ciclos com o teste passado para o fim
+        self.reduced = 0  # Acessos a arrays reduzidos a PUSHG p; LOAD 0 / STORE 0
+
+    def optimize(self, ast):
+        return self.visit(ast) if ast else ast
+
+    def generic_visit(self, node):
+        children = node.children
+        for i, child in enumerate(children):
+            if child:
+                children[i] = yield child
+        return node
+
+    # ---- Frames ----
+
+    def in_frame(self, node, frame):
+        previous, self.frame = self.frame, frame
+        yield from self.generic_visit(node)
+        frame.declare_temps()
+        self.frame = previous
+        return node
+
+    def loop_ProgramBlock(self, node):
+        declarations = [node.children[0]] + ([node.children[2]] if len(node.children) > 2 else [])
+        return (yield from self.in_frame(node, Frame(0, declarations)))
+
+    def loop_FunctionDeclaration(self, node):
+        block = node.children[-1]
+        return (yield from self.in_frame(node, Frame(1, [block.children[0]])))
+
+    loop_ProcedureDeclaration = loop_FunctionDeclaration
+
+    # ---- Invariantes ----
+
+    def invariant_nodes(self, roots, written, calls):
+        """Ids dos nós de expressão invariantes nas subárvores `roots`."""
+        def stable(symbol):
+            # Uma chamada pode alterar qualquer global, mas não as variáveis
+            # locais do subprograma corrente
+            return symbol is not None and symbol not in written and not (calls and symbol.depth == 0)
+
+        invariant = set()
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                node, done = stack.pop()
+                if not done:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in node.children)
+                    continue
+                node_type = node.type
+                if node_type in CONSTANTS:
+                    ok = True
+                elif node_type == 'Variable':
+                    ok = stable(node.symbol)
+                elif node_type == 'ArrayAccess':
+                    ok = stable(node.symbol) and node.children[1].type == 'IntegerConstant'
+                elif node_type == 'BinaryOperation':
+                    left, right = node.children
+                    ok = id(left) in invariant and id(right) in invariant
+                    if ok and node.leaf.lower() in ('/', 'div', 'mod'):
+                        ok = right.type == 'IntegerConstant' and right.leaf != 0
+                elif node_type == 'UnaryOperation':
+                    ok = id(node.children[0]) in invariant
+                else:
+                    ok = False
+                if ok:
+                    invariant.add(id(node))
+        return invariant
+
+    @staticmethod
+    def worth_hoisting(node):
+        """True se a expressão custa mais do que ler uma temporária."""
+        if node.type in ('BinaryOperation', 'UnaryOperation'):
+            return True
+        # Elementos de índice constante de arrays globais já são um único PUSHG
+        return node.type == 'ArrayAccess' and node.symbol.depth > 0
+
+    def hoist(self, roots, invariant, preheader, temps):
+        """Substitui as expressões invariantes de `roots` (nós pais) por temporárias.
+
+        As atribuições às temporárias são acrescentadas a `preheader`.
+        """
+        stack = list(roots)
+        while stack:
+            parent = stack.pop()
+            if parent.type in ('ElementAddress', 'Dereference', 'AddressIncrement'):
+                continue
+            for i, child in enumerate(parent.children):
+                # Destinos de atribuições e de read: só o índice pode ser movido
+                if (parent.type == 'Assignment' and i == 0) or parent.type == 'VariableList':
+                    if child.type == 'ArrayAccess':
+                        stack.append(child)
+                    continue
+                if id(child) in invariant and self.worth_hoisting(child):
+                    key = _key(child)
+                    temp = temps.get(key)
+                    if temp is None:
+                        temp = temps[key] = self.frame.new_temp()
+                        preheader.append(_assign(temp, child, child.pos))
+                        self.hoisted += 1
+                    parent.children[i] = _variable(temp, child.pos)
+                else:
+                    stack.append(child)
+
+    # ---- Redução de força ----
+
+    def reduce_accesses(self, node, control, written, calls, preheader, increments):
+        """Acessos a[i + e] do corpo de um for passam a usar um endereço que avança com i."""
+        if control in written or (calls and control.depth == 0):
+            return  # A variável de controlo não é apenas incrementada pelo ciclo
+        step = 1 if node.leaf == 'to' else -1
+        # Invariantes depois de movidas as expressões (inclui as temporárias)
+        invariant = self.invariant_nodes([node.children[3]], written | {control}, calls)
+
+        # Acessos candidatos, agrupados por array e deslocamento não constante:
+        # os deslocamentos constantes partilham o endereço (LOAD n / STORE n)
+        groups = {}
+        read_targets = set()
+        for child, _ in walk(node.children[3]):
+            if child.type == 'VariableList':
+                read_targets.update(id(target) for target in child.children)
+            if child.type != 'ArrayAccess' or id(child) in read_targets:
+                continue
+            offset = self.induction_offset(child.children[1], control, invariant)
+            if offset is not None:
+                key, displacement = offset
+                groups.setdefault((child.symbol, key), []).append((child, displacement))
+
+        for (array, key), accesses in groups.items():
+            # Avançar o endereço custa 4 instruções por iteração; cada acesso
+            # passa a custar 2 (PUSHG p; LOAD n)
+            if sum(self.access_cost(access, displacement, key) - 2 for access, displacement in accesses) <= 4:
+                continue
+            first, base = min(accesses, key=lambda item: item[1])
+            pointer = self.frame.new_temp('address')
+            address = Node('ElementAddress', [first.children[0], _copy(first.children[1])], pos=node.pos)
+            address.symbol = array
+            preheader.append(_assign(pointer, address, node.pos))
+            increments.append(Node('AddressIncrement', [_variable(pointer, node.pos)], step, node.pos))
+            for access, displacement in accesses:
+                # O nó é transformado no próprio lugar (pode ser destino de uma atribuição)
+                access.type = 'Dereference'
+                access.leaf = displacement - base
+                access.children = [_variable(pointer, access.pos)]
+                self.reduced += 1
+
+    @staticmethod
+    def induction_offset(index, control, invariant):
+        """(chave, deslocamento) se o índice for i, i + e, e + i ou i - e, senão None.
+
+        i é a variável de controlo e e uma expressão invariante. Se e for uma
+        constante, a chave é None e o deslocamento é ±e; senão a chave
+        identifica e e o deslocamento é 0.
+        """
+        if index.type == 'Variable' and index.symbol is control:
+            return None, 0
+        if index.type != 'BinaryOperation' or index.leaf not in ('+', '-'):
+            return None
+        left, right = index.children
+        if left.type == 'Variable' and left.symbol is control and id(right) in invariant:
+            offset = right
+        elif index.leaf == '+' and right.type == 'Variable' and right.symbol is control and id(left) in invariant:
+            offset = left
+        else:
+            return None
+        if offset.type == 'IntegerConstant':
+            return None, offset.leaf if index.leaf == '+' else -offset.leaf
+        return (index.leaf, _key(offset)), 0
+
+    @staticmethod
+    def access_cost(access, displacement, key):
+        """Instruções de um acesso a[índice], depois das simplificações do peephole.
+
+        PUSHGP/PUSHFP, o índice e LOADN/STOREN; as constantes (offset do
+        array, limite inferior e deslocamento) juntam-se num PUSHI k; PADD,
+        que desaparece se k for 0.
+        """
+        array = access.symbol
+        constant = array.offset - array.type['range'][0]
+        if key is None:
+            return 3 + (2 if constant + displacement else 0)
+        return 2 + count_nodes(access.children[1]) + (2 if constant else 0)
+
+    # ---- Ciclos ----
+
+    def loop_ForStatement(self, node):
+        yield from self.generic_visit(node)
+        if self.frame is None:
+            return node
+        id_node, start, bound, body = node.children
+        control = id_node.symbol
+        pos = node.pos
+        written, calls = _loop_effects([body])
+
+        preheader = []
+        temps = {}
+        invariant = self.invariant_nodes([body], written | {control}, calls)
+        self.hoist([body], invariant, preheader, temps)
+
+        statements = [_assign(control, start, pos)]
+        if bound.type not in CONSTANTS:
+            # O limite é calculado uma única vez, antes do teste inicial
+            bound_temp = self.frame.new_temp()
+            statements.append(_assign(bound_temp, bound, pos))
+            bound = _variable(bound_temp, pos)
+
+        increments = []
+        self.reduce_accesses(node, control, written, calls, preheader, increments)
+
+        to = node.leaf == 'to'
+        step = Node('BinaryOperation', [_variable(control, pos), Node('IntegerConstant', [], 1, pos)],
+                    '+' if to else '-', pos)
+        loop_body = Node('StatementList', [body] + increments + [_assign(control, step, pos)])
+        loop = Node('RepeatStatement', [loop_body, _compare(control, '>' if to else '<', _copy(bound), pos)], pos=pos)
+        self.rotated += 1
+
+        guarded = Node('StatementList', preheader + [loop])
+        if start.type == 'IntegerConstant' and bound.type == 'IntegerConstant' and (
+                start.leaf <= bound.leaf if to else start.leaf >= bound.leaf):
+            statements.append(guarded)  # Pelo menos uma iteração: dispensa o teste inicial
+        else:
+            statements.append(Node('IfStatement', [_compare(control, '<=' if to else '>=', bound, pos), guarded], pos=pos))
+        return Node('StatementList', statements, pos=pos)
+
+    def loop_WhileStatement(self, node):
+        yield from self.generic_visit(node)
+        if self.frame is None:
+            return node
+        condition, body = node.children
+        written, calls = _loop_effects([condition, body])
+        preheader = []
+        invariant = self.invariant_nodes([condition, body], written, calls)
+        self.hoist([node], invariant, preheader, {})
+        condition = node.children[0]
+
+        # Condição de saída (not condição) sem instruções a mais
+        if condition.type == 'BinaryOperation' and condition.leaf in INVERSE:
+            exit_condition = Node('BinaryOperation', [_copy(child) for child in condition.children],
+                                  INVERSE[condition.leaf], condition.pos)
+        elif condition.type == 'UnaryOperation':
+            exit_condition = _copy(condition.children[0])
+        else:
+            return Node('StatementList', preheader + [node], pos=node.pos) if preheader else node
+
+        self.rotated += 1
+        loop = Node('RepeatStatement', [body, exit_condition], pos=node.pos)
+        guarded = Node('IfStatement', [condition, loop], pos=node.pos)
+        # A condição já usa os temporários: o pré-cabeçalho vem antes do
+        # teste inicial (as expressões invariantes não têm efeitos, pelo que
+        # avaliá-las mesmo sem nenhuma iteração é seguro)
+        return Node('StatementList', preheader + [guarded], pos=node.pos) if preheader else guarded
+
+
+def optimize_loops(ast):
+    """Otimiza os ciclos da AST. Devolve (nova raiz, LoopOptimizer com as contagens)."""
+    optimizer = LoopOptimizer()
+    ast = optimizer.optimize(ast)
+    return ast, optimizer
@@ -3,23 +3,81 @@
 Compilador Pascal - Programa Principal
 Este módulo integra todas as fases de compilação: análise léxica, análise sintática,
 análise semântica e geração de código.
+
+Os módulos das fases são importados só quando são usados (import dentro das
+funções): com -t apenas o lexer é carregado e com -a o parser não arrasta a
+análise semântica nem a geração de código. Cada invocação paga assim só o
+arranque do que realmente faz.
 """
 
 import sys
 import os
+import io
+import time
 import argparse
-from lexer import lexer, test_lexer
-from parser import parse
-from semantic import SemanticAnalyzer
-from codegen import generate_code
-
-def show_tokens(code, verbose=False):
-    """Executa apenas a análise léxica e exibe os tokens."""
-    tokens = test_lexer(code)
+import contextlib
+from diagnostics import Diagnostics
+from source import read_chunks, LineIndex, LARGE_SOURCE
+from profiling import Profiler, NULL_PROFILER
+
+# Parsers disponíveis (--parser): o LALR do PLY e o descendente recursivo,
+# que constroem a mesma AST
+PARSERS = ('ply', 'rd')
+
+# Extensão dos ficheiros binários (bytecode.EXTENSION, repetida aqui para
+# não carregar o bytecode e o ewvm em todas as invocações)
+BYTECODE_EXTENSION = '.ewvb'
+
+def load_parser(name):
+    """Função parse do parser `name` (um de PARSERS)."""
+    if name == 'rd':
+        from rdparser import parse
+    else:
+        from parser import parse
+    return parse
+
+def load_phases(options):
+    """Importa já os módulos das fases que vão ser executadas.
+
+    Usado com --profile, para que o tempo de import não conte para as fases.
+    """
+    import lexer  # noqa: F401
+    if options.tokens_only:
+        return
+    load_parser(options.parser)
+    if options.ast_only:
+        return
+    import semantic, codegen, visitor  # noqa: F401
+    if options.opt_level > 0:
+        import optimizer, peephole  # noqa: F401
+
+def format_diagnostic(diagnostic):
+    """Texto de um diagnóstico semântico, com a sua localização quando conhecida."""
+    if diagnostic.line is None:
+        return str(diagnostic)
+    return f"{diagnostic} (linha {diagnostic.line}, coluna {diagnostic.column})"
+
+def show_syntax_errors(diagnostics):
+    """Exibe os erros léxicos e sintáticos registados."""
+    for error in diagnostics.errors():
+        if error.phase in ('lexer', 'parser'):
+            print(error)
+
+def show_tokens(chunks, verbose=False, diagnostics=None):
+    """Executa apenas a análise léxica e exibe os tokens; devolve quantos são.
+
+    O código fonte é dado por blocos (source.read_chunks) e os tokens são
+    escritos à medida que são encontrados, sem ficarem em memória.
+    """
+    from lexer import lex_chunks
+    diagnostics = diagnostics if diagnostics is not None else Diagnostics()
     print("=== Tokens encontrados ===")
-    for token_type, token_value in tokens:
-        print(f"{token_type}: {token_value}")
-    return tokens
+    count = 0
+    for tok in lex_chunks(chunks, diagnostics):
+        print(f"{tok.type}: {tok.value}")
+        count += 1
+    show_syntax_errors(diagnostics)
+    return count
 
 def show_ast(ast, verbose=False):
     """Exibe a árvore sintática abstrata (AST)."""
@@ -30,20 +88,25 @@ def show_ast(ast, verbose=False):
         print("Erro: Não foi possível gerar a AST.")
     return ast
 
-def run_semantic_analysis(ast, verbose=False):
-    """Executa a análise semântica e exibe os resultados."""
-    analyzer = SemanticAnalyzer()
-    is_valid, errors, warnings = analyzer.analyze(ast)
-    
+def show_semantic_diagnostics(warnings, errors):
+    """Exibe os avisos e erros semânticos."""
     if warnings:
         print("=== Avisos Semânticos ===")
         for warning in warnings:
-            print(f"Aviso: {warning}")
+            print(f"Aviso: {format_diagnostic(warning)}")
     
-    if not is_valid:
+    if errors:
         print("=== Erros Semânticos ===")
         for error in errors:
-            print(f"Erro: {error}")
+            print(f"Erro: {format_diagnostic(error)}")
+
+def run_semantic_analysis(ast, verbose=False, diagnostics=None):
+    """Executa a análise semântica e exibe os resultados."""
+    from semantic import SemanticAnalyzer
+    analyzer = SemanticAnalyzer(diagnostics)
+    is_valid, errors, warnings = analyzer.analyze(ast)
+    show_semantic_diagnostics(warnings, errors)
+    if not is_valid:
         return None
     
     if verbose:
@@ -51,56 +114,300 @@ def run_semantic_analysis(ast, verbose=False):
     
     return analyzer.current_scope
 
-def generate_and_show_code(ast, symbol_table, output_file=None, verbose=False):
+def generate_and_show_code(ast, symbol_table, output_file=None, verbose=False, opt_level=0, stdout=None,
+                           binary=False, profiler=NULL_PROFILER):
     """Gera o código intermediário e opcionalmente salva em um arquivo."""
+    from codegen import generate_code
     if not ast or not symbol_table:
         print("Erro: Não é possível gerar código sem AST ou tabela de símbolos válida.")
         return None
     
-    code = generate_code(ast, symbol_table)
+    if opt_level > 0:
+        from optimizer import optimize_ast
+        with profiler.phase('optimizer'):
+            ast, removed = optimize_ast(ast)
+        if verbose:
+            print(f"Otimização da AST (-O{opt_level}): {removed} nós removidos")
     
+    with profiler.phase('codegen'):
+        code = generate_code(ast, symbol_table)
+    if opt_level > 0:
+        import peephole
+        before = peephole.instruction_count(code)
+        with profiler.phase('peephole'):
+            code = peephole.optimize(code, opt_level)
+        if verbose:
+            after = peephole.instruction_count(code)
+            print(f"Otimização peephole (-O{opt_level}): {before} -> {after} instruções")
+    if profiler.enabled:
+        import peephole
+        profiler.count('instructions', peephole.instruction_count(code))
+    
+    with profiler.phase('output'):
+        show_code(code, output_file, verbose, stdout, binary)
+    return code
+
+def stream_code(ast, symbol_table, output_file, stdout=None):
+    """Gera o código diretamente para o arquivo de saída (ou stdout, com '-').
+
+    As instruções não ficam em memória: são escritas em blocos à medida que
+    são geradas. Devolve o número de instruções escritas.
+    """
+    from codegen import write_code
+    if output_file == '-':
+        return write_code(ast, symbol_table, stdout or sys.stdout)
+    with open(output_file, 'w') as f:
+        count = write_code(ast, symbol_table, f)
+    print(f"Código gerado salvo em: {output_file}")
+    return count
+
+def show_code(code, output_file=None, verbose=False, stdout=None, binary=False):
+    """Mostra o código gerado (modo verboso) e salva-o no arquivo de saída.
+
+    Com `binary`, o arquivo de saída usa o formato compacto .ewvb.
+    """
     if verbose:
         print("=== Código Gerado ===")
         for instruction in code:
             print(instruction)
     
-    if output_file:
+    if binary and output_file:
+        import bytecode
+        data = bytecode.encode(code)
+        if output_file == '-':
+            stream = stdout or sys.stdout
+            stream.flush()
+            stream.buffer.write(data)
+            stream.buffer.flush()
+        else:
+            with open(output_file, 'wb') as f:
+                f.write(data)
+            print(f"Código gerado salvo em: {output_file}")
+    elif output_file == '-':
+        (stdout or sys.stdout).writelines(f"{instruction}\n" for instruction in code)
+    elif output_file:
         with open(output_file, 'w') as f:
-            for instruction in code:
-                f.write(f"{instruction}\n")
+            f.writelines(f"{instruction}\n" for instruction in code)
         print(f"Código gerado salvo em: {output_file}")
+
+def run_code(code, verbose=False):
+    """Executa código EWVM no interpretador local."""
+    import ewvm
+    try:
+        machine = ewvm.run(code)
+    except ewvm.EWVMError as e:
+        print(f"\nErro de execução: {e}")
+        return False
+    if verbose:
+        print(f"\n=== Execução terminada: {machine.steps} instruções executadas ===")
+    return True
+
+def load_program(file_path):
+    """Lê um programa já gerado, em texto (.ewvm) ou no formato binário (.ewvb).
+
+    Devolve o ewvm.Program, ou None (com a mensagem de erro já mostrada).
+    """
+    import ewvm
+    import bytecode
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if bytecode.is_bytecode(data):
+            return bytecode.decode(data)
+        return ewvm.assemble(data.decode('utf-8'))
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{file_path}' não encontrado.")
+    except UnicodeDecodeError:
+        print(f"Erro: '{file_path}' não é um ficheiro EWVM válido.")
+    except ewvm.EWVMError as e:
+        print(f"Erro: {e}")
+    return None
+
+def run_file(file_path, options):
+    """Executa um ficheiro .ewvm (ou .ewvb) já gerado."""
+    program = load_program(file_path)
+    if program is None:
+        return False
+    return run_code(program, options.verbose)
+
+def disassemble_file(file_path, options):
+    """Converte um ficheiro .ewvb de volta para texto EWVM (para -o ou stdout)."""
+    program = load_program(file_path)
+    if program is None:
+        return False
+    import bytecode
+    show_code(bytecode.disassemble(program), options.output or '-')
+    return True
+
+def output_path(file_path, options):
+    """Arquivo de saída do código gerado (None se não for para escrever)."""
+    if options.no_code:
+        return None
+    # Por omissão, o nome do arquivo de saída é baseado no de entrada
+    extension = BYTECODE_EXTENSION if options.binary else '.ewvm'
+    return options.output or os.path.splitext(file_path)[0] + extension
+
+def compile_cached(entry, file_path, options, stdout=None):
+    """Repete o resultado de uma compilação guardada na cache."""
+    if options.verbose:
+        print("Resultado reutilizado da cache de compilação")
+    diagnostics = entry.diagnostics
+    show_syntax_errors(diagnostics)
+    show_semantic_diagnostics(diagnostics.warnings('semantic'), diagnostics.errors('semantic'))
+    if diagnostics.has_errors:
+        return False
     
-    return code
+    if not options.no_code or options.run:
+        output_file = output_path(file_path, options)
+        if options.verbose or options.run or options.binary:
+            code = entry.code
+            show_code(code, output_file, options.verbose, stdout, options.binary)
+            if options.run:
+                return run_code(code, options.verbose)
+        elif output_file == '-':
+            entry.copy_code(stdout or sys.stdout)
+        else:
+            # O código é copiado da cache sem ser carregado em memória
+            with open(output_file, 'w') as f:
+                entry.copy_code(f)
+            print(f"Código gerado salvo em: {output_file}")
+    return True
+
+def show_profile(profiler, file_path, options):
+    """Mostra as medições das fases (tabela de texto ou JSON)."""
+    if options.profile == 'json':
+        print(profiler.to_json(file=file_path, opt_level=options.opt_level))
+    else:
+        print(f"=== Perfil da compilação: {file_path} ===")
+        print(profiler.report())
 
 def compile_file(file_path, options):
-    """Compila um arquivo Pascal completo."""
+    """Compila um arquivo Pascal completo. Devolve True se não houve erros."""
+    profiler = Profiler() if options.profile else NULL_PROFILER
+    stdout = None
     try:
-        with open(file_path, 'r') as f:
-            source_code = f.read()
-        
+        if options.output == '-' and not options.no_code:
+            # O código vai para stdout; as restantes mensagens vão para stderr
+            stdout = sys.stdout
+            with contextlib.redirect_stdout(sys.stderr):
+                return _compile_file(file_path, options, stdout, profiler)
+        return _compile_file(file_path, options, profiler=profiler)
+    finally:
+        if profiler.enabled:
+            profiler.stop()
+            with contextlib.redirect_stdout(sys.stderr if stdout else sys.stdout):
+                show_profile(profiler, file_path, options)
+
+def _compile_file(file_path, options, stdout=None, profiler=NULL_PROFILER):
+    try:
+        if profiler.enabled:
+            load_phases(options)
         if options.tokens_only:
-            show_tokens(source_code, options.verbose)
-            return
+            # Só o lexer é carregado. O ficheiro é lido por blocos e os tokens são mostrados à medida
+            # que aparecem: a memória usada não cresce com o tamanho do fonte
+            diagnostics = Diagnostics()
+            with profiler.phase('lexer'):
+                count = show_tokens(read_chunks(file_path), options.verbose, diagnostics)
+            profiler.count('tokens', count)
+            return not diagnostics.has_errors
+        
+        from lexer import get_tokens, get_chunk_tokens
+        tokens = None
+        if os.path.getsize(file_path) > LARGE_SOURCE:
+            # Fonte muito grande: é lido por blocos diretamente para um
+            # TokenBuffer, sem ficar em memória como texto; as linhas e
+            # colunas dos diagnósticos vêm de um LineIndex. Não passa pela
+            # cache, onde uma entrada deste tamanho não caberia
+            source_code = None
+            lines = LineIndex()
+            diagnostics = Diagnostics(lines)
+            with profiler.phase('lexer'):
+                tokens = get_chunk_tokens(lines.scan(read_chunks(file_path)), diagnostics)
+            profiler.count('tokens', len(tokens))
+        else:
+            with profiler.phase('read'):
+                with open(file_path, 'r') as f:
+                    source_code = f.read()
+            diagnostics = Diagnostics(source_code)
+            if profiler.enabled:
+                # Para medir a análise léxica à parte, os tokens são obtidos
+                # primeiro (num TokenBuffer) e o parser consome-os depois
+                with profiler.phase('lexer'):
+                    tokens = get_tokens(source_code, diagnostics)
+                profiler.count('tokens', len(tokens))
+        
+        # Cache de compilação: um fonte já compilado (com a mesma versão do
+        # compilador e as mesmas opções) não passa de novo pelas fases. Com
+        # --profile compila-se sempre, para medir as fases
+        cache = key = None
+        if (source_code is not None and not options.ast_only and not options.no_cache
+                and not profiler.enabled):
+            from cache import CompilationCache
+            cache = CompilationCache()
+            key = cache.key(source_code, options.opt_level)
+            entry = cache.get(key, source_code)
+            if entry is not None and (entry.code_path is not None or entry.diagnostics.has_errors
+                                      or (options.no_code and not options.run)):
+                return compile_cached(entry, file_path, options, stdout)
         
         # Análise sintática
-        ast = parse(source_code)
+        parse = load_parser(options.parser)
+        with profiler.phase('parser'):
+            ast = parse(source_code, diagnostics, tokens)
+        if profiler.enabled and ast is not None:
+            from visitor import count_nodes
+            profiler.count('nodes', count_nodes(ast))
+        if diagnostics.has_errors:
+            show_syntax_errors(diagnostics)
+            if ast is not None and options.ast_only:
+                # AST parcial, com ErrorNodes no lugar das construções inválidas
+                show_ast(ast, options.verbose)
+            elif ast is not None:
+                # A AST parcial (com ErrorNodes no lugar das construções
+                # inválidas) ainda passa pela análise semântica, para que
+                # todos os erros sejam mostrados de uma vez
+                with profiler.phase('semantic'):
+                    run_semantic_analysis(ast, options.verbose, diagnostics)
+            if cache:
+                cache.put(key, diagnostics)
+            return False
         if options.ast_only:
-            show_ast(ast, options.verbose)
-            return
+            return show_ast(ast, options.verbose) is not None
         
         # Análise semântica
-        symbol_table = run_semantic_analysis(ast, options.verbose)
+        with profiler.phase('semantic'):
+            symbol_table = run_semantic_analysis(ast, options.verbose, diagnostics)
         if not symbol_table:
-            return  # Erros semânticos encontrados
+            if cache:
+                cache.put(key, diagnostics)
+            return False  # Erros semânticos encontrados
         
         # Geração de código
-        output_file = options.output
-        if not output_file and not options.no_code:
-            # Nome do arquivo de saída baseado no de entrada
-            output_file = os.path.splitext(file_path)[0] + '.ewvm'
+        output_file = output_path(file_path, options)
+        if (output_file and options.opt_level == 0 and not options.run and not options.verbose
+                and not options.binary):
+            # Sem otimizações nem execução, o código não precisa de ficar em
+            # memória: é escrito à medida que é gerado
+            with profiler.phase('codegen'):
+                count = stream_code(ast, symbol_table, output_file, stdout)
+            profiler.count('instructions', count)
+            if cache and output_file != '-':
+                cache.put(key, diagnostics, code_path=output_file)
+            return True
         
-        if not options.no_code:
-            generate_and_show_code(ast, symbol_table, output_file, options.verbose)
+        code = None
+        if not options.no_code or options.run:
+            code = generate_and_show_code(ast, symbol_table, output_file,
+                                          options.verbose, options.opt_level, stdout, options.binary,
+                                          profiler)
+            if code is None:
+                return False
+        if cache:
+            cache.put(key, diagnostics, code)
+        if options.run:
+            with profiler.phase('run'):
+                return run_code(code, options.verbose)
+        return True
         
     except FileNotFoundError:
         print(f"Erro: Arquivo '{file_path}' não encontrado.")
@@ -109,18 +416,107 @@ def compile_file(file_path, options):
         if options.verbose:
             import traceback
             traceback.print_exc()
+    return False
+
+# ---- Modo batch: compila uma diretoria inteira num pool de processos ----
+
+def _init_batch_worker():
+    """Inicializa um processo do pool.
+
+    O lexer e os parsers (incluindo as tabelas LALR) são carregados uma
+    única vez por processo, no import dos módulos; este inicializador apenas
+    força esse carregamento antes do primeiro ficheiro.
+    """
+    import lexer, parser, rdparser  # noqa: F401
+
+def _compile_batch_item(file_path, options):
+    """Compila um ficheiro dentro de um processo do pool.
+
+    Devolve (caminho, sucesso, saída capturada, tempo em segundos).
+    """
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        ok = compile_file(file_path, options)
+    return file_path, bool(ok), output.getvalue(), time.perf_counter() - start
+
+def find_sources(directory):
+    """Lista, por ordem, os ficheiros .pas de uma diretoria (recursivamente)."""
+    sources = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith('.pas'):
+                sources.append(os.path.join(root, name))
+    return sorted(sources)
+
+def compile_directory(directory, options):
+    """Compila todos os ficheiros .pas de uma diretoria em paralelo.
+
+    Mostra o estado de cada ficheiro, o tempo total e o débito em
+    ficheiros/segundo. Devolve o número de ficheiros com erros.
+    """
+    sources = find_sources(directory)
+    if not sources:
+        print(f"Erro: Nenhum ficheiro .pas encontrado em '{directory}'.")
+        return 1
+
+    # Em modo batch cada ficheiro gera o seu próprio .ewvm
+    options.output = None
+    jobs = options.jobs or os.cpu_count() or 1
+    from concurrent.futures import ProcessPoolExecutor
+
+    failures = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker) as pool:
+        futures = [pool.submit(_compile_batch_item, path, options) for path in sources]
+        for future in futures:
+            path, ok, output, elapsed = future.result()
+            if not ok:
+                failures += 1
+            print(f"[{'OK' if ok else 'ERRO'}] {path} ({elapsed * 1000:.1f} ms)")
+            if output and (not ok or options.verbose or options.profile):
+                for line in output.rstrip().splitlines():
+                    print(f"    {line}")
+    total = time.perf_counter() - start
+
+    print(f"=== {len(sources)} ficheiros, {failures} com erros, {jobs} processos ===")
+    print(f"Tempo total: {total:.3f} s ({len(sources) / total:.1f} ficheiros/s)")
+    return failures
 
 def main():
     parser = argparse.ArgumentParser(description='Compilador Pascal')
-    parser.add_argument('source', help='Arquivo fonte Pascal a ser compilado')
-    parser.add_argument('-o', '--output', help='Arquivo de saída para o código gerado')
+    parser.add_argument('source', help='Arquivo fonte Pascal (ou diretoria, em modo batch) a ser compilado')
+    parser.add_argument('-o', '--output', help="Arquivo de saída para o código gerado ('-' para stdout)")
     parser.add_argument('-t', '--tokens-only', action='store_true', help='Executa apenas a análise léxica')
     parser.add_argument('-a', '--ast-only', action='store_true', help='Executa a análise sintática e mostra a AST')
     parser.add_argument('-n', '--no-code', action='store_true', help='Não gerar código, apenas analisar')
     parser.add_argument('-v', '--verbose', action='store_true', help='Modo verboso, mostra mais informações')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Número de processos no modo batch (por omissão, um por CPU)')
+    parser.add_argument('-O', dest='opt_level', type=int, choices=(0, 1), default=0, help='Nível de otimização do código gerado (-O1: simplificação da AST, otimização de ciclos e otimizador peephole)')
+    parser.add_argument('--no-cache', action='store_true', help='Não usar a cache de compilação (recompila sempre)')
+    parser.add_argument('-r', '--run', action='store_true', help='Executa o código gerado (ou um ficheiro .ewvm/.ewvb) no interpretador local')
+    parser.add_argument('--profile', '--timings', dest='profile', nargs='?', const='text', choices=('text', 'json'),
+                        help='Mostra o tempo real, o tempo de CPU e o pico de memória de cada fase '
+                             '(em texto ou, com --profile=json, em JSON)')
+    parser.add_argument('--parser', choices=PARSERS, default='ply',
+                        help='Parser a usar: ply (LALR, com recuperação de erros) ou rd (descendente recursivo, mais rápido; recorre ao ply quando há erros de sintaxe)')
+    parser.add_argument('-b', '--binary', action='store_true', help='Escreve o código no formato binário compacto (.ewvb)')
     
     args = parser.parse_args()
-    compile_file(args.source, args)
+    # Um arquivo de saída .ewvb implica o formato binário
+    args.binary = args.binary or (args.output or '').lower().endswith(BYTECODE_EXTENSION)
+    source = args.source.lower()
+    if source.endswith(BYTECODE_EXTENSION) and not args.run:
+        # Sem --run, um ficheiro binário é convertido de volta para texto
+        sys.exit(0 if disassemble_file(args.source, args) else 1)
+    if source.endswith(('.ewvm', BYTECODE_EXTENSION)):
+        if not args.run:
+            parser.error("ficheiros .ewvm só podem ser usados com --run")
+        sys.exit(0 if run_file(args.source, args) else 1)
+    if os.path.isdir(args.source):
+        failures = compile_directory(args.source, args)
+        sys.exit(1 if failures else 0)
+    sys.exit(0 if compile_file(args.source, args) else 1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
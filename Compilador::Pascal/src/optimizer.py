@@ -0,0 +1,184 @@
+"""
+Otimizações sobre a AST, entre a análise semântica e a geração de código.
+
+A AST já foi validada pelo SemanticAnalyzer, pelo que os tipos dos operandos
+são os esperados por cada operador. O ASTOptimizer:
+
+  - dobra expressões constantes (aritméticas, relacionais e lógicas);
+  - simplifica identidades: x*1, x+0, x-0, x div 1, b and true, b or false,
+    not not b, e x*0, b and false, b or true quando x/b não têm efeitos
+    (não contêm chamadas de funções);
+  - elimina if e while com condições constantes, ficando apenas o ramo que
+    é executado (ou nada).
+
+Segue-se a otimização de ciclos do LoopOptimizer (loops.py).
+
+O número de nós removidos da árvore fica em ASTOptimizer.removed.
+"""
+
+from parser import Node
+from visitor import Visitor, walk, count_nodes
+from loops import optimize_loops
+
+
+def _trunc_div(a, b):
+    """Divisão inteira truncada para zero (como DIV na EWVM)."""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': _trunc_div,
+    'div': _trunc_div,
+    'mod': lambda a, b: a - b * _trunc_div(a, b),
+}
+
+RELATIONAL = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+LOGICAL = {
+    'and': lambda a, b: a and b,
+    'or': lambda a, b: a or b,
+}
+
+
+def _constant_value(node):
+    """Valor de uma constante inteira ou booleana, ou None se não for constante."""
+    if node.type == 'IntegerConstant':
+        return node.leaf
+    if node.type == 'BooleanConstant':
+        return node.leaf.lower() == 'true'
+    return None
+
+
+def _make_constant(value, pos):
+    """Nó constante para um valor inteiro ou booleano."""
+    if isinstance(value, bool):
+        return Node('BooleanConstant', [], 'true' if value else 'false', pos)
+    return Node('IntegerConstant', [], value, pos)
+
+
+def _is_pure(node):
+    """True se a expressão pode ser descartada sem alterar o programa."""
+    return all(child.type != 'FunctionCall' for child, _ in walk(node))
+
+
+class ASTOptimizer(Visitor):
+    prefix = 'optimize_'  # visit() devolve o nó que substitui o nó visitado
+
+    def __init__(self):
+        self.removed = 0  # Número de nós removidos da AST
+
+    def optimize(self, ast):
+        """Otimiza a AST e devolve a nova raiz."""
+        return self.visit(ast) if ast else ast
+
+    def replace(self, old, new):
+        """Substitui `old` por `new`, contabilizando os nós removidos."""
+        if any(child is new for child in old.children):
+            # Só é preciso contar os irmãos descartados (new pode ser uma
+            # cadeia muito longa de operações)
+            self.removed += 1 + sum(count_nodes(child) for child in old.children if child is not new)
+        else:
+            self.removed += count_nodes(old) - count_nodes(new)
+        return new
+
+    def generic_visit(self, node):
+        """Otimiza os filhos, substituindo-os na própria lista."""
+        children = node.children
+        for i, child in enumerate(children):
+            if child:
+                children[i] = yield child
+        return node
+
+    def optimize_StatementList(self, node):
+        yield from self.generic_visit(node)
+        statements = [child for child in node.children if child.type != 'Empty']
+        self.removed += len(node.children) - len(statements)
+        node.children = statements
+        return node
+
+    def optimize_BinaryOperation(self, node):
+        yield from self.generic_visit(node)
+        left, right = node.children
+        operator = node.leaf.lower()
+        a, b = _constant_value(left), _constant_value(right)
+
+        if a is not None and b is not None:
+            if operator in ARITHMETIC and not (operator in ('/', 'div', 'mod') and b == 0):
+                return self.replace(node, _make_constant(ARITHMETIC[operator](a, b), node.pos))
+            if operator in RELATIONAL:
+                return self.replace(node, _make_constant(RELATIONAL[operator](a, b), node.pos))
+            if operator in LOGICAL:
+                return self.replace(node, _make_constant(LOGICAL[operator](a, b), node.pos))
+            return node
+
+        # Identidades com um operando constante
+        if operator == '+' and (a == 0 or b == 0):
+            return self.replace(node, right if a == 0 else left)
+        if operator == '-' and b == 0:
+            return self.replace(node, left)
+        if operator == '*' and (a == 1 or b == 1):
+            return self.replace(node, right if a == 1 else left)
+        if operator in ('/', 'div') and b == 1:
+            return self.replace(node, left)
+        if operator == '*' and (a == 0 or b == 0) and _is_pure(left) and _is_pure(right):
+            return self.replace(node, _make_constant(0, node.pos))
+        if operator in LOGICAL and (a is not None or b is not None):
+            constant, other = (a, right) if a is not None else (b, left)
+            # true and x = x; false or x = x
+            if constant == (operator == 'and'):
+                return self.replace(node, other)
+            # false and x = false; true or x = true
+            if _is_pure(other):
+                return self.replace(node, _make_constant(constant, node.pos))
+        return node
+
+    def optimize_UnaryOperation(self, node):
+        yield from self.generic_visit(node)
+        operand = node.children[0]
+        value = _constant_value(operand)
+        if value is not None:
+            return self.replace(node, _make_constant(not value, node.pos))
+        # not not b = b
+        if operand.type == 'UnaryOperation' and operand.leaf.lower() == 'not':
+            return self.replace(node, operand.children[0])
+        return node
+
+    def optimize_IfStatement(self, node):
+        yield from self.generic_visit(node)
+        value = _constant_value(node.children[0])
+        if value is None:
+            return node
+        if value:
+            return self.replace(node, node.children[1])
+        if len(node.children) > 2:
+            return self.replace(node, node.children[2])
+        return self.replace(node, Node('Empty'))
+
+    def optimize_WhileStatement(self, node):
+        yield from self.generic_visit(node)
+        if _constant_value(node.children[0]) is False:
+            return self.replace(node, Node('Empty'))
+        return node
+
+
+def optimize_ast(ast, loops=True):
+    """Otimiza a AST. Devolve (nova raiz, número de nós removidos).
+
+    Com `loops`, otimiza depois os ciclos (loops.py).
+    """
+    optimizer = ASTOptimizer()
+    ast = optimizer.optimize(ast)
+    if loops:
+        ast, _ = optimize_loops(ast)
+    return ast, optimizer.removed
@@ -1,47 +1,64 @@
 import ply.yacc as yacc
-from lexer import tokens
+from lexer import tokens, new_lexer
+from diagnostics import Diagnostics
 import sys
-
-# Ativa modo de depuração
-DEBUG = True
+import os
+import copy
+import hashlib
+
+# Ativa modo de depuração (avisos da validação de nós, em stderr)
+DEBUG = os.environ.get('PASCAL_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+# Validação dos filhos de cada nó (apenas para depuração). Por omissão os
+# nós são construídos sem verificar os filhos: as regras da gramática já
+# garantem que só recebem objetos Node.
+VALIDATE_NODES = os.environ.get('PASCAL_VALIDATE_AST', '').lower() in ('1', 'true', 'yes')
+
+def _validated_children(node_type, children):
+    """Substitui filhos que não são Node por nós de erro."""
+    validated_children = []
+    for child in children:
+        if not isinstance(child, Node):
+            if DEBUG:
+                print(f"AVISO: Convertendo {type(child)} para Node em {node_type}", file=sys.stderr)
+            validated_children.append(Node('ErrorNode', [], str(child)))
+        else:
+            validated_children.append(child)
+    return validated_children
 
 class Node:
-    def __init__(self, type, children=None, leaf=None):
+    __slots__ = ('type', 'children', 'leaf', 'pos', 'symbol')
+
+    def __init__(self, type, children=None, leaf=None, pos=None):
         self.type = type
         if children is None:
             self.children = []
-        elif isinstance(children, list):
-            # Verifica cada filho e substitui strings por nós de erro
-            validated_children = []
-            for i, child in enumerate(children):
-                if not isinstance(child, Node):
-                    if DEBUG:
-                        print(f"AVISO: Convertendo {type(child)} para Node em {type}")
-                    validated_children.append(Node('ErrorNode', [], str(child)))
-                else:
-                    validated_children.append(child)
-            self.children = validated_children
+        elif children.__class__ is list:
+            # Caminho rápido: a lista é usada diretamente, sem cópia
+            self.children = _validated_children(type, children) if VALIDATE_NODES else children
         else:
             # Se não for uma lista, envolvemos em uma lista com um único item
-            if not isinstance(children, Node):
-                if DEBUG:
-                    print(f"AVISO: Convertendo único filho {type(children)} para Node em {type}")
-                self.children = [Node('ErrorNode', [], str(children))]
-            else:
-                self.children = [children]
-        
+            self.children = _validated_children(type, [children])
         self.leaf = leaf
+        self.pos = pos  # Posição no código fonte (lexpos), usada nos diagnósticos
+        self.symbol = None  # Symbol do identificador, ligado pela análise semântica
 
     def pretty(self, level=0):
-        result = " " * (level * 2) + self.type
-        if self.leaf is not None:
-            result += f": {self.leaf}"
-        result += "\n"
-        for child in self.children:
-            if not isinstance(child, Node):
-                raise TypeError(f"Expected Node object but got {type(child)} in {self.type} node")
-            result += child.pretty(level + 1)
-        return result
+        # Pilha explícita: a profundidade da árvore não é limitada pela
+        # pilha do Python
+        lines = []
+        stack = [(self, level)]
+        while stack:
+            node, depth = stack.pop()
+            line = " " * (depth * 2) + node.type
+            if node.leaf is not None:
+                line += f": {node.leaf}"
+            lines.append(line + "\n")
+            for child in reversed(node.children):
+                if not isinstance(child, Node):
+                    raise TypeError(f"Expected Node object but got {type(child)} in {node.type} node")
+                stack.append((child, depth + 1))
+        return "".join(lines)
 
     def __str__(self):
         return self.pretty()
@@ -49,17 +66,24 @@ class Node:
 
 def p_program(p):
     '''program : PROGRAM ID SEMICOLON program_block DOT'''
-    p[0] = Node('Program', [Node('ID', [], p[2]), p[4]])
+    p[0] = Node('Program', [Node('ID', [], p[2], p.lexpos(2)), p[4]], pos=p.lexpos(1))
+
+def p_program_error(p):
+    '''program : PROGRAM error program_block DOT'''
+    # Cabeçalho inválido: retoma nas declarações ou no bloco principal
+    p[0] = Node('Program', [Node('ID', [], None, p.lexpos(2)), p[3]], pos=p.lexpos(1))
 
 def p_block(p):
     '''block : declarations compound_statement'''
     p[0] = Node('Block', [p[1], p[2]])
 
 def p_program_block(p):
-    '''program_block : function_declarations declarations compound_statement
+    '''program_block : declarations subprogram_declarations declarations compound_statement
                      | declarations compound_statement'''
+    # As variáveis globais podem ser declaradas antes e/ou depois dos
+    # subprogramas; os subprogramas só veem as que foram declaradas antes
     if len(p) > 3:
-        p[0] = Node('ProgramBlock', [p[1], p[2], p[3]])
+        p[0] = Node('ProgramBlock', [p[1], p[2], p[3], p[4]])
     else:
         p[0] = Node('ProgramBlock', [p[1], p[2]])
 
@@ -71,6 +95,16 @@ def p_declarations(p):
     else:
         p[0] = Node('Declarations', [p[1]]) 
 
+def p_declarations_error(p):
+    '''declarations : VAR declaration_list error
+                    | VAR error'''
+    # Erro no fim das declarações (p.ex. ';' em falta antes do 'begin'):
+    # retoma no 'begin' ou no subprograma seguinte, mantendo as declarações
+    # já reconhecidas
+    declarations = p[2] if len(p) > 3 else Node('DeclarationList', [])
+    declarations.children.append(error_node(p, len(p) - 1))
+    p[0] = Node('Declarations', [declarations])
+
 def p_declaration_list(p):
     '''declaration_list : declaration_list declaration
                         | declaration'''
@@ -98,15 +132,57 @@ def p_declaration(p):
             else:
                 p[i] = Node('ErrorNode', [], str(p[i]))
     
-    p[0] = Node('Declaration', [p[1], p[3]])
+    p[0] = Node('Declaration', [p[1], p[3]], pos=p[1].pos)
+
+def p_declaration_error(p):
+    '''declaration : error SEMICOLON'''
+    # Declaração inválida: retoma na declaração seguinte
+    p[0] = error_node(p)
+
+def p_declaration_missing_semicolon(p):
+    '''declaration : id_list COLON type error'''
+    # ';' em falta no fim da declaração: a declaração é mantida (as
+    # variáveis ficam declaradas) e a análise retoma no que se segue
+    p[0] = Node('Declaration', [p[1], p[3]], pos=p[1].pos)
+
+def p_subprogram_declarations(p):
+    '''subprogram_declarations : subprogram_declarations subprogram_declaration
+                               | subprogram_declaration'''
+    if len(p) > 2:
+        p[1].children.append(p[2])
+        p[0] = p[1]
+    else:
+        p[0] = Node('SubprogramDeclarations', [p[1]])
+
+def p_subprogram_declaration(p):
+    '''subprogram_declaration : function_declaration
+                              | procedure_declaration'''
+    p[0] = p[1]
 
-def p_function_declarations(p):
-    '''function_declarations : function_declaration'''
-    p[0] = Node('FunctionDeclarations', [p[1]])
+def p_subprogram_declaration_error(p):
+    '''subprogram_declaration : FUNCTION error block SEMICOLON
+                              | PROCEDURE error block SEMICOLON'''
+    # Cabeçalho inválido: o corpo é analisado sintaticamente (para encontrar
+    # os seus erros), mas o subprograma não entra na AST
+    p[0] = error_node(p, 2)
 
 def p_function_declaration(p):
-    '''function_declaration : FUNCTION ID formal_parameters COLON type SEMICOLON block SEMICOLON'''
-    p[0] = Node('FunctionDeclaration', [Node('ID', [], p[2]), p[3], p[5], p[7]])
+    '''function_declaration : FUNCTION ID formal_parameters COLON type SEMICOLON block SEMICOLON
+                            | FUNCTION ID COLON type SEMICOLON block SEMICOLON'''
+    if len(p) > 8:
+        parameters, return_type, body = p[3], p[5], p[7]
+    else:
+        parameters, return_type, body = Node('FormalParameters', []), p[4], p[6]
+    p[0] = Node('FunctionDeclaration', [Node('ID', [], p[2], p.lexpos(2)), parameters, return_type, body], pos=p.lexpos(1))
+
+def p_procedure_declaration(p):
+    '''procedure_declaration : PROCEDURE ID formal_parameters SEMICOLON block SEMICOLON
+                             | PROCEDURE ID SEMICOLON block SEMICOLON'''
+    if len(p) > 6:
+        parameters, body = p[3], p[5]
+    else:
+        parameters, body = Node('FormalParameters', []), p[4]
+    p[0] = Node('ProcedureDeclaration', [Node('ID', [], p[2], p.lexpos(2)), parameters, body], pos=p.lexpos(1))
 
 def p_formal_parameters(p):
     '''formal_parameters : LPAREN parameter_list RPAREN
@@ -117,8 +193,13 @@ def p_formal_parameters(p):
         p[0] = Node('FormalParameters', [])
 
 def p_parameter_list(p):
-    '''parameter_list : parameter'''
-    p[0] = Node('ParameterList', [p[1]])
+    '''parameter_list : parameter_list SEMICOLON parameter
+                      | parameter'''
+    if len(p) > 2:
+        p[1].children.append(p[3])
+        p[0] = p[1]
+    else:
+        p[0] = Node('ParameterList', [p[1]])
 
 def p_parameter(p):
     '''parameter : id_list COLON type'''
@@ -132,10 +213,10 @@ def p_id_list(p):
         if not isinstance(p[1], Node):
             p[1] = Node('IDList', [])
         
-        p[1].children.append(Node('ID', [], p[3]))
+        p[1].children.append(Node('ID', [], p[3], p.lexpos(3)))
         p[0] = p[1]
     else:
-        p[0] = Node('IDList', [Node('ID', [], p[1])])
+        p[0] = Node('IDList', [Node('ID', [], p[1], p.lexpos(1))], pos=p.lexpos(1))
     
 def p_type(p):
     '''type : INTEGER
@@ -187,6 +268,11 @@ def p_statement(p):
                  | empty'''
     p[0] = p[1]
 
+def p_statement_error(p):
+    '''statement : error'''
+    # Instrução inválida: os tokens são descartados até ';', 'end' ou 'else'
+    p[0] = error_node(p)
+
 def p_assignment_statement(p):
     '''assignment_statement : variable ASSIGN expression'''
     # Verificação de segurança
@@ -195,7 +281,7 @@ def p_assignment_statement(p):
     if not isinstance(p[3], Node):
         p[3] = Node('ErrorNode', [], str(p[3]))
         
-    p[0] = Node('Assignment', [p[1], p[3]])
+    p[0] = Node('Assignment', [p[1], p[3]], pos=p[1].pos)
 
 def p_if_statement(p):
     '''if_statement : IF expression THEN statement
@@ -209,9 +295,9 @@ def p_if_statement(p):
     if len(p) > 5:
         if not isinstance(p[6], Node):
             p[6] = Node('ErrorNode', [], str(p[6]))
-        p[0] = Node('IfStatement', [p[2], p[4], p[6]])
+        p[0] = Node('IfStatement', [p[2], p[4], p[6]], pos=p.lexpos(1))
     else:
-        p[0] = Node('IfStatement', [p[2], p[4]])
+        p[0] = Node('IfStatement', [p[2], p[4]], pos=p.lexpos(1))
 
 def p_while_statement(p):
     '''while_statement : WHILE expression DO statement'''
@@ -221,7 +307,7 @@ def p_while_statement(p):
     if not isinstance(p[4], Node):
         p[4] = Node('ErrorNode', [], str(p[4]))
         
-    p[0] = Node('WhileStatement', [p[2], p[4]])
+    p[0] = Node('WhileStatement', [p[2], p[4]], pos=p.lexpos(1))
 
 def p_for_statement(p):
     '''for_statement : FOR ID ASSIGN expression TO expression DO statement
@@ -235,7 +321,7 @@ def p_for_statement(p):
         p[8] = Node('ErrorNode', [], str(p[8]))
         
     direction = 'to' if p[5] == 'to' else 'downto'
-    p[0] = Node('ForStatement', [Node('ID', [], p[2]), p[4], p[6], p[8]], direction)
+    p[0] = Node('ForStatement', [Node('ID', [], p[2], p.lexpos(2)), p[4], p[6], p[8]], direction, p.lexpos(1))
 
 def p_procedure_call(p):
     '''procedure_call : ID LPAREN expression_list RPAREN
@@ -254,17 +340,17 @@ def p_procedure_call(p):
             # Verificação de segurança
             if not isinstance(p[3], Node):
                 p[3] = Node('ErrorNode', [], str(p[3]))
-            p[0] = Node('IOCall', [p[3]], p[1])
+            p[0] = Node('IOCall', [p[3]], p[1], p.lexpos(1))
         else:
-            p[0] = Node('IOCall', [], p[1])
+            p[0] = Node('IOCall', [], p[1], p.lexpos(1))
     else:
         if len(p) > 4:
             # Verificação de segurança
             if not isinstance(p[3], Node):
                 p[3] = Node('ErrorNode', [], str(p[3]))
-            p[0] = Node('ProcedureCall', [p[3]], p[1])
+            p[0] = Node('ProcedureCall', [p[3]], p[1], p.lexpos(1))
         else:
-            p[0] = Node('ProcedureCall', [], p[1])
+            p[0] = Node('ProcedureCall', [], p[1], p.lexpos(1))
 
 def p_expression_list(p):
     '''expression_list : expression_list COMMA expression
@@ -312,7 +398,7 @@ def p_expression(p):
         if not isinstance(p[3], Node):
             p[3] = Node('ErrorNode', [], str(p[3]))
             
-        p[0] = Node('BinaryOperation', [p[1], p[3]], p[2])
+        p[0] = Node('BinaryOperation', [p[1], p[3]], p[2], p[1].pos)
     else:
         p[0] = p[1]
 
@@ -335,13 +421,14 @@ def p_simple_expression(p):
         if not isinstance(p[3], Node):
             p[3] = Node('ErrorNode', [], str(p[3]))
             
-        p[0] = Node('BinaryOperation', [p[1], p[3]], p[2])
+        p[0] = Node('BinaryOperation', [p[1], p[3]], p[2], p[1].pos)
     else:
         p[0] = p[1]
 
 def p_additive_operator(p):
     '''additive_operator : PLUS
-                         | MINUS'''
+                         | MINUS
+                         | OR'''
     p[0] = p[1]
 
 def p_term(p):
@@ -353,7 +440,7 @@ def p_term(p):
         if not isinstance(p[3], Node):
             p[3] = Node('ErrorNode', [], str(p[3]))
             
-        p[0] = Node('BinaryOperation', [p[1], p[3]], p[2])
+        p[0] = Node('BinaryOperation', [p[1], p[3]], p[2], p[1].pos)
     else:
         p[0] = p[1]
 
@@ -365,12 +452,6 @@ def p_multiplicative_operator(p):
                                | AND'''
     p[0] = p[1]
 
-def p_logical_expression(p):
-    '''expression : expression AND expression
-                  | expression OR expression  
-                  | NOT expression'''         
-    p[0] = Node('LogicalOperation', [p[1], p[3]], p[2])
-
 def p_factor(p):
     '''factor : variable
               | INTEGER_CONST
@@ -379,19 +460,22 @@ def p_factor(p):
               | LPAREN expression RPAREN
               | function_call
               | TRUE
-              | FALSE'''
-    if isinstance(p[1], int):
-        p[0] = Node('IntegerConstant', [], p[1])
+              | FALSE
+              | NOT factor'''
+    if len(p) == 3:
+        p[0] = Node('UnaryOperation', [p[2]], p[1], p.lexpos(1))
+    elif isinstance(p[1], int):
+        p[0] = Node('IntegerConstant', [], p[1], p.lexpos(1))
     elif isinstance(p[1], float):
-        p[0] = Node('RealConstant', [], p[1])
+        p[0] = Node('RealConstant', [], p[1], p.lexpos(1))
     elif p.slice[1].type == 'STRING_CONST':
         # Removendo aspas se estiverem presentes
         value = p[1]
         if isinstance(value, str) and value.startswith("'") and value.endswith("'"):
             value = value[1:-1]
-        p[0] = Node('StringConstant', [], value)
+        p[0] = Node('StringConstant', [], value, p.lexpos(1))
     elif p.slice[1].type == 'TRUE' or p.slice[1].type == 'FALSE':
-        p[0] = Node('BooleanConstant', [], p[1])
+        p[0] = Node('BooleanConstant', [], p[1], p.lexpos(1))
     elif p.slice[1].type == 'LPAREN':
         # Verificação de segurança
         if not isinstance(p[2], Node):
@@ -409,9 +493,9 @@ def p_function_call(p):
         # Verificação de segurança
         if not isinstance(p[3], Node):
             p[3] = Node('ErrorNode', [], str(p[3]))
-        p[0] = Node('FunctionCall', [p[3]], p[1])
+        p[0] = Node('FunctionCall', [p[3]], p[1], p.lexpos(1))
     else:
-        p[0] = Node('FunctionCall', [], p[1])
+        p[0] = Node('FunctionCall', [], p[1], p.lexpos(1))
 
 def p_variable(p):
     '''variable : ID
@@ -420,14 +504,34 @@ def p_variable(p):
         # Verificação de segurança
         if not isinstance(p[3], Node):
             p[3] = Node('ErrorNode', [], str(p[3]))
-        p[0] = Node('ArrayAccess', [Node('ID', [], p[1]), p[3]])
+        p[0] = Node('ArrayAccess', [Node('ID', [], p[1], p.lexpos(1)), p[3]], pos=p.lexpos(1))
     else:
-        p[0] = Node('Variable', [], p[1])
+        p[0] = Node('Variable', [], p[1], p.lexpos(1))
 
 def p_empty(p):
     'empty :'
     p[0] = Node('Empty')
 
+# ---- Recuperação de erros ----
+#
+# Recuperação em modo pânico: perante um token inesperado, o PLY chama
+# p_error (que regista o diagnóstico), retira estados da pilha até chegar a
+# um em que o símbolo `error` possa ser aceite e descarta tokens até
+# encontrar um que possa seguir a regra de erro. As regras de erro existem
+# ao nível das instruções (retoma em ';', 'end' ou 'else'), das declarações
+# (retoma depois do ';') e dos cabeçalhos de subprogramas e do programa
+# (retoma no bloco seguinte). Assim, uma única passagem encontra todos os
+# erros de sintaxe e devolve uma AST parcial, em que cada construção
+# inválida é um ErrorNode.
+#
+# Para não repetir o mesmo erro, o PLY só volta a chamar p_error depois de
+# aceitar três tokens a seguir à recuperação.
+
+def error_node(p, index=1):
+    """ErrorNode para o símbolo `error` na posição `index` da regra."""
+    token = p[index]  # Token onde o erro foi detetado
+    return Node('ErrorNode', [], getattr(token, 'value', None), p.lexpos(index))
+
 # Sistema de tratamento de erros melhorado
 error_messages = {
     'PROGRAM': "Esperado 'program' para iniciar o programa",
@@ -446,33 +550,147 @@ error_messages = {
     'DOTDOT': "Esperado '..' para definir intervalo de array"
 }
 
-def p_error(p):
+def report_syntax_error(active_parser, diagnostics, p):
+    """Regista um erro de sintaxe do parser `active_parser` em `diagnostics`."""
     if p:
-        token_value = p.value
-        line_number = p.lineno if hasattr(p, 'lineno') else '?'
-        
         # Tentar sugerir a correção
         expected_token = None
         for token_type, message in error_messages.items():
             # Tenta adivinhar o token esperado com base no contexto
-            if hasattr(parser, 'symstack') and p.type != token_type and token_type in parser.symstack[-2:]:
+            if hasattr(active_parser, 'symstack') and p.type != token_type and token_type in active_parser.symstack[-2:]:
                 expected_token = token_type
                 break
         
-        error_msg = f"Erro de sintaxe na linha {line_number}: Token inesperado '{token_value}'"
+        line_number = p.lineno if hasattr(p, 'lineno') else None
         if expected_token:
-            error_msg += f"\nPode estar faltando um {error_messages.get(expected_token, expected_token)}"
-        
-        print(error_msg)
+            diagnostics.error('parser', "Erro de sintaxe na linha {line}: Token inesperado '{0}'\nPode estar faltando um {1}",
+                              p.value, error_messages[expected_token], line=line_number, pos=p.lexpos)
+        else:
+            diagnostics.error('parser', "Erro de sintaxe na linha {line}: Token inesperado '{0}'",
+                              p.value, line=line_number, pos=p.lexpos)
     else:
-        print("Erro de sintaxe: fim de arquivo inesperado")
-    
-    sys.exit(1)
+        diagnostics.error('parser', "Erro de sintaxe: fim de arquivo inesperado")
+
+def p_error(p):
+    # Cada chamada a parse() usa a sua própria cópia do parser, com um
+    # tratador de erros ligado aos seus diagnósticos; esta função só é usada
+    # por quem invoca diretamente o parser do módulo.
+    report_syntax_error(parser, parser.diagnostics, p)
+
+# ---- Cache das tabelas LALR ----
+#
+# As tabelas são guardadas numa diretoria de cache configurável (variável de
+# ambiente PASCAL_PARSER_CACHE, por omissão ~/.cache/pascal-compiler), num
+# ficheiro cujo nome inclui o hash da gramática. Uma alteração à gramática
+# gera simplesmente um novo ficheiro; nada é escrito ao lado das fontes.
+# O ficheiro parser.out só é gerado em modo de depuração (PASCAL_PARSER_DEBUG=1).
+
+DEBUG_TABLES = os.environ.get('PASCAL_PARSER_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+def default_cache_dir():
+    """Diretoria de cache das tabelas do parser."""
+    cache_dir = os.environ.get('PASCAL_PARSER_CACHE')
+    if cache_dir:
+        return cache_dir
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pascal-compiler')
+
+def grammar_hash():
+    """Hash da gramática (tokens, regras e versão do formato de tabelas do PLY)."""
+    pinfo = yacc.ParserReflect(globals(), log=yacc.NullLogger())
+    pinfo.get_all()
+    digest = hashlib.sha256()
+    digest.update(yacc.__tabversion__.encode('utf-8'))
+    digest.update(pinfo.signature().encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def build_parser(cache_dir=None, debug=None):
+    """Constrói o parser, reutilizando as tabelas em cache quando existem.
+
+    Se a diretoria de cache não puder ser criada ou escrita, as tabelas são
+    geradas em memória, sem escrever qualquer ficheiro.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    debug = DEBUG_TABLES if debug is None else debug
+    errorlog = yacc.PlyLogger(sys.stderr) if debug else yacc.NullLogger()
+    table_file = os.path.join(cache_dir, f'parsetab-{grammar_hash()}.pickle')
+
+    if os.path.exists(table_file):
+        try:
+            return yacc.yacc(picklefile=table_file, debug=False, errorlog=errorlog)
+        except Exception:
+            pass  # Tabela corrompida: volta a gerá-la
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        writable = os.access(cache_dir, os.W_OK)
+    except OSError:
+        writable = False
+
+    if not writable:
+        return yacc.yacc(write_tables=False, debug=False, errorlog=errorlog)
+
+    # Escreve num ficheiro temporário e renomeia, para que processos
+    # concorrentes (modo batch) nunca leiam uma tabela incompleta
+    temp_file = f'{table_file}.{os.getpid()}.tmp'
+    built = yacc.yacc(picklefile=temp_file, debug=debug, outputdir=cache_dir, errorlog=errorlog)
+    try:
+        os.replace(temp_file, table_file)
+    except OSError:
+        pass
+    return built
+
+def restrict_error_recovery(lr_parser):
+    """Impede ciclos infinitos na recuperação de erros das instruções.
+
+    As tabelas LALR juntam os lookaheads de `statement : error` de todos os
+    contextos (';', 'end' e 'else'). Um 'else' que não pertence a nenhum if
+    levaria o parser a reduzir a regra de erro, voltar a falhar no mesmo
+    token e reduzi-la de novo, sem nunca consumir tokens. Sem a ação para
+    'else', esse token é descartado como os restantes até ';' ou 'end'.
+    """
+    for number, production in enumerate(lr_parser.productions):
+        if str(production) == 'statement -> error':
+            for actions in lr_parser.action.values():
+                if actions.get('ELSE') == -number:
+                    del actions['ELSE']
 
 # Build the parser
-parser = yacc.yacc()
+parser = build_parser()
+restrict_error_recovery(parser)
+parser.diagnostics = Diagnostics()
+
+def new_parser(diagnostics):
+    """Cópia do parser com estado próprio (pilhas e diagnósticos).
+
+    As tabelas LALR são partilhadas (só são lidas); as pilhas de análise
+    são criadas em cada parse sobre a cópia, pelo que várias threads podem
+    analisar em simultâneo, cada uma com o seu parser.
+    """
+    instance = copy.copy(parser)
+    instance.diagnostics = diagnostics
+    instance.errorfunc = lambda p: report_syntax_error(instance, diagnostics, p)
+    return instance
 
 # Parse function
-def parse(data):
-    return parser.parse(data)
+def parse(data, diagnostics=None, tokens=None):
+    """Analisa o código fonte e devolve a AST.
+
+    Os erros léxicos e sintáticos são registados em `diagnostics`. Havendo
+    erros de sintaxe, devolve a AST parcial obtida pela recuperação de
+    erros (com ErrorNodes), ou None se o fim do ficheiro chegou antes de o
+    parser recuperar (p.ex. falta o 'end.' final).
+
+    Com `tokens` (um TokenBuffer de lexer.get_tokens sobre o mesmo `data`)
+    o parser consome esses tokens em vez de voltar a fazer a análise léxica;
+    os erros léxicos já foram registados quando o buffer foi criado.
+    """
+    if tokens is not None:
+        if diagnostics is None:
+            diagnostics = Diagnostics(data)
+        elif diagnostics.source is None:
+            diagnostics.source = data
+        return new_parser(diagnostics).parse(lexer=tokens.reader())
+    lexer = new_lexer(data, diagnostics)
+    return new_parser(lexer.diagnostics).parse(data, lexer=lexer)
 
@@ -0,0 +1,245 @@
+"""
+Otimizador peephole para o código EWVM gerado pelo CodeGenerator.
+
+Trabalha sobre a lista de instruções (texto), antes de esta ser escrita, e
+aplica as seguintes transformações até não haver mais alterações:
+
+  - dobragem de constantes: PUSHI a; PUSHI b; ADD -> PUSHI a+b (e os
+    restantes operadores aritméticos, relacionais e lógicos), identidades
+    como PUSHI 0; ADD e PUSHI 1; MUL, e saltos condicionais constantes;
+  - offsets de índices de arrays: PUSHI base; PADD; PUSHG i; PUSHI 1; SUB
+    seguido de LOADN (ou PADD) passa a PUSHI base-1; PADD; PUSHG i (quando
+    base-1 >= 0), e um elemento de índice constante de um array global passa
+    a um único PUSHG;
+  - pares store/load: PUSHG x; STOREG x desaparece e STOREG x; PUSHG x
+    passa a DUP 1; STOREG x;
+  - encadeamento de saltos: um salto para um JUMP passa a saltar
+    diretamente para o destino final; JUMP para a instrução seguinte
+    desaparece;
+  - código inalcançável depois de JUMP, STOP ou RETURN, até ao próximo
+    label usado, e labels que já ninguém usa.
+"""
+
+LABEL = ':'
+
+BINARY_FOLDS = {
+    'ADD': lambda a, b: a + b,
+    'SUB': lambda a, b: a - b,
+    'MUL': lambda a, b: a * b,
+    'EQUAL': lambda a, b: int(a == b),
+    'INF': lambda a, b: int(a < b),
+    'INFEQ': lambda a, b: int(a <= b),
+    'SUP': lambda a, b: int(a > b),
+    'SUPEQ': lambda a, b: int(a >= b),
+    'AND': lambda a, b: int(bool(a and b)),
+    'OR': lambda a, b: int(bool(a or b)),
+}
+
+# Instruções que empilham exatamente um valor sem consumir nenhum
+SINGLE_PUSH = ('PUSHI', 'PUSHG', 'PUSHL')
+
+# Instruções depois das quais a execução nunca continua na seguinte
+NO_FALLTHROUGH = ('JUMP', 'STOP', 'RETURN')
+
+JUMPS = ('JUMP', 'JZ', 'PUSHA')
+
+
+def _decode(line):
+    """Converte uma linha em (instrução, operando); labels são (LABEL, nome)."""
+    if line.endswith(':'):
+        return (LABEL, line[:-1])
+    parts = line.split(None, 1)
+    return (parts[0], parts[1] if len(parts) > 1 else None)
+
+
+def _encode(op, arg):
+    if op == LABEL:
+        return f"{arg}:"
+    return op if arg is None else f"{op} {arg}"
+
+
+def _int(instruction):
+    """Valor de um PUSHI, ou None se a instrução não for um PUSHI."""
+    op, arg = instruction
+    if op != 'PUSHI':
+        return None
+    try:
+        return int(arg)
+    except (TypeError, ValueError):
+        return None
+
+
+def _trunc_div(a, b):
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def _simplify_tail(out):
+    """Aplica uma regra ao fim de `out`, se alguma se aplicar. Devolve True se mudou."""
+    n = len(out)
+    if n >= 2:
+        (op1, arg1), (op2, arg2) = out[-2], out[-1]
+        c1 = _int(out[-2])
+
+        # Identidades: x+0, x-0, endereço+0, x*1, x div 1
+        if (c1 == 0 and op2 in ('ADD', 'SUB', 'PADD')) or (c1 == 1 and op2 in ('MUL', 'DIV')):
+            del out[-2:]
+            return True
+        if c1 is not None and op2 == 'NOT':
+            out[-2:] = [('PUSHI', str(0 if c1 else 1))]
+            return True
+        if c1 is not None and op2 == 'JZ':
+            out[-2:] = [('JUMP', arg2)] if c1 == 0 else []
+            return True
+        # PUSHG x; STOREG x não altera nada
+        if (op1, op2) in (('PUSHG', 'STOREG'), ('PUSHL', 'STOREL')) and arg1 == arg2:
+            del out[-2:]
+            return True
+        # STOREG x; PUSHG x: duplica o valor em vez de o voltar a ler
+        if (op1, op2) in (('STOREG', 'PUSHG'), ('STOREL', 'PUSHL')) and arg1 == arg2:
+            out[-2:] = [('DUP', '1'), (op1, arg1)]
+            return True
+
+    if n >= 3:
+        a, b = _int(out[-3]), _int(out[-2])
+        op = out[-1][0]
+        if a is not None and b is not None:
+            if op in BINARY_FOLDS:
+                out[-3:] = [('PUSHI', str(BINARY_FOLDS[op](a, b)))]
+                return True
+            if op in ('DIV', 'MOD') and b != 0:
+                q = _trunc_div(a, b)
+                out[-3:] = [('PUSHI', str(q if op == 'DIV' else a - b * q))]
+                return True
+        # Elemento de índice constante na zona global: PUSHGP; PUSHI k; LOADN -> PUSHG k
+        if out[-3][0] == 'PUSHGP' and op == 'LOADN' and b is not None and b >= 0:
+            out[-3:] = [('PUSHG', str(b))]
+            return True
+
+    if n >= 4:
+        # x + a + b -> x + (a+b), com ADD/SUB em qualquer combinação
+        a, b = _int(out[-4]), _int(out[-2])
+        op_a, op_b = out[-3][0], out[-1][0]
+        if a is not None and b is not None and op_a in ('ADD', 'SUB') and op_b in ('ADD', 'SUB'):
+            total = (a if op_a == 'ADD' else -a) + (b if op_b == 'ADD' else -b)
+            out[-4:] = [('PUSHI', str(total)), ('ADD', None)]
+            return True
+
+    if n >= 6:
+        # Offset do índice de um array dobrado no endereço base:
+        # PUSHI base; PADD; X; PUSHI c; SUB|ADD; LOADN|PADD -> PUSHI base-c; PADD; X; LOADN|PADD
+        # Só quando a instrução seguinte consome o índice: antes disso o SUB
+        # pode ser apenas parte do índice, como em a[(i - 1) * 2]
+        base, c = _int(out[-6]), _int(out[-3])
+        if (base is not None and c is not None and out[-5][0] == 'PADD'
+                and out[-4][0] in SINGLE_PUSH and out[-2][0] in ('ADD', 'SUB')
+                and out[-1][0] in ('LOADN', 'PADD')):
+            new_base = base - c if out[-2][0] == 'SUB' else base + c
+            if new_base >= 0:
+                out[-6:] = [('PUSHI', str(new_base)), ('PADD', None), out[-4], out[-1]]
+                return True
+
+    if n >= 5:
+        # Elemento de índice constante de um array global: PUSHGP; PUSHI b;
+        # PADD; PUSHI k; LOADN -> PUSHG b+k
+        base, k = _int(out[-4]), _int(out[-2])
+        if (out[-5][0] == 'PUSHGP' and out[-3][0] == 'PADD' and out[-1][0] == 'LOADN'
+                and base is not None and k is not None and base + k >= 0):
+            out[-5:] = [('PUSHG', str(base + k))]
+            return True
+
+    return False
+
+
+def fold(instructions):
+    """Dobragem de constantes e simplificações locais (janela no fim da saída)."""
+    out = []
+    for instruction in instructions:
+        out.append(instruction)
+        while _simplify_tail(out):
+            pass
+    return out
+
+
+def thread_jumps(instructions):
+    """Faz os saltos para um JUMP saltarem diretamente para o destino final."""
+    # Primeira instrução (não label) depois de cada label
+    first_after = {}
+    pending = []
+    for instruction in instructions:
+        if instruction[0] == LABEL:
+            pending.append(instruction[1])
+        else:
+            for label in pending:
+                first_after[label] = instruction
+            pending = []
+
+    def final_target(label):
+        seen = set()
+        while label not in seen:
+            seen.add(label)
+            target = first_after.get(label)
+            if target is None or target[0] != 'JUMP':
+                break
+            label = target[1]
+        return label
+
+    return [(op, final_target(arg)) if op in ('JUMP', 'JZ') else (op, arg)
+            for op, arg in instructions]
+
+
+def remove_jumps_to_next(instructions):
+    """Remove JUMP L quando L está entre os labels imediatamente seguintes."""
+    # Percorre a lista de trás para a frente, guardando os labels que se
+    # seguem à posição atual até à próxima instrução que não é label
+    keep = [True] * len(instructions)
+    following = set()
+    for i in range(len(instructions) - 1, -1, -1):
+        op, arg = instructions[i]
+        if op == LABEL:
+            following.add(arg)
+            continue
+        if op == 'JUMP' and arg in following:
+            keep[i] = False
+        following = set()
+    return [instruction for instruction, kept in zip(instructions, keep) if kept]
+
+
+def remove_unreachable(instructions):
+    """Remove código inalcançável e labels que não são usados."""
+    used = {arg for op, arg in instructions if op in JUMPS}
+    out = []
+    reachable = True
+    for op, arg in instructions:
+        if op == LABEL:
+            if arg in used:
+                reachable = True
+                out.append((op, arg))
+            continue
+        if reachable:
+            out.append((op, arg))
+            if op in NO_FALLTHROUGH:
+                reachable = False
+    return out
+
+
+PASSES = (fold, thread_jumps, remove_jumps_to_next, remove_unreachable)
+
+
+def optimize(code, level=1):
+    """Otimiza uma lista de instruções EWVM. O nível 0 devolve o código inalterado."""
+    if level <= 0:
+        return list(code)
+    instructions = [_decode(line) for line in code]
+    while True:
+        previous = instructions
+        for optimization_pass in PASSES:
+            instructions = optimization_pass(instructions)
+        if instructions == previous:
+            break
+    return [_encode(op, arg) for op, arg in instructions]
+
+
+def instruction_count(code):
+    """Número de instruções (sem contar labels)."""
+    return sum(1 for line in code if not line.endswith(':'))
@@ -0,0 +1,153 @@
+"""
+Medição do tempo e da memória de cada fase da compilação (--profile).
+
+Um Profiler regista, para cada fase, o tempo real (perf_counter), o tempo de
+CPU (process_time) e o pico de memória alocada durante a fase (tracemalloc),
+e ainda contagens como o número de tokens, de nós da AST e de instruções.
+
+    profiler = Profiler()
+    with profiler.phase('parser'):
+        ast = parse(texto)
+    profiler.count('nodes', count_nodes(ast))
+    print(profiler.report())
+
+Quando o perfil não foi pedido usa-se NULL_PROFILER, cujas operações não
+fazem nada: phase() devolve sempre o mesmo contexto vazio e quem chama só
+calcula as contagens se `profiler.enabled` for verdadeiro.
+
+O tracemalloc e o json só são importados quando um Profiler é usado: o seu
+import custa mais do que o arranque do lexer, e a maioria das invocações do
+compilador não pede o perfil.
+"""
+
+import time
+
+
+class PhaseStats:
+    """Medições de uma fase."""
+
+    __slots__ = ('name', 'wall', 'cpu', 'peak')
+
+    def __init__(self, name, wall, cpu, peak):
+        self.name = name
+        self.wall = wall  # Tempo real, em segundos
+        self.cpu = cpu    # Tempo de CPU do processo, em segundos
+        self.peak = peak  # Pico de memória alocada durante a fase, em bytes (None sem tracemalloc)
+
+    def as_dict(self):
+        return {'name': self.name, 'wall': self.wall, 'cpu': self.cpu, 'peak': self.peak}
+
+
+class _Phase:
+    """Contexto que mede uma fase e a regista no Profiler."""
+
+    __slots__ = ('profiler', 'name', 'wall', 'cpu', 'memory')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        if self.profiler.memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        peak = None
+        if self.profiler.memory:
+            import tracemalloc
+            peak = max(0, tracemalloc.get_traced_memory()[1] - self.memory)
+        self.profiler.phases.append(PhaseStats(self.name, wall, cpu, peak))
+        return False
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, memory=True):
+        self.phases = []  # PhaseStats, pela ordem em que as fases terminaram
+        self.counts = {}  # Nome -> valor ('tokens', 'nodes', 'instructions', ...)
+        # O tracemalloc abranda bastante a execução: só é ligado aqui, e
+        # apenas se não estava já ligado por quem chama
+        self.memory = memory
+        import tracemalloc
+        self._started = memory and not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+
+    def phase(self, name):
+        """Contexto que mede a fase `name`."""
+        return _Phase(self, name)
+
+    def count(self, name, value):
+        self.counts[name] = value
+
+    def stop(self):
+        """Desliga o tracemalloc (se foi ligado por este Profiler)."""
+        if self._started:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started = False
+
+    @property
+    def total_wall(self):
+        return sum(phase.wall for phase in self.phases)
+
+    def as_dict(self):
+        return {
+            'phases': [phase.as_dict() for phase in self.phases],
+            'counts': dict(self.counts),
+            'total': {'wall': self.total_wall, 'cpu': sum(phase.cpu for phase in self.phases)},
+        }
+
+    def to_json(self, **extra):
+        """Medições em JSON (com os campos adicionais dados, p.ex. o nome do ficheiro)."""
+        import json
+        return json.dumps({**extra, **self.as_dict()})
+
+    def report(self):
+        """Tabela de texto com as medições."""
+        lines = [f"{'fase':<12} {'real ms':>10} {'CPU ms':>10} {'pico KB':>10}"]
+        for phase in self.phases:
+            peak = '-' if phase.peak is None else f"{phase.peak / 1024:.1f}"
+            lines.append(f"{phase.name:<12} {phase.wall * 1000:>10.3f} {phase.cpu * 1000:>10.3f} {peak:>10}")
+        lines.append(f"{'total':<12} {self.total_wall * 1000:>10.3f} "
+                     f"{sum(phase.cpu for phase in self.phases) * 1000:>10.3f}")
+        if self.counts:
+            lines.append(", ".join(f"{name}: {value}" for name, value in self.counts.items()))
+        return "\n".join(lines)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Profiler desligado: não mede nada."""
+
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, value):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,404 @@
+"""
+Parser descendente recursivo, alternativa ao parser LALR do PLY (parser.py).
+
+Constrói exatamente as mesmas árvores (Node), com as mesmas posições, mas
+lê os tokens diretamente das colunas do TokenBuffer do lexer, sem passar
+pela máquina de tabelas do PLY nem criar um LexToken por token. Cada regra
+da gramática é um método; expression, simple_expression e term são
+analisadas num único ciclo, por precedência (Pratt).
+
+Não tem recuperação de erros própria: perante um erro de sintaxe (ou um
+programa aninhado demasiado fundo para a pilha do Python) a mesma sequência
+de tokens é analisada de novo pelo parser do PLY, que produz os diagnósticos
+e a AST parcial habituais.
+
+    from rdparser import parse
+    ast = parse(texto, diagnostics)
+"""
+
+from lexer import tokens, TOKEN_IDS, FIXED_VALUES, get_tokens
+from parser import Node, parse as lalr_parse
+from diagnostics import Diagnostics
+
+# Tipos de token (índices em lexer.tokens)
+PROGRAM = TOKEN_IDS['PROGRAM']
+BEGIN = TOKEN_IDS['BEGIN']
+END = TOKEN_IDS['END']
+VAR = TOKEN_IDS['VAR']
+ARRAY = TOKEN_IDS['ARRAY']
+OF = TOKEN_IDS['OF']
+IF = TOKEN_IDS['IF']
+THEN = TOKEN_IDS['THEN']
+ELSE = TOKEN_IDS['ELSE']
+WHILE = TOKEN_IDS['WHILE']
+DO = TOKEN_IDS['DO']
+FOR = TOKEN_IDS['FOR']
+TO = TOKEN_IDS['TO']
+DOWNTO = TOKEN_IDS['DOWNTO']
+FUNCTION = TOKEN_IDS['FUNCTION']
+PROCEDURE = TOKEN_IDS['PROCEDURE']
+READ = TOKEN_IDS['READ']
+READLN = TOKEN_IDS['READLN']
+WRITE = TOKEN_IDS['WRITE']
+WRITELN = TOKEN_IDS['WRITELN']
+TRUE = TOKEN_IDS['TRUE']
+FALSE = TOKEN_IDS['FALSE']
+NOT = TOKEN_IDS['NOT']
+ID = TOKEN_IDS['ID']
+INTEGER_CONST = TOKEN_IDS['INTEGER_CONST']
+REAL_CONST = TOKEN_IDS['REAL_CONST']
+STRING_CONST = TOKEN_IDS['STRING_CONST']
+ASSIGN = TOKEN_IDS['ASSIGN']
+LPAREN = TOKEN_IDS['LPAREN']
+RPAREN = TOKEN_IDS['RPAREN']
+LBRACKET = TOKEN_IDS['LBRACKET']
+RBRACKET = TOKEN_IDS['RBRACKET']
+COMMA = TOKEN_IDS['COMMA']
+SEMICOLON = TOKEN_IDS['SEMICOLON']
+COLON = TOKEN_IDS['COLON']
+DOT = TOKEN_IDS['DOT']
+DOTDOT = TOKEN_IDS['DOTDOT']
+END_OF_INPUT = len(tokens)  # Sentinela acrescentado no fim dos tokens
+
+SIMPLE_TYPES = frozenset(TOKEN_IDS[name] for name in ('INTEGER', 'BOOLEAN', 'STRING'))
+SUBPROGRAMS = frozenset((FUNCTION, PROCEDURE))
+IO_PROCEDURES = frozenset((READ, READLN, WRITE, WRITELN))
+
+# Precedência dos operadores binários (0: não é operador). Os relacionais
+# não são associativos: 'a < b < c' é um erro de sintaxe, como na gramática
+RELATIONAL, ADDITIVE, MULTIPLICATIVE = 1, 2, 3
+BINDING_POWER = [0] * (len(tokens) + 1)
+for _names, _power in ((('EQUAL', 'NOTEQUAL', 'LESSTHAN', 'LESSEQUAL', 'GREATERTHAN', 'GREATEREQUAL'), RELATIONAL),
+                       (('PLUS', 'MINUS', 'OR'), ADDITIVE),
+                       (('TIMES', 'DIVIDE', 'DIV', 'MOD', 'AND'), MULTIPLICATIVE)):
+    for _name in _names:
+        BINDING_POWER[TOKEN_IDS[_name]] = _power
+
+
+class ParseError(Exception):
+    """Token inesperado (o índice do token é o argumento)."""
+
+
+class RecursiveDescentParser:
+    """Analisa um TokenBuffer; program() devolve a AST."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.kinds = buffer.kinds.tolist()
+        self.kinds.append(END_OF_INPUT)
+        self.positions = buffer.positions
+        self.index = 0
+
+    # ---- Acesso aos tokens ----
+
+    def expect(self, kind):
+        """Consome um token do tipo `kind` e devolve o seu índice."""
+        index = self.index
+        if self.kinds[index] != kind:
+            raise ParseError(index)
+        self.index = index + 1
+        return index
+
+    def accept(self, kind):
+        """Consome o token seguinte se for do tipo `kind`."""
+        if self.kinds[self.index] == kind:
+            self.index += 1
+            return True
+        return False
+
+    def id_node(self, index):
+        return Node('ID', [], self.buffer.value(index), self.positions[index])
+
+    # ---- Programa e declarações ----
+
+    def program(self):
+        start = self.expect(PROGRAM)
+        name = self.expect(ID)
+        self.expect(SEMICOLON)
+        block = self.program_block()
+        self.expect(DOT)
+        self.expect(END_OF_INPUT)
+        return Node('Program', [self.id_node(name), block], pos=self.positions[start])
+
+    def program_block(self):
+        declarations = self.declarations()
+        if self.kinds[self.index] in SUBPROGRAMS:
+            subprograms = self.subprogram_declarations()
+            more_declarations = self.declarations()
+            return Node('ProgramBlock', [declarations, subprograms, more_declarations, self.compound_statement()])
+        return Node('ProgramBlock', [declarations, self.compound_statement()])
+
+    def block(self):
+        declarations = self.declarations()
+        return Node('Block', [declarations, self.compound_statement()])
+
+    def declarations(self):
+        if not self.accept(VAR):
+            return Node('Declarations', [Node('Empty')])
+        declaration_list = Node('DeclarationList', [self.declaration()])
+        while self.kinds[self.index] == ID:
+            declaration_list.children.append(self.declaration())
+        return Node('Declarations', [declaration_list])
+
+    def declaration(self):
+        id_list = self.id_list()
+        self.expect(COLON)
+        var_type = self.type()
+        self.expect(SEMICOLON)
+        return Node('Declaration', [id_list, var_type], pos=id_list.pos)
+
+    def id_list(self):
+        first = self.id_node(self.expect(ID))
+        node = Node('IDList', [first], pos=first.pos)
+        while self.accept(COMMA):
+            node.children.append(self.id_node(self.expect(ID)))
+        return node
+
+    def type(self):
+        index = self.index
+        if self.kinds[index] in SIMPLE_TYPES:
+            self.index = index + 1
+            return Node('Type', [], self.buffer.value(index))
+        self.expect(ARRAY)
+        self.expect(LBRACKET)
+        low = self.expect(INTEGER_CONST)
+        self.expect(DOTDOT)
+        high = self.expect(INTEGER_CONST)
+        self.expect(RBRACKET)
+        self.expect(OF)
+        bounds = Node('Range', [], (self.buffer.value(low), self.buffer.value(high)))
+        return Node('ArrayType', [bounds, self.type()])
+
+    def subprogram_declarations(self):
+        node = Node('SubprogramDeclarations', [self.subprogram_declaration()])
+        while self.kinds[self.index] in SUBPROGRAMS:
+            node.children.append(self.subprogram_declaration())
+        return node
+
+    def subprogram_declaration(self):
+        is_function = self.kinds[self.index] == FUNCTION
+        start = self.index
+        self.index += 1
+        name = self.id_node(self.expect(ID))
+        if self.kinds[self.index] == LPAREN:
+            parameters = self.formal_parameters()
+        else:
+            parameters = Node('FormalParameters', [])
+        if is_function:
+            self.expect(COLON)
+            return_type = self.type()
+        self.expect(SEMICOLON)
+        body = self.block()
+        self.expect(SEMICOLON)
+        if is_function:
+            return Node('FunctionDeclaration', [name, parameters, return_type, body], pos=self.positions[start])
+        return Node('ProcedureDeclaration', [name, parameters, body], pos=self.positions[start])
+
+    def formal_parameters(self):
+        self.expect(LPAREN)
+        if self.accept(RPAREN):
+            return Node('FormalParameters', [])
+        parameter_list = Node('ParameterList', [self.parameter()])
+        while self.accept(SEMICOLON):
+            parameter_list.children.append(self.parameter())
+        self.expect(RPAREN)
+        return Node('FormalParameters', [parameter_list])
+
+    def parameter(self):
+        id_list = self.id_list()
+        self.expect(COLON)
+        return Node('Parameter', [id_list, self.type()])
+
+    # ---- Instruções ----
+
+    def compound_statement(self):
+        self.expect(BEGIN)
+        statements = self.statement_list()
+        self.expect(END)
+        return Node('CompoundStatement', [statements])
+
+    def statement_list(self):
+        node = Node('StatementList', [self.statement()])
+        children = node.children
+        while self.accept(SEMICOLON):
+            statement = self.statement()
+            if statement.type != 'Empty':
+                children.append(statement)
+        return node
+
+    def statement(self):
+        kind = self.kinds[self.index]
+        if kind == ID:
+            if self.kinds[self.index + 1] == LPAREN:
+                return self.procedure_call()
+            return self.assignment_statement()
+        if kind == IF:
+            return self.if_statement()
+        if kind == WHILE:
+            return self.while_statement()
+        if kind == FOR:
+            return self.for_statement()
+        if kind == BEGIN:
+            return self.compound_statement()
+        if kind in IO_PROCEDURES:
+            return self.procedure_call()
+        # Instrução vazia: quem chamou verifica o token seguinte
+        return Node('Empty')
+
+    def assignment_statement(self):
+        target = self.variable()
+        self.expect(ASSIGN)
+        return Node('Assignment', [target, self.expression()], pos=target.pos)
+
+    def if_statement(self):
+        start = self.expect(IF)
+        condition = self.expression()
+        self.expect(THEN)
+        then_branch = self.statement()
+        if self.accept(ELSE):
+            return Node('IfStatement', [condition, then_branch, self.statement()], pos=self.positions[start])
+        return Node('IfStatement', [condition, then_branch], pos=self.positions[start])
+
+    def while_statement(self):
+        start = self.expect(WHILE)
+        condition = self.expression()
+        self.expect(DO)
+        return Node('WhileStatement', [condition, self.statement()], pos=self.positions[start])
+
+    def for_statement(self):
+        start = self.expect(FOR)
+        control = self.id_node(self.expect(ID))
+        self.expect(ASSIGN)
+        first = self.expression()
+        direction = self.kinds[self.index]
+        if direction != TO and direction != DOWNTO:
+            raise ParseError(self.index)
+        self.index += 1
+        last = self.expression()
+        self.expect(DO)
+        body = self.statement()
+        return Node('ForStatement', [control, first, last, body], FIXED_VALUES[direction], self.positions[start])
+
+    def procedure_call(self):
+        start = self.index
+        kind = self.kinds[start]
+        self.index += 1
+        self.expect(LPAREN)
+        node_type = 'ProcedureCall' if kind == ID else 'IOCall'
+        name, pos = self.buffer.value(start), self.positions[start]
+        if self.accept(RPAREN):
+            return Node(node_type, [], name, pos)
+        if kind == READ or kind == READLN:
+            arguments = self.variable_list()
+        else:
+            arguments = self.expression_list()
+        self.expect(RPAREN)
+        return Node(node_type, [arguments], name, pos)
+
+    def expression_list(self):
+        node = Node('ExpressionList', [self.expression()])
+        while self.accept(COMMA):
+            node.children.append(self.expression())
+        return node
+
+    def variable_list(self):
+        node = Node('VariableList', [self.variable()])
+        while self.accept(COMMA):
+            node.children.append(self.variable())
+        return node
+
+    # ---- Expressões ----
+
+    def expression(self, min_power=RELATIONAL):
+        """expression, simple_expression e term por precedência (Pratt).
+
+        Os operadores da mesma precedência associam à esquerda: o operando
+        direito é analisado com uma precedência mínima acima da do operador.
+        """
+        left = self.factor()
+        kinds = self.kinds
+        while True:
+            kind = kinds[self.index]
+            power = BINDING_POWER[kind]
+            if power < min_power:
+                return left
+            self.index += 1
+            right = self.expression(power + 1)
+            left = Node('BinaryOperation', [left, right], FIXED_VALUES[kind], left.pos)
+            if power == RELATIONAL:
+                min_power = ADDITIVE
+
+    def factor(self):
+        index = self.index
+        kind = self.kinds[index]
+        if kind == ID:
+            if self.kinds[index + 1] == LPAREN:
+                return self.function_call()
+            return self.variable()
+        if kind == INTEGER_CONST:
+            self.index = index + 1
+            return Node('IntegerConstant', [], self.buffer.value(index), self.positions[index])
+        if kind == LPAREN:
+            self.index = index + 1
+            expression = self.expression()
+            self.expect(RPAREN)
+            return expression
+        if kind == REAL_CONST:
+            self.index = index + 1
+            return Node('RealConstant', [], self.buffer.value(index), self.positions[index])
+        if kind == STRING_CONST:
+            self.index = index + 1
+            value = self.buffer.value(index)
+            if value.startswith("'") and value.endswith("'"):
+                value = value[1:-1]
+            return Node('StringConstant', [], value, self.positions[index])
+        if kind == TRUE or kind == FALSE:
+            self.index = index + 1
+            return Node('BooleanConstant', [], FIXED_VALUES[kind], self.positions[index])
+        if kind == NOT:
+            self.index = index + 1
+            return Node('UnaryOperation', [self.factor()], FIXED_VALUES[NOT], self.positions[index])
+        raise ParseError(index)
+
+    def function_call(self):
+        start = self.index
+        self.index += 2  # Nome e '('
+        name, pos = self.buffer.value(start), self.positions[start]
+        if self.accept(RPAREN):
+            return Node('FunctionCall', [], name, pos)
+        arguments = self.expression_list()
+        self.expect(RPAREN)
+        return Node('FunctionCall', [arguments], name, pos)
+
+    def variable(self):
+        index = self.expect(ID)
+        name, pos = self.buffer.value(index), self.positions[index]
+        if self.accept(LBRACKET):
+            subscript = self.expression()
+            self.expect(RBRACKET)
+            return Node('ArrayAccess', [Node('ID', [], name, pos), subscript], pos=pos)
+        return Node('Variable', [], name, pos)
+
+
+def parse(data, diagnostics=None, tokens=None):
+    """Analisa o código fonte e devolve a AST (a mesma que parser.parse).
+
+    Com erros de sintaxe, os tokens são analisados de novo pelo parser do
+    PLY, que regista os diagnósticos e devolve a AST parcial. Os erros
+    léxicos registados nesta chamada, ao criar o TokenBuffer, são
+    intercalados com os de sintaxe pela posição, como quando o PLY lê os
+    tokens à medida; os diagnósticos anteriores à chamada não mudam.
+    """
+    if diagnostics is None:
+        diagnostics = Diagnostics(data)
+    start = len(diagnostics)
+    if tokens is None:
+        tokens = get_tokens(data, diagnostics)
+    elif diagnostics.source is None:
+        diagnostics.source = data
+    try:
+        return RecursiveDescentParser(tokens).program()
+    except (ParseError, RecursionError):
+        ast = lalr_parse(data, diagnostics, tokens)
+        diagnostics.sort_from(start)
+        return ast
@@ -1,20 +1,72 @@
+from diagnostics import Diagnostics
+from visitor import Visitor
+
+
+VARIABLE = 'variable'
+FUNCTION = 'function'
+PROCEDURE = 'procedure'
+
+
+class Symbol:
+    """Símbolo resolvido (variável, função ou procedimento).
+
+    Cada identificador da AST é ligado, durante a análise semântica, ao seu
+    Symbol (node.symbol); o gerador de código usa diretamente o nível e o
+    offset guardados aqui, sem voltar a procurar o nome.
+    """
+
+    __slots__ = ('name', 'kind', 'type', 'depth', 'offset', 'size', 'slot', 'params', 'return_type')
+
+    def __init__(self, name, kind, type=None, depth=0, offset=0, size=1, slot=None):
+        self.name = name
+        self.kind = kind             # VARIABLE, FUNCTION ou PROCEDURE
+        self.type = type             # Tipo (nome ou dicionário de array); nas funções, None
+        self.depth = depth           # Nível do escopo onde foi declarado (0 = global)
+        self.offset = offset         # Endereço: offset na zona global (nível 0) ou relativo ao fp
+        self.size = size             # Tamanho em palavras
+        self.slot = slot             # Slot no estado de inicialização (só variáveis)
+        self.params = []             # Parâmetros (Symbols) de funções e procedimentos
+        self.return_type = None      # Tipo de retorno das funções
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.kind}, depth={self.depth}, offset={self.offset})"
+
+
+def type_size(type_info):
+    """Tamanho em palavras de um tipo."""
+    if isinstance(type_info, dict) and type_info.get('kind') == 'array':
+        low, high = type_info['range']
+        return (high - low + 1) * type_size(type_info['elem_type'])
+    # Tipos simples (integer, boolean, string) ocupam 1 palavra
+    return 1
+
+
 class SymbolTable:
     def __init__(self):
-        self.symbols = {}          # Mapeia nomes (variáveis, funções...) para as suas informações
+        self.symbols = {}          # Mapeia nomes (variáveis, funções...) para os seus Symbols
         self.parent = None         # Referência ao escopo pai (para escopos aninhados)
         self.level = 0             # Nível do escopo (0 = global, >0 = aninhado)
+        self.frame_size = 0        # Palavras ocupadas pelas variáveis deste escopo
 
-    def add(self, name, info):
+    def add(self, name, symbol):
         """Adiciona um novo símbolo (variável, função, etc.) ao escopo atual."""
-        self.symbols[name.lower()] = info  # Pascal é insensível a maiúsculas/minúsculas
+        self.symbols[name.lower()] = symbol  # Pascal é insensível a maiúsculas/minúsculas
+
+    def allocate(self, size):
+        """Reserva `size` palavras para uma variável deste escopo e devolve o offset."""
+        offset = self.frame_size
+        self.frame_size += size
+        return offset
 
     def lookup(self, name):
         """Procura por um símbolo, começando no escopo atual e subindo até o global."""
         name = name.lower()
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.lookup(name)
+        scope = self
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
         return None
 
     def lookup_current_scope(self, name):
@@ -29,11 +81,14 @@ class SymbolTable:
         return child
 
 
-class SemanticAnalyzer:
-    def __init__(self):
+class SemanticAnalyzer(Visitor):
+    prefix = 'visit_'
+
+    def __init__(self, diagnostics=None):
         self.global_scope = SymbolTable()
         self.current_scope = self.global_scope
-        self.errors = []
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
+        self.errors = []           # Diagnósticos (a mensagem só é formatada quando pedida)
         self.warnings = []
         
         # Estados úteis durante a análise
@@ -42,14 +97,44 @@ class SemanticAnalyzer:
         self.has_return = False
         self.in_lhs_of_assignment = False
 
+        # Inicialização das variáveis: cada variável (de qualquer escopo)
+        # recebe um slot e o bit correspondente de `initialized` indica se
+        # está definitivamente inicializada neste ponto do programa. Guardar
+        # e combinar estados (if, ciclos) são operações sobre um inteiro.
+        self.slot_count = 0
+        self.initialized = 0
+
     def analyze(self, ast):
         """Inicia a análise semântica da árvore sintática (AST)."""
         if ast:
             self.visit(ast)
         return len(self.errors) == 0, self.errors, self.warnings
 
-    def add_error(self, msg): self.errors.append(msg)
-    def add_warning(self, msg): self.warnings.append(msg)
+    def add_error(self, msg, *args, node=None):
+        self.errors.append(self.diagnostics.error('semantic', msg, *args, pos=node.pos if node else None))
+
+    def add_warning(self, msg, *args, node=None):
+        self.warnings.append(self.diagnostics.warning('semantic', msg, *args, pos=node.pos if node else None))
+
+    def new_slot(self, initialized=False):
+        """Reserva o slot de inicialização de uma nova variável."""
+        slot = self.slot_count
+        self.slot_count += 1
+        if initialized:
+            self.initialized |= 1 << slot
+        else:
+            # Dentro de subprogramas o estado pode ter todos os bits a 1
+            self.initialized &= ~(1 << slot)
+        return slot
+
+    def is_initialized(self, symbol):
+        slot = symbol.slot
+        return slot is None or (self.initialized >> slot) & 1 == 1
+
+    def mark_initialized(self, symbol):
+        slot = symbol.slot
+        if slot is not None:
+            self.initialized |= 1 << slot
 
     def enter_scope(self):
         """Entra num novo escopo (por exemplo, dentro de uma função ou bloco)."""
@@ -60,37 +145,25 @@ class SemanticAnalyzer:
         if self.current_scope.parent:
             self.current_scope = self.current_scope.parent
 
-    def visit(self, node):
-        """Despacha a visita de um nó da AST para o método apropriado."""
-        method_name = f'visit_{node.type}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node):
-        """Visita padrão: percorre todos os filhos recursivamente."""
-        for child in node.children:
-            if child:
-                self.visit(child)
-
     # ---- Visitas específicas por tipo de nó ----
 
     def visit_Program(self, node):
         program_name = node.children[0].leaf
-        self.visit(node.children[1])  # Visita o bloco principal do programa
+        yield node.children[1]  # Visita o bloco principal do programa
 
     def visit_Block(self, node):
-        self.visit(node.children[0])  # Declarações
-        self.visit(node.children[1])  # Instruções
+        yield node.children[0]  # Declarações
+        yield node.children[1]  # Instruções
 
     def visit_Declarations(self, node):
         for child in node.children:
             if child and child.type != 'Empty':
-                self.visit(child)
+                yield child
 
     def visit_DeclarationList(self, node):
         for child in node.children:
             if child:
-                self.visit(child)
+                yield child
 
     def visit_Declaration(self, node):
         id_list = node.children[0]
@@ -101,13 +174,12 @@ class SemanticAnalyzer:
             if child.type == 'ID':
                 var_name = child.leaf
                 if self.current_scope.lookup_current_scope(var_name):
-                    self.add_error(f"Erro: Variável '{var_name}' redeclarada no mesmo escopo")
+                    self.add_error("Erro: Variável '{0}' redeclarada no mesmo escopo", var_name, node=child)
                 else:
-                    self.current_scope.add(var_name, {
-                        'kind': 'variable',
-                        'type': type_info,
-                        'initialized': False
-                    })
+                    size = type_size(type_info)
+                    child.symbol = Symbol(var_name, VARIABLE, type_info, self.current_scope.level,
+                                          self.current_scope.allocate(size), size, self.new_slot())
+                    self.current_scope.add(var_name, child.symbol)
 
     def get_type_info(self, type_node):
         """Extrai o tipo de um nó de tipo."""
@@ -118,9 +190,9 @@ class SemanticAnalyzer:
             elem_type = self.get_type_info(type_node.children[1])
 
             if not all(isinstance(b, int) for b in range_info):
-                self.add_error("Erro: Limites de array devem ser inteiros")
+                self.add_error("Erro: Limites de array devem ser inteiros", node=type_node)
             if range_info[0] > range_info[1]:
-                self.add_error(f"Erro: Limite inferior {range_info[0]} maior que o superior {range_info[1]}")
+                self.add_error("Erro: Limite inferior {0} maior que o superior {1}", range_info[0], range_info[1], node=type_node)
 
             return {
                 'kind': 'array',
@@ -131,38 +203,32 @@ class SemanticAnalyzer:
 
     def visit_CompoundStatement(self, node):
         if node.children:
-            self.visit(node.children[0])  # Lista de instruções
+            yield node.children[0]  # Lista de instruções
 
     def visit_StatementList(self, node):
         for child in node.children:
             if child:
-                self.visit(child)
+                yield child
 
     def visit_Assignment(self, node):
         self.in_lhs_of_assignment = True
         var_node = node.children[0]
-        var_type = self.visit(var_node)
+        var_type = yield var_node
         self.in_lhs_of_assignment = False
 
         if not var_type:
             return None
 
-        expr_type = self.visit(node.children[1])
+        expr_type = yield node.children[1]
         if not expr_type:
             return None
 
         if not self.check_type_compatibility(var_type, expr_type):
             name = var_node.leaf if var_node.type == 'Variable' else "elemento de array"
-            self.add_error(f"Erro: Incompatibilidade de tipos na atribuição a '{name}'. Esperado '{var_type}', mas recebeu '{expr_type}'")
+            self.add_error("Erro: Incompatibilidade de tipos na atribuição a '{0}'. Esperado '{1}', mas recebeu '{2}'", name, var_type, expr_type, node=node)
 
-        if var_node.type == 'Variable':
-            var_info = self.current_scope.lookup(var_node.leaf)
-            if var_info:
-                var_info['initialized'] = True
-        elif var_node.type == 'ArrayAccess':
-            arr_info = self.current_scope.lookup(var_node.children[0].leaf)
-            if arr_info:
-                arr_info['initialized'] = True
+        # A variável (ou o array) foi resolvida ao visitar o lado esquerdo
+        self.mark_initialized(var_node.symbol)
 
         return var_type
 
@@ -177,19 +243,20 @@ class SemanticAnalyzer:
         var_info = self.current_scope.lookup(var_name)
         
         if not var_info:
-            self.add_error(f"Erro: A variável '{var_name}' não foi declarada.")
+            self.add_error("Erro: A variável '{0}' não foi declarada.", var_name, node=node)
             return None
 
         # Só avisamos sobre inicialização se a variável estiver a ser usada (não no lado esquerdo de uma atribuição)
-        if not self.in_lhs_of_assignment and not var_info.get('initialized', False) and var_info.get('kind') == 'variable':
-            self.add_warning(f"Aviso: A variável '{var_name}' pode não ter sido inicializada.")
-
-        if var_info.get('kind') == 'variable':
-            return var_info.get('type')
-        elif var_info.get('kind') == 'function':
-            self.add_error(f"Erro: '{var_name}' é uma função, não uma variável.")
-        elif var_info.get('kind') == 'procedure':
-            self.add_error(f"Erro: '{var_name}' é um procedimento, não uma variável.")
+        if not self.in_lhs_of_assignment and var_info.kind == VARIABLE and not self.is_initialized(var_info):
+            self.add_warning("Aviso: A variável '{0}' pode não ter sido inicializada.", var_name, node=node)
+
+        if var_info.kind == VARIABLE:
+            node.symbol = var_info
+            return var_info.type
+        elif var_info.kind == FUNCTION:
+            self.add_error("Erro: '{0}' é uma função, não uma variável.", var_name, node=node)
+        elif var_info.kind == PROCEDURE:
+            self.add_error("Erro: '{0}' é um procedimento, não uma variável.", var_name, node=node)
         
         return None
 
@@ -200,103 +267,108 @@ class SemanticAnalyzer:
         array_info = self.current_scope.lookup(array_name)
 
         if not array_info:
-            self.add_error(f"Erro: O array '{array_name}' não foi declarado.")
+            self.add_error("Erro: O array '{0}' não foi declarado.", array_name, node=node)
             return None
 
-        if not isinstance(array_info.get('type'), dict) or array_info['type'].get('kind') != 'array':
-            self.add_error(f"Erro: '{array_name}' não é um array.")
+        if not isinstance(array_info.type, dict) or array_info.type.get('kind') != 'array':
+            self.add_error("Erro: '{0}' não é um array.", array_name, node=node)
             return None
+        node.symbol = array_info
 
-        if not self.in_lhs_of_assignment and not array_info.get('initialized', False):
-            self.add_warning(f"Aviso: O array '{array_name}' pode não ter sido inicializado.")
+        if not self.in_lhs_of_assignment and not self.is_initialized(array_info):
+            self.add_warning("Aviso: O array '{0}' pode não ter sido inicializado.", array_name, node=node)
 
         index_node = node.children[1]
-        index_type = self.visit(index_node)
+        index_type = yield index_node
 
         if index_type != 'integer':
-            self.add_error(f"Erro: O índice do array deve ser inteiro, mas foi encontrado '{index_type}'.")
+            self.add_error("Erro: O índice do array deve ser inteiro, mas foi encontrado '{0}'.", index_type, node=node)
 
         if index_node.type == 'IntegerConstant':
-            bounds = array_info['type'].get('range')
+            bounds = array_info.type.get('range')
             idx_val = index_node.leaf
             if bounds and not (bounds[0] <= idx_val <= bounds[1]):
-                self.add_error(f"Erro: O índice {idx_val} está fora dos limites permitidos para o array '{array_name}' [{bounds[0]}..{bounds[1]}].")
+                self.add_error("Erro: O índice {0} está fora dos limites permitidos para o array '{1}' [{2}..{3}].", idx_val, array_name, bounds[0], bounds[1], node=node)
 
-        return array_info['type'].get('elem_type')
+        return array_info.type.get('elem_type')
 
     def visit_IfStatement(self, node):
         """Visita uma instrução if."""
         condition = node.children[0]
-        condition_type = self.visit(condition)
+        condition_type = yield condition
 
         if condition_type != 'boolean':
-            self.add_error(f"Erro: A condição do if deve ser booleana, mas foi '{condition_type}'.")
+            self.add_error("Erro: A condição do if deve ser booleana, mas foi '{0}'.", condition_type, node=condition)
 
-        # Guarda o estado atual das variáveis inicializadas
-        init_before = {name: info.get('initialized', False) for name, info in self.current_scope.symbols.items()}
+        # Estado da inicialização antes dos ramos
+        init_before = self.initialized
 
         # Analisa o bloco then
-        self.visit(node.children[1])
-
-        init_then = {name: info.get('initialized', False) for name, info in self.current_scope.symbols.items()}
-
-        # Restaura o estado antes do else
-        for name, was_init in init_before.items():
-            if name in self.current_scope.symbols:
-                self.current_scope.symbols[name]['initialized'] = was_init
+        yield node.children[1]
+        init_then = self.initialized
 
         if len(node.children) > 2:
-            # Analisa o bloco else
-            self.visit(node.children[2])
-            init_else = {name: info.get('initialized', False) for name, info in self.current_scope.symbols.items()}
-
-            for name in init_then:
-                if name in self.current_scope.symbols:
-                    self.current_scope.symbols[name]['initialized'] = init_then[name] and init_else.get(name, False)
+            # O bloco else parte do estado anterior ao if
+            self.initialized = init_before
+            yield node.children[2]
+            # Inicializadas depois do if: as que o foram nos dois ramos
+            self.initialized &= init_then
         else:
             # Sem else, mantém apenas as variáveis que já estavam inicializadas antes
-            for name in init_then:
-                if name in self.current_scope.symbols:
-                    self.current_scope.symbols[name]['initialized'] = init_before.get(name, False)
+            self.initialized = init_before
 
     def visit_WhileStatement(self, node):
         """Visita uma instrução while."""
-        condition_type = self.visit(node.children[0])
+        condition_type = yield node.children[0]
 
         if condition_type != 'boolean':
-            self.add_error(f"Erro: A condição do while deve ser booleana, mas foi '{condition_type}'.")
+            self.add_error("Erro: A condição do while deve ser booleana, mas foi '{0}'.", condition_type, node=node.children[0])
 
         # Entramos num loop
         prev_loop_state = self.in_loop
         self.in_loop = True
-        self.visit(node.children[1])
+        init_before = self.initialized
+        yield node.children[1]
         self.in_loop = prev_loop_state
 
+        # O corpo pode não ser executado nenhuma vez
+        self.initialized = init_before
+
     def visit_ForStatement(self, node):
         """Visita uma instrução for."""
         var_name = node.children[0].leaf
         var_info = self.current_scope.lookup(var_name)
 
         if not var_info:
-            self.add_error(f"Erro: A variável de controlo '{var_name}' não foi declarada.")
+            self.add_error("Erro: A variável de controlo '{0}' não foi declarada.", var_name, node=node)
+        elif var_info.kind != VARIABLE or var_info.type != 'integer':
+            self.add_error("Erro: A variável de controlo do for deve ser do tipo 'integer', mas foi '{0}'.", var_info.type, node=node)
         else:
-            if var_info.get('type') != 'integer':
-                self.add_error(f"Erro: A variável de controlo do for deve ser do tipo 'integer', mas foi '{var_info.get('type')}'.")
-            var_info['initialized'] = True
+            node.children[0].symbol = var_info
+            self.mark_initialized(var_info)
 
-        start_type = self.visit(node.children[1])
+        start_type = yield node.children[1]
         if start_type != 'integer':
-            self.add_error(f"Erro: O valor inicial do for deve ser inteiro, mas foi '{start_type}'.")
+            self.add_error("Erro: O valor inicial do for deve ser inteiro, mas foi '{0}'.", start_type, node=node)
 
-        end_type = self.visit(node.children[2])
+        end_type = yield node.children[2]
         if end_type != 'integer':
-            self.add_error(f"Erro: O valor final do for deve ser inteiro, mas foi '{end_type}'.")
+            self.add_error("Erro: O valor final do for deve ser inteiro, mas foi '{0}'.", end_type, node=node)
 
         prev_loop_state = self.in_loop
         self.in_loop = True
-        self.visit(node.children[3])
+        init_before = self.initialized
+        yield node.children[3]
         self.in_loop = prev_loop_state
 
+        # O corpo pode não ser executado nenhuma vez, exceto quando os limites
+        # são constantes e garantem pelo menos uma iteração
+        start, end = node.children[1], node.children[2]
+        runs = (start.type == 'IntegerConstant' and end.type == 'IntegerConstant'
+                and (start.leaf <= end.leaf if node.leaf == 'to' else start.leaf >= end.leaf))
+        if not runs:
+            self.initialized = init_before
+
     def visit_IOCall(self, node):
         """Visita uma chamada de entrada/saída: read, readln, write ou writeln."""
         proc_name = node.leaf.lower()
@@ -307,26 +379,19 @@ class SemanticAnalyzer:
             if proc_name in ('read', 'readln'):
                 for var in args.children:
                     if var.type not in ('Variable', 'ArrayAccess'):
-                        self.add_error(f"Erro: Os argumentos de {proc_name} devem ser variáveis.")
+                        self.add_error("Erro: Os argumentos de {0} devem ser variáveis.", proc_name, node=var)
                     else:
                         self.in_lhs_of_assignment = True
-                        self.visit(var)
+                        var_type = yield var
                         self.in_lhs_of_assignment = False
 
-                        if var.type == 'Variable':
-                            var_info = self.current_scope.lookup(var.leaf)
-                            if var_info:
-                                var_info['initialized'] = True
-                        elif var.type == 'ArrayAccess':
-                            arr_name = var.children[0].leaf
-                            arr_info = self.current_scope.lookup(arr_name)
-                            if arr_info:
-                                arr_info['initialized'] = True
+                        if var_type:
+                            self.mark_initialized(var.symbol)
             else:  # write ou writeln
                 for expr in args.children:
-                    expr_type = self.visit(expr)
+                    expr_type = yield expr
                     if expr_type not in ('integer', 'boolean', 'string', 'Integer') and not isinstance(expr_type, dict):
-                        self.add_error(f"Erro: Não é possível imprimir valores do tipo '{expr_type}' com {proc_name}.")
+                        self.add_error("Erro: Não é possível imprimir valores do tipo '{0}' com {1}.", expr_type, proc_name, node=expr)
 
     def visit_ProcedureCall(self, node):
         """Visita uma chamada de procedimento."""
@@ -334,114 +399,155 @@ class SemanticAnalyzer:
         proc_info = self.current_scope.lookup(proc_name)
 
         if not proc_info:
-            self.add_error(f"Erro: O procedimento '{proc_name}' não foi declarado.")
+            self.add_error("Erro: O procedimento '{0}' não foi declarado.", proc_name, node=node)
             return
 
-        if proc_info.get('kind') != 'procedure':
-            self.add_error(f"Erro: '{proc_name}' não é um procedimento.")
+        if proc_info.kind != PROCEDURE:
+            self.add_error("Erro: '{0}' não é um procedimento.", proc_name, node=node)
             return
+        node.symbol = proc_info
 
-        if node.children and proc_info.get('params'):
-            args = node.children[0]
-            expected = proc_info['params']
+        args = node.children[0].children if node.children else []
+        expected = proc_info.params
 
-            if len(args.children) != len(expected):
-                self.add_error(f"Erro: O procedimento '{proc_name}' espera {len(expected)} parâmetros, mas recebeu {len(args.children)}.")
-            else:
-                for i, (arg_node, param_info) in enumerate(zip(args.children, expected)):
-                    arg_type = self.visit(arg_node)
-                    expected_type = param_info.get('type')
+        if len(args) != len(expected):
+            self.add_error("Erro: O procedimento '{0}' espera {1} parâmetros, mas recebeu {2}.", proc_name, len(expected), len(args), node=node)
+        else:
+            for i, (arg_node, param_info) in enumerate(zip(args, expected)):
+                arg_type = yield arg_node
+                expected_type = param_info.type
+
+                if not self.check_type_compatibility(expected_type, arg_type):
+                    self.add_error("Erro: Tipo incompatível no parâmetro {0} de '{1}'. Esperado '{2}', mas foi '{3}'.", i+1, proc_name, expected_type, arg_type, node=arg_node)
+
+    def declare_subprogram(self, node, kind):
+        """Declara uma função ou procedimento e entra no seu escopo.
+
+        Os argumentos são empilhados por quem chama antes de CALL, que faz
+        fp = sp: o parâmetro i (de n) fica em fp + i - n e, nas funções, o
+        valor de retorno no lugar reservado por baixo dos argumentos, em
+        fp - n - 1. As variáveis locais ocupam fp + 0, fp + 1, ...
+        Devolve o Symbol do subprograma, ou None se já estava declarado.
+        """
+        id_node = node.children[0]
+        name = id_node.leaf
+        if self.current_scope.lookup_current_scope(name):
+            self.add_error("Erro: Identificador '{0}' redeclarado no mesmo escopo", name, node=id_node)
+            return None
 
-                    if not self.check_type_compatibility(expected_type, arg_type):
-                        self.add_error(f"Erro: Tipo incompatível no parâmetro {i+1} de '{proc_name}'. Esperado '{expected_type}', mas foi '{arg_type}'.")
+        # O símbolo é registado antes do corpo, para permitir recursão
+        symbol = Symbol(name, kind, depth=self.current_scope.level)
+        id_node.symbol = symbol
+        self.current_scope.add(name, symbol)
+        self.enter_scope()
+        scope = self.current_scope
+
+        parameters = []
+        for parameter_list in node.children[1].children:
+            for parameter in parameter_list.children:
+                param_type = self.get_type_info(parameter.children[1])
+                if isinstance(param_type, dict):
+                    self.add_error("Erro: Parâmetros do tipo array não são suportados ('{0}')", name, node=parameter.children[0])
+                for param_id in parameter.children[0].children:
+                    parameters.append((param_id, param_type))
+
+        count = len(parameters)
+        for i, (param_id, param_type) in enumerate(parameters):
+            if scope.lookup_current_scope(param_id.leaf):
+                self.add_error("Erro: Parâmetro '{0}' repetido", param_id.leaf, node=param_id)
+                continue
+            # Os parâmetros são sempre inicializados
+            param = Symbol(param_id.leaf, VARIABLE, param_type, scope.level, i - count,
+                           slot=self.new_slot(initialized=True))
+            param_id.symbol = param
+            scope.add(param_id.leaf, param)
+            symbol.params.append(param)
+        return symbol
+
+    def analyze_subprogram_body(self, symbol, node, result=None):
+        """Analisa o corpo (último filho de `node`) de um subprograma já declarado.
+
+        `result` é a variável com o valor de retorno, nas funções.
+        """
+        previous_function = self.current_function
+        self.current_function = symbol
+        # O subprograma pode ser chamado em qualquer ponto do programa: as
+        # variáveis globais (e os parâmetros) são consideradas inicializadas
+        # dentro do corpo; o valor de retorno e as locais não
+        init_before = self.initialized
+        self.initialized = -1
+        if result is not None:
+            self.initialized &= ~(1 << result.slot)
+
+        yield node.children[-1]
+
+        if result is not None and not self.is_initialized(result):
+            self.add_warning("Aviso: A função '{0}' pode terminar sem atribuir o valor de retorno.", symbol.name, node=node)
+        self.initialized = init_before
+        self.current_function = previous_function
+        self.exit_scope()
+
+    def visit_FunctionDeclaration(self, node):
+        """Visita uma declaração de função."""
+        symbol = self.declare_subprogram(node, FUNCTION)
+        if symbol is None:
+            return
+        symbol.return_type = self.get_type_info(node.children[2])
+        if isinstance(symbol.return_type, dict):
+            self.add_error("Erro: A função '{0}' não pode devolver um array", symbol.name, node=node.children[2])
 
+        # Dentro da função, o seu nome é a variável com o valor de retorno
+        result = Symbol(symbol.name, VARIABLE, symbol.return_type, self.current_scope.level,
+                        -len(symbol.params) - 1, slot=self.new_slot())
+        self.current_scope.add(symbol.name, result)
+
+        yield from self.analyze_subprogram_body(symbol, node, result)
+
+    def visit_ProcedureDeclaration(self, node):
+        """Visita uma declaração de procedimento."""
+        symbol = self.declare_subprogram(node, PROCEDURE)
+        if symbol is None:
+            return
+        yield from self.analyze_subprogram_body(symbol, node)
 
-        
-        def visit_ProcedureDeclaration(self, node):
-            """Visita uma declaração de procedimento."""
-            proc_name = node.children[0].leaf
-            param_list = node.children[1]
-            proc_body = node.children[2]
-            
-            # Verifica se o procedimento já foi declarado
-            if self.current_scope.lookup_current_scope(proc_name):
-                self.add_error(f"Erro: Procedimento '{proc_name}' redeclarado")
-                return
-            
-            # Adiciona o procedimento à tabela de símbolos
-            proc_info = {
-                'kind': 'procedure',
-                'params': [],
-                'scope': self.current_scope  # Escopo onde foi declarado
-            }
-            
-            self.current_scope.add(proc_name, proc_info)
-            
-            # Cria um novo escopo para o procedimento
-            old_scope = self.current_scope
-            proc_scope = self.enter_scope()
-            
-            # Processa os parâmetros
-            if param_list and param_list.children:
-                for param in param_list.children:
-                    id_list = param.children[0]
-                    type_node = param.children[1]
-                    param_type = self.get_type_info(type_node)
-                    
-                    for id_node in id_list.children:
-                        param_name = id_node.leaf
-                        
-                        # Adiciona o parâmetro ao escopo do procedimento
-                        proc_scope.add(param_name, {
-                            'kind': 'variable',
-                            'type': param_type,
-                            'initialized': True  # Parâmetros são sempre inicializados
-                        })
-                        
-                        # Registra o parâmetro na lista de parâmetros do procedimento
-                        proc_info['params'].append({
-                            'name': param_name,
-                            'type': param_type
-                        })
-            
-            # Visita o corpo do procedimento
-            self.visit(proc_body)
-            
-            # Restaura o escopo original
-            self.current_scope = old_scope
-    
     def visit_FunctionCall(self, node):
         """Visita uma chamada de função."""
         func_name = node.leaf
         func_info = self.current_scope.lookup(func_name)
         
         if not func_info:
-            self.add_error(f"Erro: Função '{func_name}' não declarada")
+            self.add_error("Erro: Função '{0}' não declarada", func_name, node=node)
             return None
         
-        if func_info.get('kind') != 'function':
-            self.add_error(f"Erro: '{func_name}' não é uma função")
+        # Dentro da própria função o nome designa o valor de retorno; uma
+        # chamada com argumentos é uma chamada recursiva
+        current = self.current_function
+        if func_info.kind != FUNCTION and current is not None and current.name.lower() == func_name.lower():
+            func_info = current
+        
+        if func_info.kind != FUNCTION:
+            self.add_error("Erro: '{0}' não é uma função", func_name, node=node)
             return None
+        node.symbol = func_info
         
-        # Verifica os parâmetros, se houver
-        if node.children and func_info.get('params'):
-            expr_list = node.children[0]
-            params_info = func_info.get('params', [])
-            
-            # Verifica o número de parâmetros
-            if len(expr_list.children) != len(params_info):
-                self.add_error(f"Erro: Número incorreto de parâmetros para '{func_name}'. Esperado {len(params_info)}, encontrado {len(expr_list.children)}")
-            else:
-                # Verifica cada parâmetro
-                for i, (expr_node, param_info) in enumerate(zip(expr_list.children, params_info)):
-                    expr_type = self.visit(expr_node)
-                    param_type = param_info.get('type')
-                    
-                    if not self.check_type_compatibility(param_type, expr_type):
-                        self.add_error(f"Erro: Tipo incompatível para parâmetro {i+1} de '{func_name}'. Esperado '{param_type}', encontrado '{expr_type}'")
+        # Verifica os parâmetros
+        args = node.children[0].children if node.children else []
+        params_info = func_info.params
+        
+        # Verifica o número de parâmetros
+        if len(args) != len(params_info):
+            self.add_error("Erro: Número incorreto de parâmetros para '{0}'. Esperado {1}, encontrado {2}", func_name, len(params_info), len(args), node=node)
+        else:
+            # Verifica cada parâmetro
+            for i, (expr_node, param_info) in enumerate(zip(args, params_info)):
+                expr_type = yield expr_node
+                param_type = param_info.type
+                
+                if not self.check_type_compatibility(param_type, expr_type):
+                    self.add_error("Erro: Tipo incompatível para parâmetro {0} de '{1}'. Esperado '{2}', encontrado '{3}'", i+1, func_name, param_type, expr_type, node=expr_node)
         
         # Retorna o tipo de retorno da função
-        return func_info.get('return_type')
+        return func_info.return_type
     
     def visit_BinaryOperation(self, node):
         """Visita uma operação binária e retorna seu tipo."""
@@ -450,8 +556,8 @@ class SemanticAnalyzer:
         right_node = node.children[1]
         operator = node.leaf
         
-        left_type = self.visit(left_node)
-        right_type = self.visit(right_node)
+        left_type = yield left_node
+        right_type = yield right_node
         
         if not left_type or not right_type:
             return None
@@ -460,19 +566,19 @@ class SemanticAnalyzer:
         if operator in ('+', '-', '*', '/', 'div', 'mod'):
             # Operadores aritméticos
             if left_type != 'integer' or right_type != 'integer':
-                self.add_error(f"Erro: Operador '{operator}' requer operandos inteiros, encontrado '{left_type}' e '{right_type}'")
+                self.add_error("Erro: Operador '{0}' requer operandos inteiros, encontrado '{1}' e '{2}'", operator, left_type, right_type, node=node)
                 return None
             
             # Verifica divisão por zero quando possível
             if operator in ('/', 'div', 'mod') and right_node.type == 'IntegerConstant' and right_node.leaf == 0:
-                self.add_error(f"Erro: Divisão por zero detectada")
+                self.add_error("Erro: Divisão por zero detectada", node=node)
             
             return 'integer'
         
         elif operator in ('=', '<>', '<', '<=', '>', '>='):
             # Operadores relacionais
             if not self.check_type_compatibility(left_type, right_type):
-                self.add_error(f"Erro: Não é possível comparar '{left_type}' com '{right_type}' usando o operador '{operator}'")
+                self.add_error("Erro: Não é possível comparar '{0}' com '{1}' usando o operador '{2}'", left_type, right_type, operator, node=node)
                 return None
             
             return 'boolean'
@@ -480,14 +586,26 @@ class SemanticAnalyzer:
         elif operator in ('and', 'or'):
             # Operadores lógicos
             if left_type != 'boolean' or right_type != 'boolean':
-                self.add_error(f"Erro: Operador '{operator}' requer operandos booleanos, encontrado '{left_type}' e '{right_type}'")
+                self.add_error("Erro: Operador '{0}' requer operandos booleanos, encontrado '{1}' e '{2}'", operator, left_type, right_type, node=node)
                 return None
             
             return 'boolean'
         
-        self.add_error(f"Erro: Operador desconhecido '{operator}'")
+        self.add_error("Erro: Operador desconhecido '{0}'", operator, node=node)
         return None
     
+    def visit_UnaryOperation(self, node):
+        """Visita uma operação unária (not) e retorna seu tipo."""
+        operand_type = yield node.children[0]
+        if not operand_type:
+            return None
+
+        if operand_type != 'boolean':
+            self.add_error("Erro: Operador '{0}' requer um operando booleano, encontrado '{1}'", node.leaf, operand_type, node=node)
+            return None
+
+        return 'boolean'
+    
     def visit_IntegerConstant(self, node):
         """Visita uma constante inteira."""
         return 'integer'
@@ -499,7 +617,17 @@ class SemanticAnalyzer:
     def visit_BooleanConstant(self, node):
         """Visita uma constante booleana."""
         return 'boolean'
-    
+
+    def visit_ErrorNode(self, node):
+        """Construção descartada pela recuperação de erros de sintaxe.
+
+        Não se sabe que variáveis a instrução inválida atribuía: a partir
+        daqui todas são consideradas inicializadas, para não gerar avisos
+        que são apenas consequência do erro de sintaxe.
+        """
+        self.initialized = -1
+        return None
+
     def check_type_compatibility(self, expected_type, actual_type):
         """Verifica se dois tipos são compatíveis."""
         if expected_type is None or actual_type is None:
@@ -0,0 +1,69 @@
+"""
+Leitura do código fonte por blocos.
+
+Para ficheiros muito grandes, o texto não chega a estar todo em memória: é
+lido em blocos de CHUNK_SIZE caracteres, que o lexer analisa um a um
+(lexer.lex_chunks). Sem o texto, as linhas e colunas dos diagnósticos são
+calculadas a partir de um LineIndex, construído à medida que os blocos
+passam.
+"""
+
+from array import array
+from bisect import bisect_right
+
+CHUNK_SIZE = 1 << 20  # Caracteres por bloco
+
+# A partir deste tamanho (em bytes) a compilação lê o ficheiro por blocos,
+# em vez de o carregar num str
+LARGE_SOURCE = 64 * 1024 * 1024
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Blocos de texto do ficheiro `path`, pela ordem.
+
+    O ficheiro é aberto logo na chamada (um ficheiro inexistente dá
+    FileNotFoundError aqui, e não ao pedir o primeiro bloco).
+    """
+    return _chunks(open(path, 'r'), chunk_size)
+
+
+def _chunks(f, chunk_size):
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class LineIndex:
+    """Posições de início das linhas de um fonte lido por blocos.
+
+    Substitui o texto como `source` de Diagnostics: line(pos) e column(pos)
+    dão o mesmo resultado que as contagens sobre o str completo.
+    """
+
+    def __init__(self):
+        self.starts = array('Q', [0])
+        self.size = 0  # Caracteres vistos até agora
+
+    def add(self, text):
+        find = text.find
+        base = self.size
+        index = find('\n')
+        while index >= 0:
+            self.starts.append(base + index + 1)
+            index = find('\n', index + 1)
+        self.size += len(text)
+
+    def scan(self, chunks):
+        """Deixa passar os blocos, registando as linhas de cada um."""
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def line(self, pos):
+        return bisect_right(self.starts, pos)
+
+    def column(self, pos):
+        return pos - self.starts[self.line(pos) - 1] + 1
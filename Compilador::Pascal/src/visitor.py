@@ -0,0 +1,104 @@
+"""
+Base comum dos visitantes da AST (análise semântica, otimização e geração
+de código).
+
+Cada subclasse de Visitor recebe, no momento em que é definida, uma tabela
+de despacho que associa o tipo de cada nó ao método que o trata (por
+exemplo 'IfStatement' -> visit_IfStatement). Visitar um nó é apenas uma
+consulta a essa tabela, sem formatar o nome do método nem procurar
+atributos no objeto.
+
+A travessia é iterativa, com uma pilha explícita: em vez de chamar
+self.visit(filho), os métodos que visitam filhos são geradores que fazem
+`yield filho` e recebem de volta o resultado da visita do filho:
+
+    def visit_BinaryOperation(self, node):
+        left_type = yield node.children[0]
+        right_type = yield node.children[1]
+        ...
+
+O Visitor.visit guarda os geradores ativos numa lista, pelo que a
+profundidade da AST (cadeias longas de BinaryOperation, begin...end
+encaixados) não é limitada pela pilha do Python. Os métodos que não visitam
+filhos (constantes, variáveis) podem continuar a ser funções normais.
+"""
+
+from inspect import isgeneratorfunction
+
+
+def dispatch_table(cls, prefix):
+    """Tabela {tipo de nó: (função, é gerador)} com os métodos de `cls` começados por `prefix`."""
+    table = {}
+    for klass in reversed(cls.__mro__):
+        for name, attribute in vars(klass).items():
+            if name.startswith(prefix) and callable(attribute):
+                table[name[len(prefix):]] = (attribute, isgeneratorfunction(attribute))
+    return table
+
+
+class Visitor:
+    prefix = 'visit_'  # Prefixo dos métodos que tratam cada tipo de nó
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = dispatch_table(cls, cls.prefix)
+        cls._generic = (cls.generic_visit, isgeneratorfunction(cls.generic_visit))
+
+    def visit(self, node):
+        """Visita um nó (e, através dos métodos geradores, os seus descendentes).
+
+        Devolve o resultado do método que trata o nó.
+        """
+        dispatch = self._dispatch
+        generic = self._generic
+        method, is_generator = dispatch.get(node.type, generic)
+        if not is_generator:
+            return method(self, node)
+
+        # Geradores suspensos à espera do resultado de um filho
+        stack = []
+        push, pop = stack.append, stack.pop
+        current = method(self, node)
+        value = None
+        while True:
+            try:
+                node = current.send(value)
+            except StopIteration as done:
+                # O método terminou: o seu resultado vai para quem o pediu
+                value = done.value
+                if not stack:
+                    return value
+                current = pop()
+                continue
+            method, is_generator = dispatch.get(node.type, generic)
+            if is_generator:
+                push(current)
+                current = method(self, node)
+                value = None
+            else:
+                value = method(self, node)
+
+    def generic_visit(self, node):
+        """Visita padrão: percorre todos os filhos."""
+        for child in node.children:
+            if child:
+                yield child
+
+
+def walk(node):
+    """Percorre a AST em pré-ordem, sem recursão. Produz (nó, profundidade)."""
+    stack = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        children = node.children
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i], depth + 1))
+
+
+def count_nodes(node):
+    """Número de nós de uma (sub)árvore."""
+    count = 0
+    for _ in walk(node):
+        count += 1
+    return count